@@ -1,5 +1,5 @@
 #Import pip packages
-from typing import Type, List, Tuple
+from typing import Type, List, Tuple, Dict, Iterator, Callable
 import requests, json
 import numpy as np
 import pandas as pd
@@ -7,19 +7,32 @@ import os
 import time
 import math
 from datetime import datetime, timedelta
-import notion_df # type: ignore
 import sys
-from dotenv import load_dotenv
-import plotly.express as px # type: ignore
-import plotly.io as pio # type: ignore
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
 
 #Import project files
-from experiment_meta import ExperimentMeta
-from ed_metric_calculations import EDMetricCalculations
+from experiment_meta import ExperimentMeta, NOTION_PROPERTIES, COMPLETED_PROPERTIES
 import ic_calculations
 from plot_container import PlotContainer
 from file_to_string import ftos
+from logfile_fetcher import LogfileFetcher, LogfileSet, StreamingSettings
+import time_conversion
+from outlier_filter import RollingMedianFilter
+from frame_accumulator import FrameAccumulator
+from channel_data import ChannelData
+from experiment_processor import WorkerContext, ProcessExperiment, ProcessStoredExperiment, ReuseExperimentResult, CalculateBatchMetrics, ProcessingSettings, ExperimentResult, SeriesParameters, ResultInputs
+from series_store import SeriesStore, StoredSeries
+from results_manifest import ResultsManifest, Fingerprint
+from report_writer import ReportWriter, PLOTLYJS_MODES
+from downsampler import DownsampleByLabel, DOWNSAMPLE_METHODS
+from uncertain_array import PROPAGATION_MODES
+from uncertainty_estimation import UncertaintySettings, UNCERTAINTY_METHODS
+from logfile_cache import LogfileCache
+from dashboard_snapshot import DashboardSnapshot
+from profiler import Profiler, StageRecord, ProfileStage, BeginStage, EndStage
+import notion_api
 
 #Class with functionality that covers database queries, data processing and plotting graphs
 class AnalysisManager(object):
@@ -31,6 +44,12 @@ class AnalysisManager(object):
 	"""
 
 	def __init__(self, config: dict) -> None:
+		#In offline mode everything is read from the local dashboard snapshot and logfile cache
+		self.offline: bool = config["offline"]
+		if self.offline and (config["no_cache"] or config["refresh"]):
+			print ("Error: --offline can't be combined with --no-cache or --refresh", file=sys.stderr)
+			sys.exit(1)
+
 		#Load local env variables into RAM
 		try:
 			self.LoadEnvironmentVariables()
@@ -43,41 +62,321 @@ class AnalysisManager(object):
 		if config["output"]:
 			self.outputFilename = config["output"]
 
+		#How plotly.js is included in the report, and whether a gzip-compressed copy is written too
+		self.plotlyjsMode: str = "inline"
+		if config["plotlyjs"]:
+			self.plotlyjsMode = config["plotlyjs"]
+		if self.plotlyjsMode not in PLOTLYJS_MODES:
+			print ("Error: --plotlyjs must be one of: %s" % (", ".join(PLOTLYJS_MODES)), file=sys.stderr)
+			sys.exit(1)
+		self.compressReport: bool = config["compress"]
+
+		#Number of samples per experiment drawn in the raw time series plots. 0 draws every sample
+		self.maxPoints: int = 5000
+		if config["max_points"] is not None:
+			self.maxPoints = config["max_points"]
+		self.downsampleMethod: str = "lttb"
+		if config["downsample_method"]:
+			self.downsampleMethod = config["downsample_method"]
+		if self.downsampleMethod not in DOWNSAMPLE_METHODS:
+			print ("Error: --downsample-method must be one of: %s" % (", ".join(DOWNSAMPLE_METHODS)), file=sys.stderr)
+			sys.exit(1)
+		#Writes every raw sample to a CSV file next to the report, linked under the time plots
+		self.writeFullData: bool = config["full_data"]
+		#Draws the raw time series with WebGL, which stays responsive with many more points
+		self.webgl: bool = config["webgl"]
+
 		if config["dashboard"]:
 			self.NOTION_DATABASE_ID = config["dashboard"]#this variable was already declared inside of the self.LoadEnvironmentVariables() function
 
 		self.exclude: bool = config["exclude"]
 
+		#Timezones in which timestamps without one are interpreted. Each logger can be set separately, and defaults to the general setting
+		self.timezone: str = time_conversion.DEFAULT_TIMEZONE
+		if config["timezone"]:
+			self.timezone = config["timezone"]
+		self.co2Timezone: str = self.timezone
+		if config["co2_timezone"]:
+			self.co2Timezone = config["co2_timezone"]
+		self.voltageTimezone: str = self.timezone
+		if config["voltage_timezone"]:
+			self.voltageTimezone = config["voltage_timezone"]
+		try:
+			for timezone in (self.timezone, self.co2Timezone, self.voltageTimezone):
+				time_conversion.ValidateTimezone(timezone)
+		except Exception as e:
+			print (e, file=sys.stderr)
+			sys.exit(1)
+
+		#Settings for the rolling median used to reject outliers in the CO2 and voltage logs
+		outlierWindow: int = 5
+		if config["outlier_window"]:
+			outlierWindow = config["outlier_window"]
+		outlierTolerance: float = 0.15
+		if config["outlier_tolerance"]:
+			outlierTolerance = config["outlier_tolerance"]
+		try:
+			self.outlierFilter: RollingMedianFilter = RollingMedianFilter(outlierWindow, outlierTolerance)
+		except Exception as e:
+			print (e, file=sys.stderr)
+			sys.exit(1)
+
+		#Time windows over which time-resolved metrics are worked out, in seconds. Windows overlap if the step is shorter than the width
+		windowStart: float = 900.0
+		#0 is a sensible start time, so unlike the other options only a missing value falls back to the default
+		if config["window_start"] is not None:
+			windowStart = config["window_start"]
+		windowWidth: float = 300.0
+		if config["window_width"]:
+			windowWidth = config["window_width"]
+		windowStep: float = windowWidth
+		if config["window_step"]:
+			windowStep = config["window_step"]
+		if windowWidth <= 0.0 or windowStep <= 0.0:
+			print ("Error: the time window width and step must be positive", file=sys.stderr)
+			sys.exit(1)
+
+		#How errors are combined when working out the key performance metrics
+		errorPropagation: str = "linear"
+		if config["error_propagation"]:
+			errorPropagation = config["error_propagation"]
+		if errorPropagation not in PROPAGATION_MODES:
+			print ("Error: --error-propagation must be one of: %s" % (", ".join(PROPAGATION_MODES)), file=sys.stderr)
+			sys.exit(1)
+
+		#Everything ProcessExperiment needs besides the logfiles themselves
+		self.processingSettings: ProcessingSettings = ProcessingSettings()
+		self.processingSettings.co2Timezone = self.co2Timezone
+		self.processingSettings.voltageTimezone = self.voltageTimezone
+		self.processingSettings.outlierFilter = self.outlierFilter
+		self.processingSettings.windowStart = windowStart
+		self.processingSettings.windowWidth = windowWidth
+		self.processingSettings.windowStep = windowStep
+		self.processingSettings.errorPropagation = errorPropagation
+
+		#Number of worker processes used to process experiments. 1 processes them in this process
+		self.jobs: int = 1
+		if config["jobs"]:
+			self.jobs = config["jobs"]
+		if self.jobs < 1:
+			print ("Error: the number of jobs must be at least 1", file=sys.stderr)
+			sys.exit(1)
+
+		#Errors on the experiment-averaged metrics can be estimated from resamples of each experiment's data instead of being propagated
+		uncertainty: UncertaintySettings = UncertaintySettings()
+		if config["uncertainty"]:
+			uncertainty.method = config["uncertainty"]
+		if uncertainty.method not in UNCERTAINTY_METHODS:
+			print ("Error: --uncertainty must be one of: %s" % (", ".join(UNCERTAINTY_METHODS)), file=sys.stderr)
+			sys.exit(1)
+		if config["uncertainty_samples"]:
+			uncertainty.samples = config["uncertainty_samples"]
+		if config["uncertainty_time_budget"] is not None:
+			uncertainty.timeBudget = config["uncertainty_time_budget"]
+		if config["uncertainty_seed"] is not None:
+			uncertainty.seed = config["uncertainty_seed"]
+		if uncertainty.samples < 2 or uncertainty.timeBudget < 0.0:
+			print ("Error: --uncertainty-samples must be at least 2 and --uncertainty-time-budget can't be negative", file=sys.stderr)
+			sys.exit(1)
+		#With several jobs every core is already busy with an experiment, so each one makes its own draws. Otherwise the draws are spread across every core
+		uncertainty.workers = 1
+		if self.jobs == 1:
+			uncertainty.workers = os.cpu_count() or 1
+		self.processingSettings.uncertainty = uncertainty
+
+		self.downloadThreads: int = 4
+		if config["download_threads"]:
+			self.downloadThreads = config["download_threads"]
+
+		#Long logfiles can be streamed a chunk of rows at a time, keeping only the rows inside each experiment's time window. 0 reads each logfile whole
+		self.streaming: StreamingSettings = None
+		if config["chunk_rows"]:
+			if config["chunk_rows"] < 1:
+				print ("Error: --chunk-rows must be at least 1", file=sys.stderr)
+				sys.exit(1)
+			self.streaming = StreamingSettings(config["chunk_rows"], self.co2Timezone, self.voltageTimezone)
+
+		#Logfiles from finished experiments never change, so they are kept on disk between runs, along with a snapshot of the dashboard
+		self.noCache: bool = config["no_cache"]
+		self.refresh: bool = config["refresh"]
+		self.cacheDirectory: str = ".logfile_cache"
+		if config["cache_dir"]:
+			self.cacheDirectory = config["cache_dir"]
+
+		self.logfileCache: LogfileCache = None
+		if not self.noCache:
+			cacheSizeMB: int = 1024
+			if config["cache_size"]:
+				cacheSizeMB = config["cache_size"]
+			self.logfileCache = LogfileCache(self.cacheDirectory, cacheSizeMB * 1024 * 1024, refresh=self.refresh, offline=self.offline)
+
+		#Cleaned series are stored next to the logfiles, so that experiments which have already been processed with the same settings don't need their logfiles at all
+		self.seriesStore: SeriesStore = None
+		if not self.noCache:
+			self.seriesStore = SeriesStore(os.path.join(self.cacheDirectory, "series"))
+			self.processingSettings.seriesDirectory = self.seriesStore.directory
+
+		#Results are kept too, so that only experiments whose inputs have changed since the last run are processed again. --force processes every experiment
+		self.force: bool = config["force"]
+		self.resultsManifest: ResultsManifest = None
+		if not self.noCache:
+			self.resultsManifest = ResultsManifest(os.path.join(self.cacheDirectory, "results.json"))
+
+		#Records how long each stage of the run takes, for every experiment. --trace also writes the records as a Chrome trace
+		self.traceFilename: str = config["trace"]
+		self.profiler: Profiler = None
+		if config["profile"] or self.traceFilename:
+			self.profiler = Profiler()
+			self.processingSettings.profile = True
+
+		#In watch mode the dashboard is polled every watchInterval seconds, and the result of every experiment is kept in memory with the signature of its row
+		#Only experiments whose rows have changed are processed again
+		self.watchInterval: float = 60.0
+		if config["watch_interval"]:
+			self.watchInterval = config["watch_interval"]
+		if self.watchInterval <= 0.0:
+			print ("Error: --watch-interval must be positive", file=sys.stderr)
+			sys.exit(1)
+		self.warmResults: Dict[str, Tuple[str, ExperimentResult]] = None
+		if config["watch"]:
+			self.warmResults = {}
+		#Signatures of the experiments in the last report, used to tell whether the dashboard has changed since
+		self.watchedSignatures: List[Tuple[str, str, str]] = []
+
 
 		#Request experiment metadata from Notion API
-		self.FetchExperimentDataFromNotion()
-		self.Experiments: List[ExperimentMeta]= [] # Initialize list containing metadata for all experiments
-		self.ParseExperimentMetadata(config["experimentIDs"])
+		self.experimentIDs: List[str] = config["experimentIDs"]
+		self.LoadExperiments()
 
 
 		#Loop through Experiments list, request data from InfluxDB and process data
 		self.ProcessData()
 
 
+	#Fetches the dashboard and builds the list of experiments to process from it
+	def LoadExperiments(self) -> None:
+		with ProfileStage(self.profiler, "fetch_dashboard") as record:
+			notionBytes: int = notion_api.ResponseBytes()
+			self.FetchExperimentDataFromNotion(self.experimentIDs)
+			record.bytesTransferred = notion_api.ResponseBytes() - notionBytes
+			record.rowsOut = len(self.notionDashboard)
+		self.Experiments: List[ExperimentMeta]= [] # Initialize list containing metadata for all experiments
+		self.ParseExperimentMetadata(self.experimentIDs)
+
+	#Returns a fingerprint of everything in an experiment's row that its results depend on. Logfiles are identified by their attachment names
+	def WarmSignature(self, exp: ExperimentMeta) -> str:
+		return Fingerprint(ResultInputs(exp, self.processingSettings, []))
+
+	#Returns the experiment ID, Notion page ID and signature of every experiment, which only changes if an experiment has been added, edited or removed
+	#Page IDs are included so that a row replaced by another with the same contents, such as a deleted duplicate, still counts as a change
+	def DashboardSignature(self) -> List[Tuple[str, str, str]]:
+		return [(exp.experimentID, exp.pageID, self.WarmSignature(exp)) for exp in self.Experiments]
+
+	#Polls the dashboard every watchInterval seconds and rewrites the report whenever an experiment has been added, edited or removed. Runs until interrupted
+	def Watch(self) -> None:
+		#--refresh and --force only apply to the first pass, otherwise every poll would download and process everything again
+		self.refresh = False
+		self.force = False
+		if self.logfileCache is not None:
+			self.logfileCache.refresh = False
+
+		print ("Watching the dashboard for changes every %g s. Press Ctrl+C to stop" % (self.watchInterval))
+		while True:
+			time.sleep(self.watchInterval)
+			try:
+				if self.Refresh():
+					self.PlotData()
+					print ("%s: report updated with %d experiments" % (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), len(self.Experiments)))
+			#Errors that would end a single run, such as Notion being unreachable, exit through sys.exit. While watching they only skip this poll
+			except (Exception, SystemExit) as e:
+				print ("WARNING: the report could not be updated (%s)" % (e), file=sys.stderr)
+
+	#Fetches the dashboard again and processes the experiments whose rows have changed. Returns False without processing anything if no row has changed
+	#Experiments that failed to process are tried again the next time any row changes
+	def Refresh(self) -> bool:
+		if self.profiler is not None:
+			self.profiler = Profiler()
+		processedExperiments: List[ExperimentMeta] = self.Experiments
+		self.LoadExperiments()
+		if self.DashboardSignature() == self.watchedSignatures:
+			#The experiments just loaded from the dashboard have no results yet, so keep the ones that were processed
+			self.Experiments = processedExperiments
+			return False
+		self.ProcessData()
+		return True
+
 	#Reads .env file in local directory and saves env variables as member variables
 	def LoadEnvironmentVariables(self) -> None:
+		from dotenv import load_dotenv
 		load_dotenv()
 		self.NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 		self.NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
 
-		#Throw exception if env variables failed to load
-		if not (self.NOTION_API_KEY and self.NOTION_DATABASE_ID):
+		#Throw exception if env variables failed to load. The API key isn't needed when running offline
+		if not ((self.NOTION_API_KEY or self.offline) and self.NOTION_DATABASE_ID):
 			raise Exception("ERROR: secrets could not be loaded from .env file")
 
 
 #Queries Notion and loads dashboard as pandas DataFrame
-	def FetchExperimentDataFromNotion(self) -> None:
+	def FetchExperimentDataFromNotion(self, experimentIDs: List[str]) -> None:
+		if self.offline:
+			snapshot: DashboardSnapshot = self.OpenDashboardSnapshot()
+			if not snapshot.Load():
+				print ("Error: --offline was given, but there is no snapshot of the Notion dashboard in %s" % (self.cacheDirectory), file=sys.stderr)
+				sys.exit(1)
+			self.notionDatabase: dict = snapshot.database
+			self.notionDashboard: pd.DataFrame = snapshot.dashboard
+			return
+
 		try:
-			self.notionDashboard: pd.DataFrame = notion_df.download(self.NOTION_DATABASE_ID, api_key=self.NOTION_API_KEY)
-		except:
+			#When specific experiments are requested, Notion only needs to send those rows
+			if experimentIDs and not self.exclude:
+				self.QueryNotion(experimentIDs)
+			#Without a cache, Notion is asked for the completed experiments only
+			elif self.noCache:
+				self.QueryNotion([])
+			else:
+				snapshot = self.OpenDashboardSnapshot()
+				snapshot.Update(fullRefresh=self.refresh)
+				self.notionDatabase = snapshot.database
+				self.notionDashboard = snapshot.dashboard
+		except Exception as e:
 			print ("There was an error communicating with the Notion API", file=sys.stderr)
+			print (e, file=sys.stderr)
 			sys.exit(1)
 
+	def OpenDashboardSnapshot(self) -> DashboardSnapshot:
+		return DashboardSnapshot(os.path.join(self.cacheDirectory, "dashboard_%s.pkl" % (self.NOTION_DATABASE_ID)), self.NOTION_DATABASE_ID, self.NOTION_API_KEY)
+
+	#Has Notion filter the dashboard and only send the properties that ExperimentMeta reads
+	#Fetches the given experiment IDs, or every completed experiment if none are given
+	def QueryNotion(self, experimentIDs: List[str]) -> None:
+		maxConcurrentRequests: int = 3
+		self.notionDatabase = notion_api.RetrieveDatabase(self.NOTION_DATABASE_ID, self.NOTION_API_KEY)
+		filterProperties: List[str] = notion_api.PropertyIDs(self.notionDatabase, NOTION_PROPERTIES)
+
+		if experimentIDs:
+			#Split the IDs into one group per concurrent request
+			groupSize: int = math.ceil(len(experimentIDs) / maxConcurrentRequests)
+			filters: List[dict] = notion_api.AnyEqualsFilters(self.notionDatabase, "Experiment ID", experimentIDs, groupSize)
+		else:
+			filters = [notion_api.NotEmptyFilter(self.notionDatabase, COMPLETED_PROPERTIES)]
+
+		pages: List[dict] = notion_api.QueryDatabaseConcurrently(self.NOTION_DATABASE_ID, self.NOTION_API_KEY, filters, filterProperties, maxConcurrentRequests)
+		self.notionDashboard = notion_api.PagesToDataFrame(pages, self.notionDatabase)
+
+	#Signed Notion file URLs expire after an hour, so URLs for pages that haven't been edited since they were added to the snapshot may no longer work
+	#Downloads the experiment's page again to get fresh logfile URLs
+	def RefreshLogfileURLs(self, exp: ExperimentMeta) -> None:
+		if self.offline or not exp.pageID:
+			raise Exception("ERROR: logfile URLs for experiment %s can't be refreshed" % (exp.label))
+
+		page: dict = notion_api.RetrievePage(exp.pageID, self.NOTION_API_KEY)
+		freshExp: ExperimentMeta = ExperimentMeta(notion_api.PagesToDataFrame([page], self.notionDatabase).iloc[0], self.timezone)
+		exp.CO2LogfileURL = freshExp.CO2LogfileURL
+		exp.voltageLogfileURL = freshExp.voltageLogfileURL
+		exp.icLogfileURL = freshExp.icLogfileURL
+
 
 	# Implementation of a merge sort algorithm
 	@staticmethod
@@ -130,14 +429,14 @@ class AnalysisManager(object):
 #Takes experiment IDs and gets start and end timestamps from Notion database
 	def ParseExperimentMetadata(self, experimentIDs: List[str]) -> None:
 		if experimentIDs and not self.exclude:
-			for n in range (0, len(experimentIDs)):
-				experimentID = experimentIDs[n]
-				dashboardRow: pd.DataFrame = self.notionDashboard[self.notionDashboard["Experiment ID"] == experimentID]
-				if dashboardRow.empty:
+			#Index the dashboard by experiment ID once rather than scanning it for every ID. If an ID appears more than once, the first row is used
+			dashboardByID: pd.DataFrame = self.notionDashboard.drop_duplicates(subset=["Experiment ID"]).set_index("Experiment ID", drop=False)
+			for experimentID in experimentIDs:
+				if not experimentID in dashboardByID.index:
 					print ("Warning: No experiment with ID \"%s\" was found" % (experimentID), file=sys.stderr)
 				else:
 					try:
-						self.Experiments.append(ExperimentMeta(dashboardRow.iloc[0]))
+						self.Experiments.append(ExperimentMeta(dashboardByID.loc[experimentID], self.timezone))
 					except Exception as e:
 						print (e, file=sys.stderr)
 
@@ -157,7 +456,7 @@ class AnalysisManager(object):
 			for index, row in self.notionDashboard.iterrows():
 				if (not self.exclude) or (not (row.loc["Experiment ID"] in experimentIDs)):
 					try:
-						self.Experiments.append(ExperimentMeta(row))
+						self.Experiments.append(ExperimentMeta(row, self.timezone))
 					except Exception as e:
 						print (e, file=sys.stderr)
 
@@ -165,219 +464,250 @@ class AnalysisManager(object):
 			self.Experiments = self.MergeSort(self.Experiments)
 
 
-	@staticmethod
-	def StringToUNIXTime(ip: str) -> float:
-		dt: datetime = datetime.strptime(ip, "%Y-%m-%d %H:%M:%S")
-		op: float = time.mktime(dt.timetuple())
-		#I don't think that Vaisala nor EasyLog account for timezone, so this will probably break once we go back to GMT lmao
-		return op
-
+	#Downloads logfiles for upcoming experiments in the background while the current experiment is processed
+	#With more than one job, experiments are processed in a pool of worker processes and their results are merged back in experiment order
 	def ProcessData(self) -> None:
-		self.rawDataAll: pd.DataFrame = pd.DataFrame()
-		self.rawDataICAll: pd.DataFrame = pd.DataFrame()
-		for exp in self.Experiments:
-			#Create DataFrame with data for a single experiment
-			rawDataCO2: pd.DataFrame = pd.read_csv(exp.CO2LogfileURL, header=8, names=["timestamp", "co2_ppm"])
-			rawDataVoltage: pd.DataFrame = pd.read_csv(exp.voltageLogfileURL, header=2, names=["data_index", "timestamp", "voltage_v", "high_alarm", "low_alarm"])
-			if exp.icLogfileURL:
-				rawDataIC: pd.DataFrame = pd.read_csv(exp.icLogfileURL, header=0, names=["time_min", "amine_area", "k+_area", "amine_ppm", "amine_mol/kg", "amine_mol"])
-
-			#Create new columns with time since start of experiment in seconds
-			rawDataCO2["runtime_s"] = rawDataCO2["timestamp"].apply(self.StringToUNIXTime)
-			rawDataCO2["runtime_s"] = rawDataCO2["runtime_s"].apply(lambda x: x - exp.startTime)
-			rawDataVoltage["runtime_s"] = rawDataVoltage["timestamp"].apply(self.StringToUNIXTime)
-			rawDataVoltage["runtime_s"] = rawDataVoltage["runtime_s"].apply(lambda x: x - exp.startTime)
-
-			#Discard data outside of the start/stop time
-			rawDataCO2 = rawDataCO2[rawDataCO2["runtime_s"] >= 0.0]
-			rawDataCO2 = rawDataCO2[rawDataCO2["runtime_s"] <= exp.stopTime - exp.startTime]
-			rawDataVoltage = rawDataVoltage[rawDataVoltage["runtime_s"] >= 0.0]
-			rawDataVoltage = rawDataVoltage[rawDataVoltage["runtime_s"] <= exp.stopTime - exp.startTime]
-
-			#Reset indices so that the dataframes are correctly 0-indexed:
-			rawDataCO2.reset_index(drop=True, inplace=True)
-			rawDataVoltage.reset_index(drop=True, inplace=True)
-
-			#Drop unneeded columns
-			rawDataCO2.drop("timestamp", axis=1, inplace=True)
-			rawDataVoltage.drop(["data_index", "timestamp", "high_alarm", "low_alarm"], axis=1, inplace=True)
-			if exp.icLogfileURL:
-				#rawDataIC.drop(["amine_area", "k+_area", "amine_ppm", "amine_mol/kg"], axis=1, inplace=True)
-				rawDataIC.drop(["amine_area", "k+_area", "amine_ppm"], axis=1, inplace=True)
-				rawDataIC["amine_mol/kg"] = rawDataIC["amine_mol/kg"].apply(lambda x: x if x >= 0.0 else 0.0)
-				rawDataIC["amine_mol"] = rawDataIC["amine_mol"].apply(lambda x: x if x >= 0.0 else 0.0)
-
-			#Discard outliers using a rolling average
-			rollWindowSize: int = 5
-			thresholdTolerance: float = 0.15
-			#CO2 data
-			co2ppmSeries: pd.Series = rawDataCO2["co2_ppm"]
-			co2ppmSeriesRoll: pd.Series = co2ppmSeries.rolling(rollWindowSize).median()
-
-			roll: list[float] = []
-			nextToReplace: int = 0
-			for n in range(0, rollWindowSize):
-				roll.append(co2ppmSeries[n])
-
-			for n in range(rollWindowSize, co2ppmSeries.size):
-				sortedRoll: list[float] = self.MergeSort(roll)
-				rollingMedian: float = sortedRoll[(int)(rollWindowSize / 2.0)]
-
-				if co2ppmSeries.iloc[n] > rollingMedian * (1.0 + thresholdTolerance) or co2ppmSeries.iloc[n] < rollingMedian * (1.0 - thresholdTolerance):
-					rawDataCO2.drop(n, axis=0, inplace=True)
-				else:
-					roll[nextToReplace % rollWindowSize] = co2ppmSeries.iloc[n]
-					nextToReplace += 1
-
-			#Drop outliers for voltage data
-			if exp.current > 0.0:
-				voltageSeries: pd.Series = rawDataVoltage["voltage_v"]
-				startIndex: int = 0
-				nextToReplace = 0
-				
-				while voltageSeries[startIndex] <= 0.01:
-					rawDataVoltage.drop(startIndex, axis=0, inplace=True)
-					startIndex += 1
-
-				for n in range(startIndex, startIndex + rollWindowSize):
-					roll[nextToReplace] = voltageSeries[n]
-					nextToReplace += 1
-
-				for n in range(startIndex + rollWindowSize, voltageSeries.size):
-					sortedRoll = self.MergeSort(roll)
-					rollingMedian = sortedRoll[(int)(rollWindowSize / 2.0)]
-
-					if voltageSeries.iloc[n] > rollingMedian * (1.0 + thresholdTolerance) or voltageSeries.iloc[n] < rollingMedian * (1.0 - thresholdTolerance):
-						rawDataVoltage.drop(n, axis=0, inplace=True)
-					else:
-						roll[nextToReplace % rollWindowSize] = voltageSeries.iloc[n]
-						nextToReplace += 1
-
-
-			rawDataCO2.reset_index(drop=True, inplace=True)
-			rawDataVoltage.reset_index(drop=True, inplace=True)
-
-			#Merge dataframes into one
-			rawDataExp: pd.DataFrame = pd.concat([rawDataCO2, rawDataVoltage], axis=0, ignore_index=True)
-
-			#Add experiment ID labels to graph
-			rawDataExp["label"] = exp.label
-			if exp.icLogfileURL:
-				rawDataIC["label"] = exp.label
+		self.rawDataAll: ChannelData = ChannelData()
+		self.rawDataICAccumulator: FrameAccumulator = FrameAccumulator()
+		self.processedExperiments: List[ExperimentMeta] = []
+
+		pool: ProcessPoolExecutor = None
+		if self.jobs > 1:
+			pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=WorkerContext())
+		#Experiments processed in this process spread their draws for estimating errors across one pool, shared by the whole run
+		uncertaintyPool: ProcessPoolExecutor = None
+		if pool is None and self.processingSettings.uncertainty.method != "heuristic" and self.processingSettings.uncertainty.workers > 1:
+			uncertaintyPool = ProcessPoolExecutor(max_workers=self.processingSettings.uncertainty.workers, mp_context=WorkerContext())
+		#Experiments sent to the pool whose results haven't been collected yet. Capped so that logfiles don't pile up in memory faster than the workers can process them
+		inFlight: deque = deque()
+		#Results collected so far, in experiment order. Their averaged and time-resolved metrics are worked out together once every experiment has been processed
+		finished: List[Tuple[ExperimentMeta, ExperimentResult]] = []
+
+		#Experiments that haven't changed since the last run reuse its results. Of the rest, those stored by an earlier run are processed from the store, and only the others have their logfiles downloaded
+		reused: List[ExperimentResult] = [self.ReusedResult(exp) for exp in self.Experiments]
+		stored: List[bool] = [result is None and self.IsStored(exp) for exp, result in zip(self.Experiments, reused)]
+		if self.warmResults is not None:
+			self.watchedSignatures = self.DashboardSignature()
+		fetcher: LogfileFetcher = LogfileFetcher(self.downloadThreads, self.logfileCache, self.RefreshLogfileURLs, self.streaming, self.profiler)
+		downloads: Iterator[Future] = fetcher.Iterate([exp for exp, result, isStored in zip(self.Experiments, reused, stored) if result is None and not isStored])
 
-			#Finally, append all raw data to dataframe with class scope for plotting later
-			self.rawDataAll = pd.concat([self.rawDataAll, rawDataExp], axis=0, ignore_index=True)
-			if exp.icLogfileURL:
-				self.rawDataICAll = pd.concat([self.rawDataICAll, rawDataIC], axis=0, ignore_index=True)
-
-
-			#Now we start processing the data
-			kpm = EDMetricCalculations(rawDataExp, exp)
-
-			stackResistanceTuple: Tuple[float, float] = (0.0, 0.0)
-			currentEfficiencyTuple: Tuple[float, float] = (0.0, 0.0)
-			powerConsumptionTuple: Tuple[float, float] = (0.0, 0.0)
-			fluxCO2Tuple: Tuple[float, float] = (0.0, 0.0)
-
-			if exp.current > 0.0:
-				try:
-					stackResistanceTuple = kpm.GetStackResistance()
-				except Exception as e:
-					print (e, file=sys.stderr)
+		try:
+			for exp, reusedResult, isStored in zip(self.Experiments, reused, stored):
+				if reusedResult is not None:
+					if pool is None:
+						finished.append((exp, reusedResult))
+					else:
+						#Queued behind the experiments already in the pool, so that results are still collected in experiment order
+						reusedFuture: Future = Future()
+						reusedFuture.set_result(reusedResult)
+						inFlight.append((exp, reusedFuture))
+					continue
+
+				if isStored:
+					task: Callable[..., ExperimentResult] = ProcessStoredExperiment
+					taskInput: object = exp
+				else:
+					try:
+						logfiles: LogfileSet = next(downloads).result()
+					except Exception as e:
+						print (e, file=sys.stderr)
+						continue
 
-				try:
-					currentEfficiencyTuple = kpm.GetCurrentEfficiency()
-				except Exception as e:
-					print (e, file=sys.stderr)
+					for warning in logfiles.warnings:
+						print (warning, file=sys.stderr)
+					task = ProcessExperiment
+					taskInput = logfiles
 
+				if pool is None:
+					try:
+						finished.append((exp, task(taskInput, self.processingSettings, uncertaintyPool)))
+					except Exception as e:
+						print ("WARNING: experiment %s could not be processed (%s)" % (exp.label, e), file=sys.stderr)
+					continue
+
+				while len(inFlight) >= 2 * self.jobs:
+					self.CollectPooledResult(*inFlight.popleft(), finished)
+				inFlight.append((exp, pool.submit(task, taskInput, self.processingSettings)))
+
+			while inFlight:
+				self.CollectPooledResult(*inFlight.popleft(), finished)
+
+			self.MergeExperimentResults(finished)
+		finally:
+			downloads.close()
+			if pool is not None:
+				pool.shutdown(cancel_futures=True)
+			if uncertaintyPool is not None:
+				uncertaintyPool.shutdown(cancel_futures=True)
+			if self.resultsManifest is not None:
 				try:
-					powerConsumptionTuple = kpm.GetPowerConsumption()
+					self.resultsManifest.Save()
 				except Exception as e:
-					print (e, file=sys.stderr)
-
-			try:
-				fluxCO2Tuple = kpm.GetCO2Flux()
-			except Exception as e:
-				print (e, file=sys.stderr)
-			
-			exp.processedData["stackResistance"].append(stackResistanceTuple[0])
-			exp.processedData["stackResistanceError"].append(stackResistanceTuple[1])
-
-			exp.processedData["currentEfficiency"].append(currentEfficiencyTuple[0])
-			exp.processedData["currentEfficiencyError"].append(currentEfficiencyTuple[1])
-			
-			exp.processedData["powerConsumption"].append(powerConsumptionTuple[0])
-			exp.processedData["powerConsumptionError"].append(powerConsumptionTuple[1])
-			
-			exp.processedData["fluxCO2"].append(fluxCO2Tuple[0])
-			exp.processedData["fluxCO2Error"].append(fluxCO2Tuple[1])
-
-			#Now process the amine crossing data:
-			if exp.icLogfileURL:
-				crossingRate: float = ic_calculations.LinearRegression(rawDataIC["time_min"], rawDataIC["amine_mol"])[0]
-				exp.processedData["amineFlux"].append(ic_calculations.CrossingFlux(crossingRate, exp.amine))
-			else:
-				exp.processedData["amineFlux"].append(0.0)
-
-			currentProcessedDataIndex: int = len(exp.processedData["amineFlux"]) - 1
-			exp.processedData["aminePerCO2"].append(exp.processedData["amineFlux"][currentProcessedDataIndex] / exp.processedData["fluxCO2"][currentProcessedDataIndex])
-			
-			#I don't like doing this, but plotly needs it
-			exp.processedData["label"].append(exp.label)
-
-			#Now we loop through and get some metrics with a higher time resolution
-			if exp.icLogfileURL and exp.current > 0.0:
-				timeWindow: int = 900
-				windowDuration: int = 300
-				while timeWindow + (windowDuration / 2) < rawDataExp["runtime_s"].iloc[rawDataExp["runtime_s"].size - 1]:
-					dataFrameWindow: pd.DataFrame = rawDataExp[rawDataExp["runtime_s"] > timeWindow - (windowDuration / 2)]
-					dataFrameWindow= dataFrameWindow[dataFrameWindow["runtime_s"] < timeWindow + (windowDuration / 2)]
-					if dataFrameWindow["co2_ppm"].dropna().size > 0 and dataFrameWindow["voltage_v"].dropna().size > 0:
-						trm: EDMetricCalculations = EDMetricCalculations(dataFrameWindow, exp)
-						
-						trPowerConsumptionTuple: Tuple[float, float] = (0.0, 0.0)
-						try:
-							trPowerConsumptionTuple = trm.GetPowerConsumption()
-						except Exception as e:
-							print (e, file=sys.stderr)
-
-						releaseAmineConcTuple: Tuple[float, float] = ic_calculations.LinearRegression(rawDataIC["time_min"], rawDataIC["amine_mol/kg"])
-						releaseAmineConc: float = releaseAmineConcTuple[0] * (float(timeWindow) / 60.0) + releaseAmineConcTuple[1]
-
-						if releaseAmineConc >= 0.0:
-							exp.timeResolvedData["time_min"].append((float(timeWindow) / 60.0))
-							exp.timeResolvedData["powerConsumption"].append(trPowerConsumptionTuple[0])
-							exp.timeResolvedData["powerConsumptionError"].append(trPowerConsumptionTuple[1])
-							exp.timeResolvedData["label"].append(exp.label)
-							exp.timeResolvedData["releaseAmineConc"].append(releaseAmineConc)
-
-					timeWindow += windowDuration
-
-
+					print ("WARNING: results manifest could not be saved (%s)" % (e), file=sys.stderr)
+
+		#Experiments that couldn't be downloaded or processed are left out of the plots
+		self.Experiments = self.processedExperiments
+
+		#Forget the results of experiments that have been removed from the dashboard
+		if self.warmResults is not None:
+			self.warmResults = {exp.experimentID: self.warmResults[exp.experimentID] for exp in self.Experiments if exp.experimentID in self.warmResults}
+
+		#Build the IC data from every experiment into one table, for plotting later. The CO2 and voltage data stay in rawDataAll's per-channel arrays
+		self.rawDataICAll: pd.DataFrame = self.rawDataICAccumulator.ToDataFrame()
+
+	#Returns True if the cleaned series of an experiment were stored by an earlier run with the same settings. --refresh always processes the logfiles again
+	def IsStored(self, exp: ExperimentMeta) -> bool:
+		if self.seriesStore is None or self.refresh:
+			return False
+		return self.seriesStore.Open(exp.experimentID, SeriesParameters(exp, self.processingSettings)) is not None
+
+	#Returns the fingerprint of everything an experiment's results depend on, or None if its logfiles aren't all cached, in which case their contents aren't known until they are downloaded
+	def ResultFingerprint(self, exp: ExperimentMeta) -> str:
+		if self.logfileCache is None:
+			return None
+
+		logfileHashes: List[str] = []
+		for url in (exp.CO2LogfileURL, exp.voltageLogfileURL, exp.icLogfileURL):
+			if not url:
+				logfileHashes.append("")
+				continue
+			logfileHash: str = self.logfileCache.Hash(exp.experimentID, url)
+			if logfileHash is None:
+				return None
+			logfileHashes.append(logfileHash)
+
+		return Fingerprint(ResultInputs(exp, self.processingSettings, logfileHashes))
+
+	#Returns the results saved for an experiment by an earlier run, if none of its inputs have changed since. Returns None if it needs processing
+	def ReusedResult(self, exp: ExperimentMeta) -> ExperimentResult:
+		#In watch mode, results still in memory are reused as long as the experiment's row hasn't changed
+		if self.warmResults is not None and exp.experimentID in self.warmResults:
+			signature, result = self.warmResults[exp.experimentID]
+			if signature == self.WarmSignature(exp):
+				return result
+
+		if self.resultsManifest is None or self.force or self.refresh:
+			return None
+		fingerprint: str = self.ResultFingerprint(exp)
+		if fingerprint is None:
+			return None
+		entry: dict = self.resultsManifest.Get(exp.experimentID, fingerprint)
+		if entry is None:
+			return None
+
+		#The stored series are still needed for the raw data plots
+		stored: StoredSeries = self.seriesStore.Open(exp.experimentID, SeriesParameters(exp, self.processingSettings))
+		if stored is None:
+			return None
+		return ReuseExperimentResult(exp, stored, entry["processedData"], entry["timeResolvedData"])
+
+	#Waits for an experiment to finish processing in the pool and adds its result to finished. A failed experiment is reported and skipped
+	def CollectPooledResult(self, exp: ExperimentMeta, future: Future, finished: List[Tuple[ExperimentMeta, ExperimentResult]]) -> None:
+		try:
+			finished.append((exp, future.result()))
+		except Exception as e:
+			print ("WARNING: experiment %s could not be processed (%s)" % (exp.label, e), file=sys.stderr)
+
+	#Works out the averaged and time-resolved metrics of every newly processed experiment in one batch, then merges the results in experiment order
+	#An experiment whose metrics couldn't be worked out has its warnings printed and is skipped
+	def MergeExperimentResults(self, finished: List[Tuple[ExperimentMeta, ExperimentResult]]) -> None:
+		pending: List[Tuple[ExperimentMeta, ExperimentResult]] = [(exp, result) for exp, result in finished if not result.averaged]
+		CalculateBatchMetrics([exp for exp, result in pending], [result for exp, result in pending], self.processingSettings, self.profiler)
+
+		for exp, result in finished:
+			if not result.averaged:
+				for warning in result.warnings:
+					print (warning, file=sys.stderr)
+				continue
+			self.MergeExperimentResult(exp, result)
+
+	def MergeExperimentResult(self, exp: ExperimentMeta, result: ExperimentResult) -> None:
+		for warning in result.warnings:
+			print (warning, file=sys.stderr)
+
+		exp.processedData = result.processedData
+		exp.timeResolvedData = result.timeResolvedData
+		if self.profiler is not None:
+			self.profiler.Merge(result.profile)
+
+		if self.resultsManifest is not None:
+			fingerprint: str = self.ResultFingerprint(exp)
+			if fingerprint is not None:
+				self.resultsManifest.Put(exp.experimentID, fingerprint, result.processedData, result.timeResolvedData)
+
+		#Keep all raw data for plotting later
+		self.rawDataAll.Append(exp.label, result.rawData)
+		if result.rawDataIC is not None:
+			self.rawDataICAccumulator.Append(result.rawDataIC)
+
+		self.processedExperiments.append(exp)
+
+		#Kept so that --watch doesn't process the experiment again until its row changes. Its warnings and profile have been reported, so they aren't repeated when it is reused
+		if self.warmResults is not None:
+			result.warnings = []
+			result.profile = []
+			self.warmResults[exp.experimentID] = (self.WarmSignature(exp), result)
+
+
+	#Returns one column of the raw data against runtime, downsampled to at most maxPoints samples per experiment
+	def PlotSeries(self, column: str) -> pd.DataFrame:
+		series: pd.DataFrame = self.rawDataAll.Frame(column)
+		if self.maxPoints <= 0:
+			return series
+		return DownsampleByLabel(series, "runtime_s", column, self.maxPoints, self.downsampleMethod)
+
+	#Writes every raw sample to a CSV file next to the report and returns its path relative to the report
+	#Channels are written one after another, each with the other channel's column left empty, so that only one channel's table is built at a time
+	#The file is written under a temporary name and then renamed, so a report being viewed never links to a half-written file
+	def WriteFullResolutionData(self) -> str:
+		filename: str = os.path.splitext(self.outputFilename)[0] + "_timeseries.csv"
+		temporaryFilename: str = filename + ".tmp"
+		columns: List[str] = ["label", "runtime_s", "co2_ppm", "voltage_v"]
+		pd.DataFrame(columns=columns).to_csv(temporaryFilename, index=False)
+		for column in ["co2_ppm", "voltage_v"]:
+			self.rawDataAll.Frame(column).reindex(columns=columns).to_csv(temporaryFilename, mode="a", header=False, index=False)
+		os.replace(temporaryFilename, filename)
+		return os.path.basename(filename)
 
 	def PlotData(self) -> None:
+		#plotly takes longer to import than anything else the analysis uses, so it is only loaded once there is something to plot
+		import plotly.express as px # type: ignore
+
 		#Exit program if there are no valid experiments
 		if not len(self.Experiments):
 			raise Exception("Error: No valid experiments found")
 
+		figureStage: StageRecord = BeginStage(self.profiler, "figure_build")
+
 		#Combine all processed data into 1 dataframe:
-		allProcessedData: pd.DataFrame = pd.DataFrame()
-		allTimeResolvedData: pd.DataFrame = pd.DataFrame()
+		processedAccumulator: FrameAccumulator = FrameAccumulator()
+		timeResolvedAccumulator: FrameAccumulator = FrameAccumulator()
 		for exp in self.Experiments:
-			allProcessedData = pd.concat([allProcessedData, pd.DataFrame(exp.processedData)], ignore_index=True)
-			allTimeResolvedData = pd.concat([allTimeResolvedData, pd.DataFrame(exp.timeResolvedData)], ignore_index=True)
+			processedAccumulator.Append(exp.processedData)
+			timeResolvedAccumulator.Append(exp.timeResolvedData)
+		allProcessedData: pd.DataFrame = processedAccumulator.ToDataFrame()
+		allTimeResolvedData: pd.DataFrame = timeResolvedAccumulator.ToDataFrame()
 
 
+		#Long experiments log far more samples than a browser can draw, so the raw time series are downsampled for plotting. --full-data also saves them in full next to the report
+		fullDataLink: str = ""
+		renderMode: str = "auto"
+		if self.webgl:
+			renderMode = "webgl"
+		if self.writeFullData:
+			fullDataLink = self.WriteFullResolutionData()
+
 		#Make list of plots:
 		plots: List[PlotContainer] = []
 
 		#Actual plotting code:
 		currentPlot: PlotContainer = PlotContainer()
 
-		currentPlot.plot = px.line(self.rawDataAll,
+		currentPlot.plot = px.line(self.PlotSeries("voltage_v"),
 			x="runtime_s",
 			y="voltage_v",
-			color="label"
+			color="label",
+			render_mode=renderMode
 		)
 		currentPlot.plot.update_layout(
 			title=dict(text="Voltage vs time", font=dict(size=18)),
@@ -387,14 +717,16 @@ class AnalysisManager(object):
 		)
 		currentPlot.input = "time"
 		currentPlot.output = "voltage"
+		currentPlot.dataLink = fullDataLink
 		plots.append(currentPlot)
 		currentPlot = PlotContainer()
 
 		currentPlot.plot = px.line(
-			self.rawDataAll,
+			self.PlotSeries("co2_ppm"),
 			x="runtime_s",
 			y="co2_ppm",
-			color="label"
+			color="label",
+			render_mode=renderMode
 		)
 		currentPlot.plot.update_layout(
 			title=dict(text="Release CO<sub>2</sub> concentration vs time", font=dict(size=18)),
@@ -404,6 +736,7 @@ class AnalysisManager(object):
 		)
 		currentPlot.input = "time"
 		currentPlot.output = "co2ppm"
+		currentPlot.dataLink = fullDataLink
 		plots.append(currentPlot)
 		currentPlot = PlotContainer()
 
@@ -491,7 +824,8 @@ class AnalysisManager(object):
 		currentPlot.plot = px.bar(
 			allProcessedData,
 			x="label",
-			y="amineFlux"
+			y="amineFlux",
+			error_y="amineFluxError"
 		)
 		currentPlot.plot.update_layout(
 			title=dict(text="Amine crossover flux", font=dict(size=18)),
@@ -524,6 +858,7 @@ class AnalysisManager(object):
 			x="releaseAmineConc",
 			y="powerConsumption",
 			error_y="powerConsumptionError",
+			error_x="releaseAmineConcError",
 			color="label"
 		)
 		currentPlot.plot.update_layout(
@@ -536,67 +871,21 @@ class AnalysisManager(object):
 		currentPlot.output = "powerConsumption"
 		plots.append(currentPlot)
 		
+		EndStage(self.profiler, figureStage)
+		
 		#Add plots to HTML doc:
-		with open(self.outputFilename, 'w', encoding="utf-8") as Writer:
-			Writer.write(f"""\
-<!DOCTYPE html>
-<html>
-<head>
-	<title>microED results</title>
-	<style>
-		{ftos("graphsheet.css")}
-	</style>
-	<script>
-		{ftos("filter.js")}
-	</script>
-</head>
-<body onload="PageLoadInit()">
-	<div class="filter-row">
-		<div class="filter-list" style="margin: 0% -25% 0% 0%;">
-			<p class="filter-title">Filter by input</p>
-			<input type="checkbox" class="input" value="input-time" checked="true"/>
-			<label>Time</label><br>
-			<input type="checkbox" class="input" value="input-experimentalAverage" checked="true"/>
-			<label>Experimental average</label><br>
-			<input type="checkbox" class="input" value="input-releaseAmineConc" checked="true"/>
-			<label>Release amine concentration</label><br>
-			<button onclick="TickAll('input', true)">Select all</button><br>
-			<button onclick="TickAll('input', false)">Deselect all</button><br>
-		</div>
-		<div class="filter-list">
-			<p class="filter-title">Filter by output</p>
-			<input type="checkbox" class="output" value="output-voltage" checked="true"/>
-			<label>Voltage</label><br>
-			<input type="checkbox" class="output" value="output-co2ppm" checked="true"/>
-			<label>CO<sub>2</sub> ppm</label><br>
-			<input type="checkbox" class="output" value="output-powerConsumption" checked="true"/>
-			<label>Power Consumption</label><br>
-			<input type="checkbox" class="output" value="output-currentEfficiency" checked="true"/>
-			<label>Current Efficiency</label><br>
-			<input type="checkbox" class="output" value="output-releaseFlux" checked="true"/>
-			<label>Release flux</label><br>
-			<input type="checkbox" class="output" value="output-amineFlux" checked="true"/>
-			<label>Amine crossing flux</label><br>
-			<input type="checkbox" class="output" value="output-aminePerCO2" checked="true"/>
-			<label>Amine crossed per unit CO2</label><br>
-			<input type="checkbox" class="output" value="output-amineCrossed" checked="true"/>
-			<label>Total amine crossed</label><br>
-			<input type="checkbox" class="output" value="output-stackResistance" checked="true"/>
-			<label>Stack resistance</label><br>
-			<button onclick="TickAll('output', true)">Select all</button><br>
-			<button onclick="TickAll('output', false)">Deselect all</button><br>
-		</div>
-	</div>
-	<div class=\"graph-row\">\n"""
-		)
-			
-			for n in range(0, len(plots)):
-				Writer.write(f"<div class=\"graph-column input-{plots[n].input} output-{plots[n].output}\">\n")
-				Writer.write(plots[n].plot.to_html(full_html=False))
-				Writer.write("</div>")
-				if n % 2 == 1:
-					Writer.write("\t</div>\n")
-					if n < (len(plots) - 1):
-						Writer.write("\t<div class=\"graph-row\">\n")
-
-			Writer.write("</body>\n</html>")
+		report: ReportWriter = ReportWriter(self.outputFilename, self.plotlyjsMode, self.compressReport)
+		with ProfileStage(self.profiler, "html_write"):
+			report.Write(plots)
+		report.PrintSizeReport()
+		self.ReportProfile()
+
+	#Prints the totals of each stage, and writes the record of every stage to a JSON file next to the output file and to the --trace file if one was given
+	def ReportProfile(self) -> None:
+		if self.profiler is None:
+			return
+		self.profiler.WriteJSON(os.path.splitext(self.outputFilename)[0] + "_profile.json")
+		if self.traceFilename:
+			self.profiler.WriteChromeTrace(self.traceFilename)
+		print ()
+		self.profiler.PrintSummary()
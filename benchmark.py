@@ -0,0 +1,365 @@
+#Import pip packages
+from typing import Type, List, Tuple, Dict, Callable
+import numpy as np
+import pandas as pd
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+#Import project files
+from experiment_meta import ExperimentMeta
+from batch_metrics import BatchMetricCalculations
+from outlier_filter import RollingMedianFilter
+from logfile_fetcher import LogfileSet, CO2_CSV_OPTIONS, VOLTAGE_CSV_OPTIONS, IC_CSV_OPTIONS
+from experiment_processor import ProcessingSettings, ExperimentResult, CleanLogfiles, CalculateMetrics, StackResults, CalculateBatchMetrics
+from channel_data import ChannelData
+from frame_accumulator import FrameAccumulator
+from analysis_manager import AnalysisManager
+from profiler import Profiler
+import ic_calculations
+import time_conversion
+
+#Synthetic logs are written in UTC, so that runs never depend on when the clocks change
+BENCHMARK_TIMEZONE: str = "UTC"
+#Sampling intervals of the real loggers and of the IC measurements
+CO2_INTERVAL_S: float = 2.0
+VOLTAGE_INTERVAL_S: float = 10.0
+IC_INTERVAL_MIN: float = 20.0
+#The loggers are started before and stopped after each experiment, so their logfiles hold samples outside its time window
+LOGGER_MARGIN_S: float = 600.0
+#Fraction of samples turned into spikes for the outlier filter to reject
+SPIKE_FRACTION: float = 0.01
+
+#Stages of ProcessData and PlotData timed by the benchmark, in the order they run
+STAGES: Tuple[str, ...] = ("parse_csv", "timestamps", "outlier_filter", "kpis", "time_windows", "linear_regression", "plot_html")
+
+#Arguments to main.py whose startup time is checked by --startup. Neither needs the analysis modules, so both should take little longer than starting the interpreter
+STARTUP_COMMANDS: Dict[str, List[str]] = {"help": ["--help"], "config_gen": ["--config-gen"]}
+
+#literally just a struct holding the logfiles and dashboard row generated for a single experiment
+class SyntheticExperiment(object):
+	def __init__(self, dashboardRow: pd.Series, co2CSV: bytes, voltageCSV: bytes, icCSV: bytes) -> None:
+		self.dashboardRow: pd.Series = dashboardRow
+		self.co2CSV: bytes = co2CSV
+		self.voltageCSV: bytes = voltageCSV
+		self.icCSV: bytes = icCSV
+
+#Returns the contents of a Vaisala CO2 logfile covering startTime to stopTime, plus a margin either side
+def SyntheticCO2Logfile(startTime: pd.Timestamp, stopTime: pd.Timestamp, rng: np.random.Generator) -> bytes:
+	margin: pd.Timedelta = pd.Timedelta(seconds=LOGGER_MARGIN_S)
+	timestamps: pd.DatetimeIndex = pd.date_range(startTime - margin, stopTime + margin, freq=pd.Timedelta(seconds=CO2_INTERVAL_S))
+	n: np.ndarray = np.arange(timestamps.size)
+	co2ppm: np.ndarray = 900.0 + 200.0 * np.sin(n / 500.0) + rng.normal(0.0, 10.0, n.size)
+	co2ppm[rng.random(n.size) < SPIKE_FRACTION] *= 2.0
+
+	preamble: str = "".join("Vaisala GMP251 synthetic log line %d\n" % (line) for line in range(0, 8)) + "Time,CO2 (ppm)\n"
+	body: str = pd.DataFrame({"timestamp": timestamps.strftime(time_conversion.LOGGER_TIMESTAMP_FORMAT), "co2_ppm": co2ppm}).to_csv(index=False, header=False, float_format="%.2f")
+	return (preamble + body).encode("utf-8")
+
+#Returns the contents of an EasyLog voltage logfile covering startTime to stopTime, plus a margin either side
+#The current is switched on a minute into the experiment, so the readings before that are 0 V
+def SyntheticVoltageLogfile(startTime: pd.Timestamp, stopTime: pd.Timestamp, rng: np.random.Generator) -> bytes:
+	margin: pd.Timedelta = pd.Timedelta(seconds=LOGGER_MARGIN_S)
+	timestamps: pd.DatetimeIndex = pd.date_range(startTime - margin, stopTime + margin, freq=pd.Timedelta(seconds=VOLTAGE_INTERVAL_S))
+	n: np.ndarray = np.arange(timestamps.size)
+	voltage: np.ndarray = 3.0 + 0.3 * np.cos(n / 50.0) + rng.normal(0.0, 0.02, n.size)
+	voltage[timestamps < startTime + pd.Timedelta(minutes=1)] = 0.0
+	voltage[rng.random(n.size) < SPIKE_FRACTION] *= 0.5
+
+	preamble: str = "EasyLog USB synthetic,\nSerial number,00000000\n"
+	body: str = pd.DataFrame({
+		"data_index": n + 1,
+		"timestamp": timestamps.strftime(time_conversion.LOGGER_TIMESTAMP_FORMAT),
+		"voltage_v": voltage,
+		"high_alarm": 0,
+		"low_alarm": 0
+	}).to_csv(index=False, float_format="%.4f")
+	return (preamble + body).encode("utf-8")
+
+#Returns the contents of an IC logfile with one measurement every IC_INTERVAL_MIN minutes of the experiment
+def SyntheticICLogfile(durationMinutes: float, rng: np.random.Generator) -> bytes:
+	timeMinutes: np.ndarray = np.arange(0.0, durationMinutes, IC_INTERVAL_MIN)
+	amineMolPerKg: np.ndarray = 0.001 * timeMinutes + rng.normal(0.0, 0.005, timeMinutes.size)
+	return pd.DataFrame({
+		"time_min": timeMinutes,
+		"amine_area": 1.0,
+		"k+_area": 1.0,
+		"amine_ppm": 1.0,
+		"amine_mol/kg": amineMolPerKg,
+		"amine_mol": amineMolPerKg * 0.05
+	}).to_csv(index=False).encode("utf-8")
+
+#Generates the logfiles and dashboard row of one experiment lasting hours. Experiments are spaced a day apart, in the same order as their numbers
+def GenerateExperiment(number: int, hours: float, rng: np.random.Generator) -> SyntheticExperiment:
+	startTime: pd.Timestamp = pd.Timestamp(2024, 1, 1, 9, 0, 0) + pd.Timedelta(days=number * max(1.0, np.ceil(hours / 24.0) + 1.0))
+	stopTime: pd.Timestamp = startTime + pd.Timedelta(hours=hours)
+	experimentID: str = "BENCH%03d" % (number)
+
+	dashboardRow: pd.Series = pd.Series({
+		"Label": "Synthetic experiment %03d" % (number),
+		"Experiment ID": experimentID,
+		"Start time": startTime,
+		"End time": stopTime,
+		"Current / A": 0.5,
+		"Air flow rate": 1.0,
+		"Amine": "MEA",
+		#The logfiles are never downloaded, so these only need to be distinct
+		"CO2 logfile": ["synthetic://%s/co2.csv" % (experimentID)],
+		"Voltage logfile": ["synthetic://%s/voltage.csv" % (experimentID)],
+		"IC data": ["synthetic://%s/ic.csv" % (experimentID)]
+	})
+	return SyntheticExperiment(dashboardRow, SyntheticCO2Logfile(startTime, stopTime, rng), SyntheticVoltageLogfile(startTime, stopTime, rng), SyntheticICLogfile(hours * 60.0, rng))
+
+
+#Adds up the time spent in each stage over one pass of the benchmark
+class StageTimer(object):
+	"""
+	Member variables:
+
+	dict seconds;
+	"""
+
+	def __init__(self) -> None:
+		self.seconds: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+
+	#Calls function with the given arguments, adds the time it took to stage and returns its result
+	def Time(self, stage: str, function: Callable, *args, **kwargs) -> object:
+		start: float = time.perf_counter()
+		result: object = function(*args, **kwargs)
+		self.seconds[stage] += time.perf_counter() - start
+		return result
+
+
+#AnalysisManager holding already processed experiments, so that PlotData can be timed without Notion or any logfiles
+class BenchmarkAnalysisManager(AnalysisManager):
+	def __init__(self, experiments: List[ExperimentMeta], rawDataAll: ChannelData, rawDataICAll: pd.DataFrame, outputFilename: str) -> None:
+		self.Experiments: List[ExperimentMeta] = experiments
+		self.rawDataAll: ChannelData = rawDataAll
+		self.rawDataICAll: pd.DataFrame = rawDataICAll
+		#Same defaults as the command line
+		self.outputFilename: str = outputFilename
+		self.plotlyjsMode: str = "inline"
+		self.compressReport: bool = False
+		self.maxPoints: int = 5000
+		self.downsampleMethod: str = "lttb"
+		self.writeFullData: bool = False
+		self.webgl: bool = False
+		#The benchmark does its own timing
+		self.profiler: Profiler = None
+
+
+#Times every stage of processing and plotting a set of synthetic experiments once
+#Stages are run the same way as CleanLogfiles, CalculateMetrics and CalculateBatchMetrics run them. The experiments are then fully processed, untimed, so that PlotData has every result to plot
+def RunPass(experiments: List[SyntheticExperiment], settings: ProcessingSettings, outputDirectory: str) -> Dict[str, float]:
+	timer: StageTimer = StageTimer()
+	processedExperiments: List[ExperimentMeta] = []
+	results: List[ExperimentResult] = []
+	rawDataAll: ChannelData = ChannelData()
+	rawDataICAccumulator: FrameAccumulator = FrameAccumulator()
+
+	for synthetic in experiments:
+		exp: ExperimentMeta = ExperimentMeta(synthetic.dashboardRow, BENCHMARK_TIMEZONE)
+		logfiles: LogfileSet = LogfileSet(exp)
+		logfiles.rawDataCO2 = timer.Time("parse_csv", pd.read_csv, io.BytesIO(synthetic.co2CSV), **CO2_CSV_OPTIONS)
+		logfiles.rawDataVoltage = timer.Time("parse_csv", pd.read_csv, io.BytesIO(synthetic.voltageCSV), **VOLTAGE_CSV_OPTIONS)
+		logfiles.rawDataIC = timer.Time("parse_csv", pd.read_csv, io.BytesIO(synthetic.icCSV), **IC_CSV_OPTIONS)
+
+		#With runtime_s already added, CleanLogfiles only trims the logfiles and discards outliers
+		logfiles.rawDataCO2["runtime_s"] = timer.Time("timestamps", time_conversion.TimestampsToRuntime, logfiles.rawDataCO2["timestamp"], exp.startTime, settings.co2Timezone)
+		logfiles.rawDataVoltage["runtime_s"] = timer.Time("timestamps", time_conversion.TimestampsToRuntime, logfiles.rawDataVoltage["timestamp"], exp.startTime, settings.voltageTimezone)
+		rawDataCO2, rawDataVoltage, rawDataIC = timer.Time("outlier_filter", CleanLogfiles, logfiles, settings)
+
+		timer.Time("linear_regression", ic_calculations.FitLinearRegression, rawDataIC["time_min"], rawDataIC["amine_mol/kg"])
+		timer.Time("linear_regression", ic_calculations.LinearRegression, rawDataIC["time_min"], rawDataIC["amine_mol"])
+
+		result: ExperimentResult = ExperimentResult()
+		CalculateMetrics(exp, rawDataCO2, rawDataVoltage, rawDataIC, settings, result)
+		processedExperiments.append(exp)
+		results.append(result)
+
+	#As in a run, the averaged metrics and time windows of every experiment are worked out in one batch
+	inputData: pd.DataFrame = StackResults(results)
+	batch: BatchMetricCalculations = timer.Time("kpis", BatchMetricCalculations, inputData, [exp.current for exp in processedExperiments], [exp.airFlowRate for exp in processedExperiments])
+	for metric in (batch.GetStackResistance, batch.GetCurrentEfficiency, batch.GetPowerConsumption, batch.GetCO2Flux):
+		timer.Time("kpis", metric)
+	timer.Time("time_windows", TimeWindows, batch, [result.releaseAmineFit for result in results], settings)
+
+	CalculateBatchMetrics(processedExperiments, results, settings)
+	for exp, result in zip(processedExperiments, results):
+		exp.processedData = result.processedData
+		exp.timeResolvedData = result.timeResolvedData
+		rawDataAll.Append(exp.label, result.rawData)
+		rawDataICAccumulator.Append(result.rawDataIC)
+
+	analyzer: BenchmarkAnalysisManager = BenchmarkAnalysisManager(processedExperiments, rawDataAll, rawDataICAccumulator.ToDataFrame(), os.path.join(outputDirectory, "benchmark.html"))
+	#PlotData prints the size of each figure, which would bury the results
+	with contextlib.redirect_stdout(io.StringIO()):
+		timer.Time("plot_html", analyzer.PlotData)
+
+	return timer.seconds
+
+#The time-resolved loop of CalculateBatchMetrics, without recording its results
+def TimeWindows(batch: BatchMetricCalculations, releaseAmineFits: List[ic_calculations.RegressionFit], settings: ProcessingSettings) -> None:
+	windowExperiment, timeWindows = batch.WindowCentres(settings.windowStart, settings.windowWidth, settings.windowStep)
+	hasData: np.ndarray = batch.HasData(windowExperiment, timeWindows, settings.windowWidth)
+	batch.GetWindowPowerConsumption(windowExperiment[hasData], timeWindows[hasData], settings.windowWidth)
+	for experiment, timeWindow in zip(windowExperiment[hasData], timeWindows[hasData]):
+		releaseAmineFits[experiment].Predict(float(timeWindow) / 60.0)
+		releaseAmineFits[experiment].PredictError(float(timeWindow) / 60.0)
+
+#Generates nExperiments experiments lasting hours each, times repeat passes over them and returns the best and median time of each stage
+def RunBenchmark(nExperiments: int, hours: float, repeat: int, seed: int) -> dict:
+	rng: np.random.Generator = np.random.default_rng(seed)
+	experiments: List[SyntheticExperiment] = [GenerateExperiment(n, hours, rng) for n in range(0, nExperiments)]
+
+	settings: ProcessingSettings = ProcessingSettings()
+	settings.co2Timezone = BENCHMARK_TIMEZONE
+	settings.voltageTimezone = BENCHMARK_TIMEZONE
+	settings.outlierFilter = RollingMedianFilter()
+
+	passes: List[Dict[str, float]] = []
+	with tempfile.TemporaryDirectory() as outputDirectory:
+		for n in range(0, repeat):
+			passes.append(RunPass(experiments, settings, outputDirectory))
+
+	stages: dict = {}
+	for stage in STAGES + ("total",):
+		seconds: List[float] = [sum(timings.values()) if stage == "total" else timings[stage] for timings in passes]
+		stages[stage] = {"best": min(seconds), "median": float(np.median(seconds))}
+
+	return {
+		"experiments": nExperiments,
+		"hours": hours,
+		"rows": {
+			"co2": int(sum(synthetic.co2CSV.count(b"\n") - 9 for synthetic in experiments)),
+			"voltage": int(sum(synthetic.voltageCSV.count(b"\n") - 3 for synthetic in experiments)),
+			"ic": int(sum(synthetic.icCSV.count(b"\n") - 1 for synthetic in experiments))
+		},
+		"stages": stages
+	}
+
+#Runs main.py with each of STARTUP_COMMANDS repeat times, each in a fresh interpreter, and returns the best wall time of each
+#The time taken to start an interpreter which does nothing is returned too, as a reference
+def RunStartupBenchmark(repeat: int) -> Dict[str, float]:
+	mainFilename: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+	commands: Dict[str, List[str]] = {"interpreter": [sys.executable, "-c", "pass"]}
+	for name, arguments in STARTUP_COMMANDS.items():
+		commands[name] = [sys.executable, mainFilename] + arguments
+
+	times: Dict[str, float] = {}
+	#--config-gen writes its file to the working directory, so the commands are run in a temporary one
+	with tempfile.TemporaryDirectory() as workingDirectory:
+		for name, command in commands.items():
+			seconds: List[float] = []
+			for n in range(0, repeat):
+				start: float = time.perf_counter()
+				subprocess.run(command, cwd=workingDirectory, stdout=subprocess.DEVNULL, check=True)
+				seconds.append(time.perf_counter() - start)
+			times[name] = min(seconds)
+	return times
+
+#Prints the best time of each stage for every run. If a baseline is given, each time is followed by its ratio to the baseline's time for the same run
+def PrintResults(runs: List[dict], baseline: dict = None) -> None:
+	baselineRuns: dict = {}
+	if baseline is not None:
+		baselineRuns = {(run["experiments"], run["hours"]): run for run in baseline.get("runs", [])}
+
+	for run in runs:
+		print ("%d experiments x %g h (%d CO2, %d voltage, %d IC rows)" % (run["experiments"], run["hours"], run["rows"]["co2"], run["rows"]["voltage"], run["rows"]["ic"]))
+		baselineRun: dict = baselineRuns.get((run["experiments"], run["hours"]))
+		for stage, timings in run["stages"].items():
+			line: str = "  %-20s %10.4f s" % (stage, timings["best"])
+			if baselineRun is not None and stage in baselineRun["stages"] and baselineRun["stages"][stage]["best"] > 0.0:
+				baselineBest: float = baselineRun["stages"][stage]["best"]
+				line += "   baseline %10.4f s   x%.2f" % (baselineBest, timings["best"] / baselineBest)
+			print (line)
+
+
+#Configure argparse for handling command line arguments
+parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Times each stage of processing and plotting synthetic experiments", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+parser.add_argument("--experiments", action="store", type=int, nargs="+", help="Numbers of experiments to benchmark with. Each is run with every log length. Default is 1 5")
+parser.add_argument("--hours", action="store", type=float, nargs="+", help="Lengths of each experiment's logs in hours. Default is 3 24")
+parser.add_argument("--repeat", action="store", type=int, help="Number of times each run is timed. The best and median times are recorded. Default is 3")
+parser.add_argument("--seed", action="store", type=int, help="Seed for the random numbers in the synthetic logs. Default is 0")
+parser.add_argument("-o", "--output", action="store", help="Specify the name of the JSON file the results are written to. Default is benchmark.json")
+parser.add_argument("--baseline", action="store", help="JSON file written by an earlier benchmark to compare the results against")
+parser.add_argument("--startup", action="store_true", help="Instead of timing the analysis, check how long main.py takes to start for --help and --config-gen. Exits with status 1 if either is slower than --startup-target")
+parser.add_argument("--startup-target", action="store", type=float, help="Longest time in seconds that --help and --config-gen may take with --startup. Default is 0.5")
+
+if __name__ == "__main__":
+	config: dict = vars(parser.parse_args())
+
+	experimentCounts: List[int] = [1, 5]
+	if config["experiments"]:
+		experimentCounts = config["experiments"]
+	hoursList: List[float] = [3.0, 24.0]
+	if config["hours"]:
+		hoursList = config["hours"]
+	repeat: int = 3
+	if config["repeat"]:
+		repeat = config["repeat"]
+	seed: int = 0
+	if config["seed"] is not None:
+		seed = config["seed"]
+	outputFilename: str = "benchmark.json"
+	if config["output"]:
+		outputFilename = config["output"]
+
+	startupTarget: float = 0.5
+	if config["startup_target"]:
+		startupTarget = config["startup_target"]
+
+	if min(experimentCounts) < 1 or min(hoursList) <= 0.0 or repeat < 1:
+		print ("Error: the numbers of experiments, log lengths and repeats must be positive", file=sys.stderr)
+		sys.exit(1)
+
+	baseline: dict = None
+	if config["baseline"]:
+		try:
+			with open(config["baseline"], "r", encoding="utf-8") as Reader:
+				baseline = json.load(Reader)
+		except Exception as e:
+			print ("Error: baseline could not be read (%s)" % (e), file=sys.stderr)
+			sys.exit(1)
+
+	results: dict = {
+		"date": datetime.datetime.now().isoformat(timespec="seconds"),
+		"python": platform.python_version(),
+		"numpy": np.__version__,
+		"pandas": pd.__version__,
+		"repeat": repeat,
+		"seed": seed
+	}
+
+	if config["startup"]:
+		results["startupTarget"] = startupTarget
+		results["startup"] = RunStartupBenchmark(repeat)
+		tooSlow: List[str] = []
+		for name, seconds in results["startup"].items():
+			line: str = "%-20s %10.4f s" % (name, seconds)
+			if baseline is not None and name in baseline.get("startup", {}):
+				line += "   baseline %10.4f s" % (baseline["startup"][name])
+			if name in STARTUP_COMMANDS and seconds > startupTarget:
+				line += "   slower than the %g s target" % (startupTarget)
+				tooSlow.append(name)
+			print (line)
+	else:
+		results["runs"] = []
+		for nExperiments in experimentCounts:
+			for hours in hoursList:
+				results["runs"].append(RunBenchmark(nExperiments, hours, repeat, seed))
+		PrintResults(results["runs"], baseline)
+
+	with open(outputFilename, "w", encoding="utf-8") as Writer:
+		json.dump(results, Writer, indent=1)
+
+	if config["startup"] and tooSlow:
+		sys.exit(1)
@@ -0,0 +1,68 @@
+#Import pip packages
+from typing import Type, List, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+#Raw time series of every experiment, kept as one set of arrays per channel
+#Stacking the CO2 and voltage logs into one DataFrame leaves every row with a NaN in one column and a full copy of the experiment's label
+#Here each channel holds only its own samples, and each sample records its experiment as a 4 byte index into the list of labels
+class ChannelData(object):
+	"""
+	Member variables:
+
+	list labels;
+	dict blocks;
+	"""
+
+	def __init__(self) -> None:
+		#Label of each experiment, indexed by the experiment numbers stored with each sample
+		self.labels: List[str] = []
+		#(runtime, values, experiment) arrays appended for each channel, combined into one set of arrays per channel the first time it is read
+		self.blocks: Dict[str, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+
+	#Adds the samples of one experiment. channels maps each channel name to its runtime and value arrays. Samples with a missing value are left out
+	def Append(self, label: str, channels: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> None:
+		experiment: int = len(self.labels)
+		self.labels.append(label)
+		for name, (runtime, values) in channels.items():
+			runtime = np.asarray(runtime, dtype=np.float64)
+			values = np.asarray(values, dtype=np.float64)
+			present: np.ndarray = ~np.isnan(values)
+			self.blocks.setdefault(name, []).append((runtime[present], values[present], np.full(np.count_nonzero(present), experiment, dtype=np.int32)))
+
+	def ChannelNames(self) -> List[str]:
+		return list(self.blocks.keys())
+
+	#Returns the runtime, value and experiment number arrays of every sample in a channel, in the order they were appended
+	def Channel(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+		blocks: list = self.blocks.get(name, [])
+		if not blocks:
+			return (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int32))
+		if len(blocks) > 1:
+			#Keep only the combined arrays, so that the blocks can be freed and any later blocks are appended to them
+			blocks[:] = [tuple(np.concatenate([block[n] for block in blocks]) for n in range(0, 3))]
+		return blocks[0]
+
+	#Returns a channel as a long-format DataFrame with runtime_s, value and label columns, which is what plotly express expects
+	#Labels are categorical, so each distinct label is only stored once
+	def Frame(self, name: str) -> pd.DataFrame:
+		runtime, values, experiment = self.Channel(name)
+		return pd.DataFrame({
+			"runtime_s": runtime,
+			name: values,
+			"label": self.LabelColumn(experiment)
+		})
+
+	#Converts experiment numbers to a categorical column of labels. Experiments sharing a label share a category, and categories are in the order experiments were appended
+	def LabelColumn(self, experiment: np.ndarray) -> pd.Categorical:
+		categories: np.ndarray = pd.unique(np.asarray(self.labels, dtype=object))
+		categoryOfLabel: Dict[str, int] = {label: n for n, label in enumerate(categories)}
+		codes: np.ndarray = np.asarray([categoryOfLabel[label] for label in self.labels], dtype=np.int32)
+		return pd.Categorical.from_codes(codes[experiment], categories=categories).remove_unused_categories()
+
+	#Bytes used by the arrays of every channel
+	def MemoryUsage(self) -> int:
+		total: int = 0
+		for name in self.ChannelNames():
+			total += sum(array.nbytes for array in self.Channel(name))
+		return total
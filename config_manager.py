@@ -1,12 +1,51 @@
 import io
 
+#Options that must be converted from strings to integers when loaded from a config file
+INTEGER_OPTIONS: tuple = ("max_points", "jobs", "download_threads", "chunk_rows", "cache_size", "outlier_window", "uncertainty_samples", "uncertainty_seed")
+#Options that must be converted from strings to floats when loaded from a config file
+FLOAT_OPTIONS: tuple = ("outlier_tolerance", "window_start", "window_width", "window_step", "watch_interval", "uncertainty_time_budget")
+#Options that must be converted from strings to booleans when loaded from a config file
+BOOLEAN_OPTIONS: tuple = ("compress", "full_data", "webgl", "exclude", "no_cache", "refresh", "offline", "force", "profile", "watch")
+
 def ConfigGen() -> None:
 	with open(".conf", 'w', encoding="utf-8") as Writer:
 		Writer.write("""\
 #Lines beginning in a \'#\' will be ignored. Empty strings will be ignored.
 #dashboard:
 #output: out.html
-#exclude: False"""
+#plotlyjs: inline
+#compress: False
+#max_points: 5000
+#downsample_method: lttb
+#full_data: False
+#webgl: False
+#exclude: False
+#timezone: Europe/London
+#co2_timezone: Europe/London
+#voltage_timezone: Europe/London
+#outlier_window: 5
+#outlier_tolerance: 0.15
+#window_start: 900
+#window_width: 300
+#window_step: 300
+#error_propagation: linear
+#uncertainty: heuristic
+#uncertainty_samples: 1000
+#uncertainty_time_budget: 0
+#uncertainty_seed: 0
+#jobs: 1
+#download_threads: 4
+#chunk_rows: 0
+#no_cache: False
+#refresh: False
+#force: False
+#offline: False
+#cache_dir: .logfile_cache
+#cache_size: 1024
+#watch: False
+#watch_interval: 60
+#profile: False
+#trace:"""
 	       )
 
 #Dependency for LoadConfig
@@ -43,9 +82,13 @@ def LoadConfig(config: dict) -> None:
 			val: str = line[colonIndex + 1 :]
 
 			if (not config[key]) and val:#First evaluation checks if the key has already been set (as command line arguments should override the config file). Second checks that the value in the config file exists and isn't a null string
-				if key == "exclude":
+				if key in BOOLEAN_OPTIONS:
 					#Convert argument from string to boolean
 					config[key] = val.lower() != "false"
+				elif key in INTEGER_OPTIONS:
+					config[key] = int(val)
+				elif key in FLOAT_OPTIONS:
+					config[key] = float(val)
 				else:
 					config[key] = val
 
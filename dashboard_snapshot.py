@@ -0,0 +1,100 @@
+#Import pip packages
+from typing import Type, List
+import pandas as pd
+import os
+
+#Import project files
+import notion_api
+from notion_api import PAGE_ID_COLUMN, LAST_EDITED_COLUMN
+
+#Local copy of the Notion dashboard which is kept up to date by only downloading pages edited since the last sync
+class DashboardSnapshot(object):
+	"""
+	Member variables:
+
+	char *filename;
+	char *databaseID;
+	dict database;
+	pd.DataFrame dashboard;
+	char **updatedPageIDs;
+	char **removedPageIDs;
+	"""
+
+	def __init__(self, filename: str, databaseID: str, apiKey: str) -> None:
+		self.filename: str = filename
+		self.databaseID: str = databaseID
+		self.apiKey: str = apiKey
+
+		#Raw database object from Notion, which holds the schema needed to convert pages into rows
+		self.database: dict = {}
+		self.dashboard: pd.DataFrame = pd.DataFrame()
+		#IDs of the pages that were downloaded during the last call to Update()
+		self.updatedPageIDs: List[str] = []
+		#IDs of the pages dropped from the snapshot during the last call to Update(), as they have been deleted or archived in Notion
+		self.removedPageIDs: List[str] = []
+
+	#Loads the snapshot from disk. Returns False if there is no usable snapshot
+	def Load(self) -> bool:
+		if not os.path.isfile(self.filename):
+			return False
+
+		try:
+			snapshot: dict = pd.read_pickle(self.filename)
+		except Exception:
+			return False
+
+		if snapshot["databaseID"] != self.databaseID:
+			return False
+
+		self.database = snapshot["database"]
+		self.dashboard = snapshot["dashboard"]
+		return True
+
+	def Save(self) -> None:
+		os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+		temporaryFilename: str = self.filename + ".tmp"
+		pd.to_pickle({"databaseID": self.databaseID, "database": self.database, "dashboard": self.dashboard}, temporaryFilename)
+		os.replace(temporaryFilename, self.filename)
+
+	#Brings the snapshot up to date with Notion and saves it
+	#Only pages edited since the most recent edit in the snapshot are downloaded, unless fullRefresh is set or the database's properties have changed
+	#Deleting or archiving a page doesn't count as an edit, so the IDs of every page are fetched too, and rows for pages that are no longer there are dropped
+	def Update(self, fullRefresh: bool = False) -> None:
+		database: dict = notion_api.RetrieveDatabase(self.databaseID, self.apiKey)
+		self.removedPageIDs = []
+
+		if fullRefresh or not self.Load() or self.dashboard.empty or self.PropertyNames(database) != self.PropertyNames(self.database):
+			pages: List[dict] = notion_api.QueryDatabase(self.databaseID, self.apiKey)
+			self.database = database
+			self.dashboard = notion_api.PagesToDataFrame(pages, database)
+		else:
+			#Notion rounds last_edited_time down to the minute, so pages edited in the same minute as the last sync are fetched again to be safe
+			lastEdited: str = self.dashboard[LAST_EDITED_COLUMN].max()
+			pages = notion_api.QueryDatabase(self.databaseID, self.apiKey, filter={
+				"timestamp": "last_edited_time",
+				"last_edited_time": {"on_or_after": lastEdited}
+			})
+			self.database = database
+			self.Merge(notion_api.PagesToDataFrame(pages, database))
+			#Fetched after the edited pages, so that a page added in between is never dropped
+			self.Prune(notion_api.QueryPageIDs(self.databaseID, self.apiKey))
+
+		self.updatedPageIDs = [page["id"] for page in pages]
+		self.Save()
+
+	#Replaces rows of the snapshot with newer copies of the same pages, and appends pages that are new
+	def Merge(self, updatedRows: pd.DataFrame) -> None:
+		if updatedRows.empty:
+			return
+		unchangedRows: pd.DataFrame = self.dashboard[~self.dashboard[PAGE_ID_COLUMN].isin(updatedRows[PAGE_ID_COLUMN])]
+		self.dashboard = pd.concat([unchangedRows, updatedRows], axis=0, ignore_index=True)
+
+	#Drops the rows of pages that aren't in livePageIDs
+	def Prune(self, livePageIDs: List[str]) -> None:
+		live: pd.Series = self.dashboard[PAGE_ID_COLUMN].isin(livePageIDs)
+		self.removedPageIDs = self.dashboard.loc[~live, PAGE_ID_COLUMN].tolist()
+		self.dashboard = self.dashboard[live].reset_index(drop=True)
+
+	@staticmethod
+	def PropertyNames(database: dict) -> List[str]:
+		return sorted(database.get("properties", {}).keys())
@@ -0,0 +1,82 @@
+#Import pip packages
+from typing import Type, List, Tuple
+import numpy as np
+import pandas as pd
+
+#Ways of picking which samples of a series to plot
+DOWNSAMPLE_METHODS: Tuple[str, ...] = ("lttb", "minmax")
+
+#Largest-Triangle-Three-Buckets: returns the indices of maxPoints samples which keep the visual shape of the series
+#The first and last samples are always kept. The rest of the series is split into equal buckets, and from each bucket the sample forming the largest triangle with the previous pick and the average of the next bucket is kept
+def LTTBIndices(x: np.ndarray, y: np.ndarray, maxPoints: int) -> np.ndarray:
+	nSamples: int = x.size
+	if maxPoints >= nSamples or maxPoints < 3:
+		return np.arange(nSamples)
+
+	#Edges of the maxPoints - 2 buckets between the first and last samples
+	edges: np.ndarray = np.linspace(1, nSamples - 1, maxPoints - 1).astype(np.int64)
+	indices: np.ndarray = np.empty(maxPoints, dtype=np.int64)
+	indices[0] = 0
+	indices[maxPoints - 1] = nSamples - 1
+
+	previous: int = 0
+	for n in range(0, maxPoints - 2):
+		start: int = edges[n]
+		stop: int = edges[n + 1]
+		#The next bucket is represented by its average. The last bucket is followed by the final sample
+		if n + 2 < edges.size:
+			nextStart: int = edges[n + 1]
+			nextStop: int = edges[n + 2]
+		else:
+			nextStart = nSamples - 1
+			nextStop = nSamples
+		averageX: float = x[nextStart : nextStop].mean()
+		averageY: float = y[nextStart : nextStop].mean()
+
+		#Twice the area of each candidate's triangle. The constant factor doesn't change which is largest
+		areas: np.ndarray = np.abs((x[previous] - averageX) * (y[start : stop] - y[previous]) - (x[previous] - x[start : stop]) * (averageY - y[previous]))
+		previous = start + int(np.argmax(areas))
+		indices[n + 1] = previous
+
+	return indices
+
+#Returns the indices of at most maxPoints samples in their original order. The first and last samples are always kept, as is the smallest and largest sample of each of (maxPoints - 2) / 2 equal buckets
+#Unlike LTTB this never hides a spike, at the cost of a noisier looking line
+def MinMaxIndices(x: np.ndarray, y: np.ndarray, maxPoints: int) -> np.ndarray:
+	nSamples: int = x.size
+	if maxPoints >= nSamples or maxPoints < 3:
+		return np.arange(nSamples)
+
+	#Two samples are set aside for the first and last, so the plotted line covers the same time as the series
+	nBuckets: int = (maxPoints - 2) // 2
+	edges: np.ndarray = np.linspace(0, nSamples, nBuckets + 1).astype(np.int64)
+	indices: set = {0, nSamples - 1}
+	for n in range(0, nBuckets):
+		bucket: np.ndarray = y[edges[n] : edges[n + 1]]
+		indices.add(edges[n] + int(np.argmin(bucket)))
+		indices.add(edges[n] + int(np.argmax(bucket)))
+
+	return np.asarray(sorted(indices), dtype=np.int64)
+
+#Downsamples each label's series in a long-format DataFrame to at most maxPoints samples, keeping the labels in the order they first appear
+#Samples where y is missing are dropped first. Samples must be in order of x within each label
+def DownsampleByLabel(frame: pd.DataFrame, x: str, y: str, maxPoints: int, method: str = "lttb", label: str = "label") -> pd.DataFrame:
+	if method not in DOWNSAMPLE_METHODS:
+		raise Exception("ERROR: \"%s\" is not a downsampling method. Use one of: %s" % (method, ", ".join(DOWNSAMPLE_METHODS)))
+
+	frame = frame.dropna(subset=[y])
+	xValues: np.ndarray = frame[x].to_numpy(dtype=np.float64)
+	yValues: np.ndarray = frame[y].to_numpy(dtype=np.float64)
+	groups: dict = frame.groupby(label, sort=False).indices
+
+	keep: List[np.ndarray] = []
+	for key in pd.unique(frame[label]):
+		positions: np.ndarray = groups[key]
+		if method == "lttb":
+			keep.append(positions[LTTBIndices(xValues[positions], yValues[positions], maxPoints)])
+		else:
+			keep.append(positions[MinMaxIndices(xValues[positions], yValues[positions], maxPoints)])
+
+	if not keep:
+		return frame
+	return frame.iloc[np.concatenate(keep)]
@@ -1,16 +1,32 @@
 #Import pip packages
-from typing import Type, Tuple
+from typing import Type, Tuple, Union
+import numpy as np
 import pandas as pd
 import sys
 import math
 import datetime
 import time
 from experiment_meta import ExperimentMeta
+from uncertain_array import UncertainArray
+import time_conversion
 
 #Class that is initialised using a slice of a DataFrame and calculates key performance metrics
 class EDMetricCalculations(object):
-	def __init__(self, inputDataWindow: pd.DataFrame, exp: ExperimentMeta) -> None:
-		#Define constants used in calculations
+	def __init__(self, inputDataWindow: pd.DataFrame, exp: ExperimentMeta, propagation: str = "linear") -> None:
+		self.SetConstants(exp.current, exp.airFlowRate, propagation)
+
+		#Make inputs DataFrame available to all member functions
+		self.dataWindow: pd.DataFrame = inputDataWindow
+		#Contiguous float64 copies of the columns used in calculations. NaNs mark rows belonging to the other logger
+		self.runtime: np.ndarray = inputDataWindow["runtime_s"].to_numpy(dtype=np.float64)
+		self.co2ppm: np.ndarray = inputDataWindow["co2_ppm"].to_numpy(dtype=np.float64)
+		self.voltage: np.ndarray = inputDataWindow["voltage_v"].to_numpy(dtype=np.float64)
+
+		#Load some derived values that are often reused across key metric calculations
+		self.totalMolesCO2: Tuple[float, float] = self.GetMolesCO2()
+
+	#Sets the constants used in calculations, along with the experiment's current in A, air flow rate in L min^{-1} and how errors are propagated, which is one of uncertain_array.PROPAGATION_MODES
+	def SetConstants(self, current: float, airFlowRate: float, propagation: str = "linear") -> None:
 		self.MEMBRANE_AREA: float = 0.0006 #m^2
 		self.FARADAY_CONSTANT: float = 96485.0 #C mol^{-1}
 		self.CO2_DENSITY: float = 1.815 #g dm^{-3}
@@ -18,93 +34,134 @@ class EDMetricCalculations(object):
 		self.CO2_MOLAR_MASS: float = 44.01 #g mol^{-1}
 		self.BICARBONATE_CHARGE: float = 1.0 #dimensionless
 
-		#Make inputs DataFrame available to all member functions
-		self.dataWindow: pd.DataFrame = inputDataWindow
-		self.currentSetpoint = exp.current #A
-		self.airFlowRate = exp.airFlowRate / 60.0 #converted to L s^{-1}
-
-		#Load some derived values that are often reused across key metric calculations
-		self.totalMolesCO2: Tuple[float, float] = self.GetMolesCO2()
+		self.currentSetpoint = current #A
+		self.airFlowRate = airFlowRate / 60.0 #converted to L s^{-1}
+		self.propagation: str = propagation
 
 #########################################################
 #DEFINE STATIC FUNCTIONS WITH BASIC ARITHMETIC OPERATIONS
 #########################################################
-	#Division, with functionality for combining errors
+	#Division, with functionality for combining errors. Works element-wise if the tuples hold arrays
+	#Dividing a single value by 0 raises an exception, so that the metric is reported as missing. Arrays give infinity or NaN for those elements instead
+	#Errors are combined as given by propagation, one of uncertain_array.PROPAGATION_MODES
 	@staticmethod
-	def ErrorDivide(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
-		outputValue = a[0] / b[0]
-		relativeError = (a[1]/a[0]) + (b[1]/b[0]) 
-		outputError = outputValue * relativeError 
-		return (outputValue, outputError)
+	def ErrorDivide(a: Tuple[float, float], b: Tuple[float, float], propagation: str = "linear") -> Tuple[float, float]:
+		if np.ndim(b[0]) == 0 and b[0] == 0.0:
+			raise ZeroDivisionError("ERROR: division by zero")
+		return (UncertainArray.FromTuple(a, propagation) / UncertainArray.FromTuple(b, propagation)).ToTuple()
 
-	#Multiplication, with functionality for combining errors
+	#Multiplication, with functionality for combining errors. Works element-wise if the tuples hold arrays
 	@staticmethod
-	def ErrorMultiply(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
-		outputValue = a[0] * b[0]
-		relativeError = (a[1]/a[0]) + (b[1]/b[0]) 
-		outputError = outputValue * relativeError 
-		return (outputValue, outputError)
+	def ErrorMultiply(a: Tuple[float, float], b: Tuple[float, float], propagation: str = "linear") -> Tuple[float, float]:
+		return (UncertainArray.FromTuple(a, propagation) * UncertainArray.FromTuple(b, propagation)).ToTuple()
 
 	#Converts a datetime-type string to a float representing its UNIX timestamp in seconds
 	@staticmethod
 	def ToUNIXTime(dateString: datetime.datetime) -> float:
-		return time.mktime(dateString.timetuple())
+		return time_conversion.DatetimeToUNIXTime(dateString)
 
 	#Integrates series y wrt series x by drawing trapezia between each set of data points and adding their areas
 	@staticmethod
-	def Integrate(xSeries: pd.Series, ySeries: pd.Series) -> Tuple[float, float]:
-		#Initialize variables for integration loop
-		integral: float = 0.0
-		x: float = 0.0
-		y: float = 0.0
-		x1: float = xSeries.iloc[0]
-		y1: float = ySeries.iloc[0]
-		seriesLength: int = xSeries.size
-
-		#Ensure the length of the two series matches. If not, sets seriesLength to that of the smaller series so as to avoid an index out of range error in the loop
-		if seriesLength != ySeries.size:
+	def Integrate(xSeries: Union[pd.Series, np.ndarray], ySeries: Union[pd.Series, np.ndarray]) -> Tuple[float, float]:
+		x: np.ndarray = np.asarray(xSeries, dtype=np.float64)
+		y: np.ndarray = np.asarray(ySeries, dtype=np.float64)
+		seriesLength: int = x.size
+
+		if seriesLength == 0:
+			raise Exception("ERROR: integration error: cannot integrate an empty series")
+
+		#Ensure the length of the two series matches. If not, sets seriesLength to that of the smaller series so as to avoid an index out of range error
+		if seriesLength != y.size:
 			print ("WARNING: integration error: lengths of x and y series do not match", file=sys.stderr)
-			if seriesLength > ySeries.size:
-				seriesLength = ySeries.size
-		
-		#Actual integration loop
-		for n in range(1, seriesLength):
-			x = x1
-			y = y1
-			x1 = xSeries.iloc[n]
-			y1 = ySeries.iloc[n]
-
-			trapeziumArea: float = ((y + y1) / 2.0) * (x1 - x)
-			integral += trapeziumArea
-		
-		error = ySeries.size * ySeries.std()
+			if seriesLength > y.size:
+				seriesLength = y.size
+
+		#Sum the areas of every trapezium at once
+		integral: float = float(np.sum(((y[0 : seriesLength - 1] + y[1 : seriesLength]) / 2.0) * (x[1 : seriesLength] - x[0 : seriesLength - 1])))
+
+		error: float = y.size * EDMetricCalculations.StandardDeviation(y)
 		return (integral, error)
 
+	#Sample standard deviation ignoring NaNs, matching pd.Series.std(). Returns NaN for fewer than 2 values
+	@staticmethod
+	def StandardDeviation(ip: np.ndarray) -> float:
+		values: np.ndarray = ip[~np.isnan(ip)]
+		if values.size < 2:
+			return math.nan
+		return float(np.std(values, ddof=1))
+
 ############################################
 #DEFINE PRIVATE, NON-STATIC MEMBER FUNCTIONS
 ############################################
 
 	def GetMolesCO2(self) -> Tuple[float, float]:
-		relevantData: pd.DataFrame = self.dataWindow.dropna(subset=["co2_ppm"], ignore_index=True)
-		timeSeries: pd.Series = relevantData["runtime_s"]
+		relevantRows: np.ndarray = ~np.isnan(self.co2ppm)
+		timeSeries: np.ndarray = self.runtime[relevantRows]
 		#Convert CO2 ppm into fraction of CO2
-		co2FractionSeries: pd.Series = relevantData["co2_ppm"].apply(lambda x: (x - 400) / 1000000.0)
+		co2FractionSeries: np.ndarray = (self.co2ppm[relevantRows] - 400) / 1000000.0
 
 		#Combine CO2 fraction and air volumetric flow series to get CO2 volume
-		co2VolumeSeries: pd.Series = co2FractionSeries.apply(lambda x: x * self.airFlowRate)
+		co2VolumeSeries: np.ndarray = co2FractionSeries * self.airFlowRate
 
-		#Get error of CO2 volume
-		co2VolumeError: float = co2VolumeSeries.std()
 		#Get total CO2 volume via integration over time
-		outputTuple: Tuple[float, float] = self.Integrate(timeSeries, co2VolumeSeries)
+		return self.VolumeToMolesCO2(self.Integrate(timeSeries, co2VolumeSeries))
 
+	#Converts a volume of CO2 in L to mol
+	def VolumeToMolesCO2(self, volumeCO2: Tuple[float, float]) -> Tuple[float, float]:
 		#Convert L CO2 to g CO2
-		outputTuple = self.ErrorMultiply(outputTuple, (self.CO2_DENSITY, 0.0))
+		outputTuple: Tuple[float, float] = self.ErrorMultiply(volumeCO2, (self.CO2_DENSITY, 0.0), propagation=self.propagation)
 		#Convert g CO2 to mol CO2
-		outputTuple = self.ErrorDivide(outputTuple, (self.CO2_MOLAR_MASS, 0.0))
+		outputTuple = self.ErrorDivide(outputTuple, (self.CO2_MOLAR_MASS, 0.0), propagation=self.propagation)
 		
 		return outputTuple
 
+	#Works out the energy used per ton of CO2 captured in kWh t^{-1}, given the energy used in J and the CO2 captured in mol
+	def EnergyToPowerConsumption(self, totalEnergy: Tuple[float, float], molesCO2: Tuple[float, float]) -> Tuple[float, float]:
+		#Convert energy to kWh
+		totalEnergy = self.ErrorDivide(totalEnergy, (3600000.0, 0.0), propagation=self.propagation)
+
+		#Work out total g CO2
+		massCO2: Tuple[float, float] = self.ErrorMultiply(molesCO2, (self.CO2_MOLAR_MASS, 0.0), propagation=self.propagation)
+
+		#Convert mass to tons
+		massCO2 = self.ErrorDivide(massCO2, (1000000.0, 0.0), propagation=self.propagation)
+
+		#Work out kWh per ton CO2
+		return self.ErrorDivide(totalEnergy, massCO2, propagation=self.propagation)
+
+	#Works out the current efficiency per cell pair in %, given the CO2 captured in mol over duration s at a current of current A
+	def MolesToCurrentEfficiency(self, molesCO2: Tuple[float, float], duration: float, current: float) -> Tuple[float, float]:
+		#Work out total number of mol of electrons passed:
+		molElectrons: Tuple[float, float] = (duration * current, 0.0) #Gives total coulombs passed
+		molElectrons = self.ErrorDivide(molElectrons, (self.FARADAY_CONSTANT, 0.0), propagation=self.propagation)
+
+		#Work out mol of CO2 per mol of e-
+		currentEfficiency = self.ErrorDivide(molesCO2, molElectrons, propagation=self.propagation)
+		#Convert to %
+		currentEfficiency = self.ErrorMultiply(currentEfficiency, (100.0, 0.0), propagation=self.propagation)
+		#Work out CE per cell pair
+		return self.ErrorDivide(currentEfficiency, (self.MEMBRANE_PAIRS, 0.0), propagation=self.propagation)
+
+	#Works out the CO2 flux in mg m^{-2} s^{-1}, given the CO2 captured in mol over duration s
+	def MolesToCO2Flux(self, molesCO2: Tuple[float, float], duration: float) -> Tuple[float, float]:
+		#Work out total mass of CO2 evolved in g
+		massCO2: Tuple[float, float] = self.ErrorMultiply(molesCO2, (self.CO2_MOLAR_MASS, 0.0), propagation=self.propagation)
+		#Convert mass to mg
+		massCO2 = self.ErrorMultiply(massCO2, (1000.0, 0.0), propagation=self.propagation)
+
+		#Work out CO2 evolution rate in mg/s
+		rateCO2: Tuple[float, float] = self.ErrorDivide(massCO2, (duration, 0.0), propagation=self.propagation)
+
+		#Work out total membrane area:
+		totalArea: Tuple[float, float] = (self.MEMBRANE_PAIRS * self.MEMBRANE_AREA, 0.0)
+
+		#Work out CO2 flux
+		return self.ErrorDivide(rateCO2, totalArea, propagation=self.propagation)
+
+	#Time from the start of the experiment to the last sample in s. The voltage log comes after the CO2 log in the data window, so this is its last sample when there is one
+	def Duration(self) -> float:
+		return self.runtime[self.runtime.size - 1]
+
 ###########################################
 #DEFINE PUBLIC, NON-STATIC MEMBER FUNCTIONS
 ###########################################
@@ -114,77 +171,32 @@ class EDMetricCalculations(object):
 	def GetStackResistance(self) -> Tuple[float, float]:
 		#Extract values and errors from dataframe:
 		current: Tuple[float, float] = (self.currentSetpoint, 0.0)
-		voltage: Tuple[float, float] = (self.dataWindow["voltage_v"].mean(), self.dataWindow["voltage_v"].std())
+		voltage: Tuple[float, float] = (float(np.nanmean(self.voltage)), self.StandardDeviation(self.voltage))
 
 		#Perform arithmetic
-		resistance = self.ErrorDivide(voltage, current)
+		resistance = self.ErrorDivide(voltage, current, propagation=self.propagation)
 		return resistance
 
 	def GetCurrentEfficiency(self) -> Tuple[float, float]:
-		#Extract values and errors from dataframe:
-		runtime: float = self.dataWindow["runtime_s"].iloc[self.dataWindow.shape[0] - 1]
-
-		#Begin arithmetic
-		#Work out total number of mol of electrons passed:
-		molElectrons: Tuple[float, float] = (runtime * self.currentSetpoint, 0.0) #Gives total coulombs passed
-		molElectrons = self.ErrorDivide(molElectrons, (self.FARADAY_CONSTANT, 0.0))
-
-		#Work out mol of CO2 per mol of e-
-		currentEfficiency = self.ErrorDivide(self.totalMolesCO2, molElectrons)
-		#Convert to %
-		currentEfficiency = self.ErrorMultiply(currentEfficiency, (100.0, 0.0))
-		#Work out CE per cell pair
-		currentEfficiency = self.ErrorDivide(currentEfficiency, (self.MEMBRANE_PAIRS, 0.0))
-
-		return currentEfficiency	
+		return self.MolesToCurrentEfficiency(self.totalMolesCO2, self.Duration(), self.currentSetpoint)
 
 
 	def GetPowerConsumption(self) -> Tuple[float, float]:
-		relevantData: pd.DataFrame = self.dataWindow.dropna(subset=["voltage_v"], ignore_index=True)
+		relevantRows: np.ndarray = ~np.isnan(self.voltage)
 		#Extract values and errors from dataframe:
-		powerSeries: pd.Series = relevantData["voltage_v"].dropna().apply(lambda x: x * self.currentSetpoint)
-		timeSeries: pd.Series = relevantData["runtime_s"]
+		powerSeries: np.ndarray = self.voltage[relevantRows] * self.currentSetpoint
+		timeSeries: np.ndarray = self.runtime[relevantRows]
 
 		#Begin arithmetic
 		#Work out total energy in J
 		totalEnergy: Tuple[float, float] = self.Integrate(timeSeries, powerSeries)
 
-		#Convert energy to kWh
-		totalEnergy = self.ErrorDivide(totalEnergy, (3600000.0, 0.0))
-
-		#Work out total g CO2
-		massCO2: Tuple[float, float] = self.ErrorMultiply(self.totalMolesCO2, (self.CO2_MOLAR_MASS, 0.0))
-
-		#Convert mass to tons
-		massCO2 = self.ErrorDivide(massCO2, (1000000.0, 0.0))
-
-		#Work out kWh per ton CO2
-		powerConsumption = self.ErrorDivide(totalEnergy, massCO2)
-
-		return powerConsumption
+		return self.EnergyToPowerConsumption(totalEnergy, self.totalMolesCO2)
 
 
 	def GetCO2Flux(self) -> Tuple[float, float]:
-		#Get duration of relevant data window in s
-		duration: float = self.dataWindow["runtime_s"].iloc[self.dataWindow.shape[0] - 1]
-
-		#Begin arithmetic
-		#Work out total mass of CO2 evolved in g
-		massCO2: Tuple[float, float] = self.ErrorMultiply(self.totalMolesCO2, (self.CO2_MOLAR_MASS, 0.0))
-		#Convert mass to mg
-		massCO2 = self.ErrorMultiply(massCO2, (1000.0, 0.0))
-
-		#Work out CO2 evolution rate in mg/s
-		rateCO2: Tuple[float, float] = self.ErrorDivide(massCO2, (duration, 0.0))
-
-		#Work out total membrane area:
-		totalArea: Tuple[float, float] = (self.MEMBRANE_PAIRS * self.MEMBRANE_AREA, 0.0)
-
-		#Work out CO2 flux
-		fluxCO2 = self.ErrorDivide(rateCO2, totalArea)
-
-		return fluxCO2
+		return self.MolesToCO2Flux(self.totalMolesCO2, self.Duration())
 
 	def GetAverageUNIXTimestamp(self) -> float:
-		timeSeries: pd.Series = self.dataWindow["_time"].apply(self.ToUNIXTime)
-		return timeSeries.mean()
+		timeSeries: np.ndarray = time_conversion.DatetimesToUNIXTime(self.dataWindow["_time"])
+		return float(np.mean(timeSeries))
@@ -7,18 +7,31 @@ import sys
 import copy
 import requests
 
+#Import project files
+from notion_api import PAGE_ID_COLUMN
+import time_conversion
+
+#Every dashboard property read by ExperimentMeta. Queries to Notion only need to download these
+NOTION_PROPERTIES: typing.List[str] = ["Label", "Experiment ID", "Start time", "End time", "Current / A", "Air flow rate", "Amine", "CO2 logfile", "Voltage logfile", "IC data"]
+#Properties which must be filled in for an experiment to count as completed
+COMPLETED_PROPERTIES: typing.List[str] = ["Start time", "End time", "CO2 logfile", "Voltage logfile"]
+
 class ExperimentMeta(object):
 	"""
 	Member variables:
 
 	char *label;
+	char *experimentID;
 	float startTime;
 	float stopTime;
 	dict processedData;
 	"""
 
-	def __init__(self, notionDashboard: pd.Series) -> None:
+	def __init__(self, notionDashboard: pd.Series, timezone: str = time_conversion.DEFAULT_TIMEZONE) -> None:
 		self.label: str = notionDashboard.loc["Label"]
+		self.experimentID: str = notionDashboard.loc["Experiment ID"]
+		#Only set when the dashboard was loaded from a snapshot, as notion_df.download doesn't keep page IDs
+		self.pageID: str = notionDashboard.get(PAGE_ID_COLUMN, "")
 		#self.label = notionDashboard.loc["Experiment ID"]
 		#self.label: str = f'{notionDashboard.loc["Amine concentration / mol kg^{-1}"]}m {notionDashboard.loc["Amine"]}, {notionDashboard.loc["Current density / A m^{-2}"]} A / m2, Initial pH = {notionDashboard.loc["Capture pH initial"]}'
 		startDatetimeString: datetime.datetime = notionDashboard.loc["Start time"].to_pydatetime()
@@ -40,37 +53,43 @@ class ExperimentMeta(object):
 			self.icLogfileURL = notionDashboard.loc["IC data"][0]
 
 		# Convert times to UNIX epoch time (needed for InfluxDB query)
-		self.startTime: float = self.ToUNIXTime(startDatetimeString)
-		self.stopTime: float = self.ToUNIXTime(stopDatetimeString)
+		self.startTime: float = self.ToUNIXTime(startDatetimeString, timezone)
+		self.stopTime: float = self.ToUNIXTime(stopDatetimeString, timezone)
 
 		#print (f"{self.label}: {self.startTime}, {self.stopTime}, {self.CO2LogfileURL}, {self.voltageLogfileURL}")
 
-		#Initialize member variables as empty lists:
+		#Initialize member variables holding the results of processing:
+		#Experiment-averaged results, one value per key, which become a single row of the summary table
 		self.processedData: dict = {
-			"stackResistance" : [],
-			"stackResistanceError" : [],
-			"currentEfficiency" : [],
-			"currentEfficiencyError" : [],
-			"powerConsumption" : [],
-			"powerConsumptionError" : [],
-			"fluxCO2" : [],
-			"fluxCO2Error" : [],
-			"label" : [],
-			"amineFlux" : [],
-			"aminePerCO2" : []
+			"stackResistance" : 0.0,
+			"stackResistanceError" : 0.0,
+			"currentEfficiency" : 0.0,
+			"currentEfficiencyError" : 0.0,
+			"powerConsumption" : 0.0,
+			"powerConsumptionError" : 0.0,
+			"fluxCO2" : 0.0,
+			"fluxCO2Error" : 0.0,
+			"label" : self.label,
+			"amineFlux" : 0.0,
+			"amineFluxError" : 0.0,
+			"amineFitRSquared" : 0.0,
+			"aminePerCO2" : 0.0
 		}
 
+		#Time-resolved results, with one list entry per time window
 		self.timeResolvedData: dict = {
 			"time_min" : [],
 			"powerConsumption" : [],
 			"powerConsumptionError" : [],
 			"releaseAmineConc" : [],
+			"releaseAmineConcError" : [],
 			"label": []
 		}
 
+	#Uses the same timezone rules as the logfile timestamps, so that runtimes stay correct across the GMT/BST switch
 	@staticmethod
-	def ToUNIXTime(ip: datetime.datetime) -> float:
-		return time.mktime(ip.timetuple())
+	def ToUNIXTime(ip: datetime.datetime, timezone: str = time_conversion.DEFAULT_TIMEZONE) -> float:
+		return time_conversion.DatetimeToUNIXTime(ip, timezone)
 
 	# Comparison operator overloads for sorting experiments into chronolocical order
 	def __gt__(self, other) -> bool:
@@ -0,0 +1,398 @@
+#Import pip packages
+from typing import Type, List, Tuple, Dict
+import numpy as np
+import pandas as pd
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+#Import project files
+from experiment_meta import ExperimentMeta
+import ic_calculations
+import time_conversion
+from outlier_filter import RollingMedianFilter
+from batch_metrics import BatchMetricCalculations
+from uncertainty_estimation import UncertaintySettings, UncertaintyEstimate, DrawInputs, EstimateUncertainty
+from logfile_fetcher import LogfileSet
+from logfile_cache import AttachmentID
+from profiler import Profiler, StageRecord, ProfileStage, BeginStage, EndStage
+from series_store import SeriesStore, StoredSeries, CO2_SERIES_COLUMNS, VOLTAGE_SERIES_COLUMNS, IC_SERIES_COLUMNS
+
+#Increase whenever a change to the cleaning of logfiles alters the cleaned series, so that series stored by older versions are cleaned again
+CLEANING_VERSION: int = 2
+#Increase whenever a change to the analysis alters its results, so that results saved by older versions are calculated again
+ANALYSIS_VERSION: int = 2
+
+#Returns the way worker processes are started. They aren't forked from the main process, as its download threads may hold locks that a forked copy would never see released
+#forkserver forks them from a separate process without any threads. It isn't available on Windows, where they are spawned instead
+def WorkerContext() -> multiprocessing.context.BaseContext:
+	if "forkserver" in multiprocessing.get_all_start_methods():
+		return multiprocessing.get_context("forkserver")
+	return multiprocessing.get_context("spawn")
+
+#literally just a struct holding the settings used to process every experiment
+#Must stay picklable, as it is sent to worker processes
+class ProcessingSettings(object):
+	def __init__(self) -> None:
+		self.co2Timezone: str = time_conversion.DEFAULT_TIMEZONE
+		self.voltageTimezone: str = time_conversion.DEFAULT_TIMEZONE
+		self.outlierFilter: RollingMedianFilter = RollingMedianFilter()
+		#Time-resolved metrics are worked out over windows of windowWidth seconds, centred from windowStart seconds into the experiment and moving on by windowStep seconds each time
+		self.windowStart: float = 900.0
+		self.windowWidth: float = 300.0
+		self.windowStep: float = 300.0
+		#Directory of the SeriesStore that cleaned logfiles are saved to. None to not store them
+		self.seriesDirectory: str = None
+		#Set to record how long each stage of processing takes
+		self.profile: bool = False
+		#How errors are combined in the key performance metrics, one of uncertain_array.PROPAGATION_MODES
+		self.errorPropagation: str = "linear"
+		#Whether the errors on the experiment-averaged metrics are instead estimated by resampling, and how
+		self.uncertainty: UncertaintySettings = UncertaintySettings()
+
+#literally just a struct holding everything produced by processing one experiment
+class ExperimentResult(object):
+	def __init__(self) -> None:
+		self.processedData: dict = {}
+		self.timeResolvedData: dict = {}
+		#Cleaned series kept for plotting. rawData maps each logger channel to its (runtime, values) arrays
+		self.rawData: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+		self.rawDataIC: pd.DataFrame = None
+		#Non-fatal problems encountered while processing. These are printed by the parent so that they appear in experiment order
+		self.warnings: List[str] = []
+		#Records of each stage of processing, if settings.profile was set. Worker processes can't add to the parent's Profiler, so they are handed back here
+		self.profile: List[StageRecord] = []
+		#Errors on the experiment-averaged metrics estimated by resampling, keyed as in uncertainty_estimation.UNCERTAINTY_METRICS. Empty unless settings.uncertainty asks for them
+		self.estimatedErrors: Dict[str, float] = {}
+		#Fit of the release side amine concentration against time in minutes, which the time-resolved metrics are reported alongside. None without IC data
+		self.releaseAmineFit: ic_calculations.RegressionFit = None
+		#Set once CalculateBatchMetrics has added the experiment-averaged and time-resolved metrics. Results reused from an earlier run already have them
+		self.averaged: bool = False
+
+#Everything that decides what the cleaned series of an experiment look like. Stored series are only reused if these haven't changed
+#The logfiles are identified by their attachment IDs, which change whenever a new logfile is uploaded to Notion
+def SeriesParameters(exp: ExperimentMeta, settings: ProcessingSettings) -> dict:
+	return {
+		"startTime": float(exp.startTime),
+		"stopTime": float(exp.stopTime),
+		"current": float(exp.current),
+		"co2Logfile": AttachmentID(exp.CO2LogfileURL),
+		"voltageLogfile": AttachmentID(exp.voltageLogfileURL),
+		"icLogfile": AttachmentID(exp.icLogfileURL) if exp.icLogfileURL else "",
+		"co2Timezone": settings.co2Timezone,
+		"voltageTimezone": settings.voltageTimezone,
+		"outlierWindow": settings.outlierFilter.windowSize,
+		"outlierTolerance": settings.outlierFilter.tolerance,
+		"cleaningVersion": CLEANING_VERSION
+	}
+
+#Everything that decides the results of an experiment: its Notion fields, the contents of its logfiles (given by their hashes), the settings and the version of the analysis
+def ResultInputs(exp: ExperimentMeta, settings: ProcessingSettings, logfileHashes: List[str]) -> dict:
+	inputs: dict = SeriesParameters(exp, settings)
+	inputs.update({
+		"label": exp.label,
+		"airFlowRate": float(exp.airFlowRate),
+		"amine": exp.amine,
+		"logfileHashes": logfileHashes,
+		"windowStart": settings.windowStart,
+		"windowWidth": settings.windowWidth,
+		"windowStep": settings.windowStep,
+		"errorPropagation": settings.errorPropagation,
+		#The number of processes doesn't change the estimated errors
+		"uncertainty": {key: value for key, value in vars(settings.uncertainty).items() if key != "workers"},
+		"analysisVersion": ANALYSIS_VERSION
+	})
+	return inputs
+
+#Rebuilds the result of an experiment from metrics saved by an earlier run, with its stored series for plotting
+def ReuseExperimentResult(exp: ExperimentMeta, stored: StoredSeries, processedData: dict, timeResolvedData: dict) -> ExperimentResult:
+	result: ExperimentResult = ExperimentResult()
+	result.processedData = processedData
+	result.timeResolvedData = timeResolvedData
+	result.averaged = True
+
+	result.rawData = ChannelArrays(stored.Frame("co2", CO2_SERIES_COLUMNS), stored.Frame("voltage", VOLTAGE_SERIES_COLUMNS))
+	result.rawDataIC = stored.Frame("ic", IC_SERIES_COLUMNS)
+	if result.rawDataIC is not None:
+		result.rawDataIC["label"] = exp.label
+	return result
+
+#Cleans the logfiles of a single experiment and calculates its key performance metrics
+#Only depends on its arguments, so it can run in a worker process. uncertaintyPool, if given, is the pool the draws for estimating errors are spread across
+def ProcessExperiment(logfiles: LogfileSet, settings: ProcessingSettings, uncertaintyPool: ProcessPoolExecutor = None) -> ExperimentResult:
+	exp: ExperimentMeta = logfiles.exp
+	result: ExperimentResult = ExperimentResult()
+	profiler: Profiler = None
+	if settings.profile:
+		profiler = Profiler()
+
+	with ProfileStage(profiler, "filter", exp.label) as record:
+		record.rowsIn = len(logfiles.rawDataCO2) + len(logfiles.rawDataVoltage)
+		rawDataCO2, rawDataVoltage, rawDataIC = CleanLogfiles(logfiles, settings)
+		record.rowsOut = len(rawDataCO2) + len(rawDataVoltage)
+		#Rows logged outside the experiment's time window count as rejected, as well as outliers
+		record.rowsRejected = record.rowsIn - record.rowsOut
+
+	#Keep the cleaned series so that later runs don't have to download and clean the logfiles again
+	#If the IC logfile is missing it may just have failed to download, so the experiment isn't stored without it
+	if settings.seriesDirectory and (rawDataIC is not None or not exp.icLogfileURL):
+		try:
+			with ProfileStage(profiler, "store_save", exp.label):
+				SeriesStore(settings.seriesDirectory).Save(exp.experimentID, SeriesParameters(exp, settings), {
+					"co2": rawDataCO2[CO2_SERIES_COLUMNS],
+					"voltage": rawDataVoltage[VOLTAGE_SERIES_COLUMNS],
+					"ic": rawDataIC[IC_SERIES_COLUMNS] if rawDataIC is not None else None
+				})
+		except Exception as e:
+			result.warnings.append("WARNING: cleaned data for experiment %s could not be stored (%s)" % (exp.label, e))
+
+	CalculateMetrics(exp, rawDataCO2, rawDataVoltage, rawDataIC, settings, result, profiler, uncertaintyPool)
+	if profiler is not None:
+		result.profile = profiler.records
+	return result
+
+#Calculates the key performance metrics of an experiment from the cleaned series saved by an earlier run, skipping the download and cleaning steps
+#Raises an exception if there isn't a stored copy made with the current settings
+def ProcessStoredExperiment(exp: ExperimentMeta, settings: ProcessingSettings, uncertaintyPool: ProcessPoolExecutor = None) -> ExperimentResult:
+	stored: StoredSeries = SeriesStore(settings.seriesDirectory).Open(exp.experimentID, SeriesParameters(exp, settings))
+	if stored is None:
+		raise Exception("ERROR: no stored data found for experiment %s" % (exp.label))
+
+	result: ExperimentResult = ExperimentResult()
+	profiler: Profiler = None
+	if settings.profile:
+		profiler = Profiler()
+
+	with ProfileStage(profiler, "store_load", exp.label) as record:
+		rawDataCO2: pd.DataFrame = stored.Frame("co2", CO2_SERIES_COLUMNS)
+		rawDataVoltage: pd.DataFrame = stored.Frame("voltage", VOLTAGE_SERIES_COLUMNS)
+		record.rowsOut = len(rawDataCO2) + len(rawDataVoltage)
+
+	CalculateMetrics(exp, rawDataCO2, rawDataVoltage, stored.Frame("ic", IC_SERIES_COLUMNS), settings, result, profiler, uncertaintyPool)
+	if profiler is not None:
+		result.profile = profiler.records
+	return result
+
+#Converts timestamps to runtimes, trims the logfiles to the experiment's start and stop time and discards outliers
+#Returns the CO2, voltage and IC data. The IC data is None if there isn't any
+def CleanLogfiles(logfiles: LogfileSet, settings: ProcessingSettings) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+	exp: ExperimentMeta = logfiles.exp
+	rawDataCO2: pd.DataFrame = logfiles.rawDataCO2
+	rawDataVoltage: pd.DataFrame = logfiles.rawDataVoltage
+	rawDataIC: pd.DataFrame = logfiles.rawDataIC
+
+	#Create new columns with time since start of experiment in seconds. Streamed logfiles already have them
+	if "runtime_s" not in rawDataCO2.columns:
+		rawDataCO2["runtime_s"] = time_conversion.TimestampsToRuntime(rawDataCO2["timestamp"], exp.startTime, settings.co2Timezone)
+	if "runtime_s" not in rawDataVoltage.columns:
+		rawDataVoltage["runtime_s"] = time_conversion.TimestampsToRuntime(rawDataVoltage["timestamp"], exp.startTime, settings.voltageTimezone)
+
+	#Discard data outside of the start/stop time
+	rawDataCO2 = rawDataCO2[rawDataCO2["runtime_s"] >= 0.0]
+	rawDataCO2 = rawDataCO2[rawDataCO2["runtime_s"] <= exp.stopTime - exp.startTime]
+	rawDataVoltage = rawDataVoltage[rawDataVoltage["runtime_s"] >= 0.0]
+	rawDataVoltage = rawDataVoltage[rawDataVoltage["runtime_s"] <= exp.stopTime - exp.startTime]
+
+	#Reset indices so that the dataframes are correctly 0-indexed:
+	rawDataCO2.reset_index(drop=True, inplace=True)
+	rawDataVoltage.reset_index(drop=True, inplace=True)
+
+	#Drop unneeded columns
+	rawDataCO2.drop("timestamp", axis=1, inplace=True)
+	#Only the timestamp and voltage columns are parsed from the voltage logfile, but the other columns are dropped too in case a caller read the whole file
+	rawDataVoltage.drop(["data_index", "timestamp", "high_alarm", "low_alarm"], axis=1, inplace=True, errors="ignore")
+	if rawDataIC is not None:
+		#rawDataIC.drop(["amine_area", "k+_area", "amine_ppm", "amine_mol/kg"], axis=1, inplace=True)
+		rawDataIC.drop(["amine_area", "k+_area", "amine_ppm"], axis=1, inplace=True)
+		rawDataIC["amine_mol/kg"] = rawDataIC["amine_mol/kg"].apply(lambda x: x if x >= 0.0 else 0.0)
+		rawDataIC["amine_mol"] = rawDataIC["amine_mol"].apply(lambda x: x if x >= 0.0 else 0.0)
+
+	#Discard outliers using a rolling median
+	#CO2 data
+	co2Keep: np.ndarray = settings.outlierFilter.KeepMask(rawDataCO2["co2_ppm"].to_numpy())
+	rawDataCO2 = rawDataCO2[co2Keep]
+
+	#Drop outliers for voltage data
+	if exp.current > 0.0:
+		voltageSeries: np.ndarray = rawDataVoltage["voltage_v"].to_numpy()
+		#Drop the readings taken before the current was switched on
+		voltageKeep: np.ndarray = RollingMedianFilter.LeadingAboveMask(voltageSeries, 0.01)
+		voltageKeep[voltageKeep] = settings.outlierFilter.KeepMask(voltageSeries[voltageKeep])
+		rawDataVoltage = rawDataVoltage[voltageKeep]
+
+	rawDataCO2.reset_index(drop=True, inplace=True)
+	rawDataVoltage.reset_index(drop=True, inplace=True)
+	return (rawDataCO2, rawDataVoltage, rawDataIC)
+
+#Returns the runtime and value arrays of each logger channel, which is how the raw data is kept for plotting
+def ChannelArrays(rawDataCO2: pd.DataFrame, rawDataVoltage: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+	return {
+		"co2_ppm": (rawDataCO2["runtime_s"].to_numpy(dtype=np.float64), rawDataCO2["co2_ppm"].to_numpy(dtype=np.float64)),
+		"voltage_v": (rawDataVoltage["runtime_s"].to_numpy(dtype=np.float64), rawDataVoltage["voltage_v"].to_numpy(dtype=np.float64))
+	}
+
+#Calculates the metrics of an experiment that don't need the other experiments' data, and adds them to result
+#The experiment-averaged and time-resolved metrics are worked out afterwards for every experiment at once, by CalculateBatchMetrics
+#If profiler is given, the IC fits and error estimates are recorded as separate stages
+def CalculateMetrics(exp: ExperimentMeta, rawDataCO2: pd.DataFrame, rawDataVoltage: pd.DataFrame, rawDataIC: pd.DataFrame, settings: ProcessingSettings, result: ExperimentResult, profiler: Profiler = None, uncertaintyPool: ProcessPoolExecutor = None) -> None:
+	#Add experiment ID labels to graph
+	if rawDataIC is not None:
+		rawDataIC["label"] = exp.label
+
+	#Finally, hand the raw data back for plotting later
+	result.rawData = ChannelArrays(rawDataCO2, rawDataVoltage)
+	result.rawDataIC = rawDataIC
+
+
+	#Now process the amine crossing data:
+	#Both fits only depend on the IC data, so they are done once here rather than for every time window
+	icStage: StageRecord = BeginStage(profiler, "ic_fits", exp.label)
+	if rawDataIC is not None:
+		icStage.rowsIn = len(rawDataIC)
+		crossingFit: ic_calculations.RegressionFit = ic_calculations.FitLinearRegression(rawDataIC["time_min"], rawDataIC["amine_mol"])
+		result.releaseAmineFit = ic_calculations.FitLinearRegression(rawDataIC["time_min"], rawDataIC["amine_mol/kg"])
+		#An amine whose molar mass isn't known is reported once, and its flux is 0
+		crossingFluxFactor: float = 0.0
+		try:
+			crossingFluxFactor = ic_calculations.CrossingFluxFactor(exp.amine)
+		except Exception as e:
+			result.warnings.append(str(e))
+		exp.processedData["amineFlux"] = crossingFit.slope * crossingFluxFactor
+		exp.processedData["amineFluxError"] = crossingFit.slopeError * crossingFluxFactor
+		exp.processedData["amineFitRSquared"] = crossingFit.rSquared
+	else:
+		exp.processedData["amineFlux"] = 0.0
+	
+	#I don't like doing this, but plotly needs it
+	exp.processedData["label"] = exp.label
+	EndStage(profiler, icStage)
+
+	#Estimate the errors on the experiment-averaged metrics from the spread over resamples of the data. CalculateBatchMetrics puts them in place of the propagated errors
+	if settings.uncertainty.method != "heuristic":
+		with ProfileStage(profiler, "uncertainty", exp.label) as record:
+			co2Time, co2ppm = result.rawData["co2_ppm"]
+			voltageTime, voltage = result.rawData["voltage_v"]
+			co2Rows: np.ndarray = ~np.isnan(co2ppm)
+			voltageRows: np.ndarray = ~np.isnan(voltage)
+			#The voltage log comes after the CO2 log, so its last sample marks the end of the experiment, as in EDMetricCalculations.Duration
+			duration: float = math.nan
+			if voltageTime.size:
+				duration = float(voltageTime[voltageTime.size - 1])
+			elif co2Time.size:
+				duration = float(co2Time[co2Time.size - 1])
+			drawInputs: DrawInputs = DrawInputs(co2Time[co2Rows], co2ppm[co2Rows], voltageTime[voltageRows], voltage[voltageRows], exp.current, exp.airFlowRate, duration)
+			try:
+				estimate: UncertaintyEstimate = EstimateUncertainty(drawInputs, settings.uncertainty, exp.experimentID, uncertaintyPool)
+				if estimate.samples < settings.uncertainty.samples:
+					result.warnings.append("WARNING: the time budget for estimating errors ran out after %d of %d draws for experiment: %s" % (estimate.samples, settings.uncertainty.samples, exp.label))
+				result.estimatedErrors = estimate.errors
+				record.rowsIn = co2Time.size + voltageTime.size
+				record.rowsOut = estimate.samples
+			except Exception as e:
+				result.warnings.append(str(e))
+
+	result.processedData = exp.processedData
+	result.timeResolvedData = exp.timeResolvedData
+
+#Names of the experiment-averaged metrics in warnings
+AVERAGED_METRICS: Dict[str, str] = {
+	"stackResistance": "stack resistance",
+	"currentEfficiency": "current efficiency",
+	"powerConsumption": "power consumption",
+	"fluxCO2": "CO2 flux"
+}
+
+#Stacks the cleaned data of every result into one table for BatchMetricCalculations, numbering the experiments by their position in the list
+#Each experiment's CO2 log comes before its voltage log, as EDMetricCalculations expects
+def StackResults(results: List[ExperimentResult]) -> pd.DataFrame:
+	frames: List[pd.DataFrame] = []
+	for n, result in enumerate(results):
+		co2Time, co2ppm = result.rawData["co2_ppm"]
+		voltageTime, voltage = result.rawData["voltage_v"]
+		frames.append(pd.DataFrame({
+			"experiment": np.full(co2Time.size + voltageTime.size, n, dtype=np.int64),
+			"runtime_s": np.concatenate((co2Time, voltageTime)),
+			"co2_ppm": np.concatenate((co2ppm, np.full(voltageTime.size, np.nan))),
+			"voltage_v": np.concatenate((np.full(co2Time.size, np.nan), voltage))
+		}))
+	return pd.concat(frames, axis=0, ignore_index=True)
+
+#Works out the experiment-averaged and time-resolved metrics of every experiment at once, from the cleaned data CalculateMetrics handed back in each result
+#The metrics are added to each result's processedData and timeResolvedData, and its averaged flag is set. An experiment whose metrics can't be worked out is left with averaged unset and a warning saying why
+#If profiler is given, the averaged metrics and the time windows are recorded as one stage each, covering every experiment
+def CalculateBatchMetrics(experiments: List[ExperimentMeta], results: List[ExperimentResult], settings: ProcessingSettings, profiler: Profiler = None) -> None:
+	if not results:
+		return
+
+	inputData: pd.DataFrame = StackResults(results)
+
+	#Now we start processing the data
+	kpiStage: StageRecord = BeginStage(profiler, "kpis")
+	kpiStage.rowsIn = len(inputData)
+	batch: BatchMetricCalculations = BatchMetricCalculations(inputData, [exp.current for exp in experiments], [exp.airFlowRate for exp in experiments], propagation=settings.errorPropagation)
+	#Experiments without a current or without data give infinite or NaN elements, which are reported below rather than by numpy
+	with np.errstate(divide="ignore", invalid="ignore"):
+		metrics: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+			"stackResistance": batch.GetStackResistance(),
+			"currentEfficiency": batch.GetCurrentEfficiency(),
+			"powerConsumption": batch.GetPowerConsumption(),
+			"fluxCO2": batch.GetCO2Flux()
+		}
+
+	for n, (exp, result) in enumerate(zip(experiments, results)):
+		#Nothing can be worked out for an experiment without any CO2 data
+		if batch.co2Volume.count[n] == 0:
+			result.warnings.append("WARNING: experiment %s could not be processed (ERROR: integration error: cannot integrate an empty series)" % (exp.label))
+			continue
+
+		for metric, (values, errors) in metrics.items():
+			metricTuple: Tuple[float, float] = (0.0, 0.0)
+			#Only the CO2 flux doesn't depend on the current
+			if exp.current > 0.0 or metric == "fluxCO2":
+				if math.isfinite(values[n]):
+					metricTuple = (float(values[n]), float(result.estimatedErrors.get(metric, errors[n])))
+				else:
+					result.warnings.append("WARNING: could not work out the %s of %s" % (AVERAGED_METRICS[metric], exp.label))
+			result.processedData[metric] = metricTuple[0]
+			result.processedData[metric + "Error"] = metricTuple[1]
+
+		try:
+			result.processedData["aminePerCO2"] = result.processedData["amineFlux"] / result.processedData["fluxCO2"]
+		except ZeroDivisionError as e:
+			result.warnings.append("WARNING: experiment %s could not be processed (%s)" % (exp.label, e))
+			continue
+
+		result.averaged = True
+	kpiStage.rowsOut = sum(result.averaged for result in results)
+	EndStage(profiler, kpiStage)
+
+	#Now we get some metrics with a higher time resolution, which need the IC data and a current
+	windowStage: StageRecord = BeginStage(profiler, "windows")
+	eligible: np.ndarray = np.array([result.averaged and result.releaseAmineFit is not None and exp.current > 0.0 for exp, result in zip(experiments, results)], dtype=bool)
+	windowExperiment, timeWindows = batch.WindowCentres(settings.windowStart, settings.windowWidth, settings.windowStep)
+	hasData: np.ndarray = eligible[windowExperiment] & batch.HasData(windowExperiment, timeWindows, settings.windowWidth)
+	windowExperiment, timeWindows = windowExperiment[hasData], timeWindows[hasData]
+	trPowerConsumption, trPowerConsumptionError = batch.GetWindowPowerConsumption(windowExperiment, timeWindows, settings.windowWidth)
+
+	for n in range(0, timeWindows.size):
+		exp: ExperimentMeta = experiments[windowExperiment[n]]
+		result: ExperimentResult = results[windowExperiment[n]]
+		timeWindow: float = float(timeWindows[n])
+		trPowerConsumptionTuple: Tuple[float, float] = (float(trPowerConsumption[n]), float(trPowerConsumptionError[n]))
+		if not math.isfinite(trPowerConsumptionTuple[0]):
+			result.warnings.append("WARNING: could not work out the power consumption of %s in the time window at %.0f s" % (exp.label, timeWindow))
+			trPowerConsumptionTuple = (0.0, 0.0)
+
+		releaseAmineConc: float = result.releaseAmineFit.Predict(timeWindow / 60.0)
+
+		if releaseAmineConc >= 0.0:
+			result.timeResolvedData["time_min"].append(timeWindow / 60.0)
+			result.timeResolvedData["powerConsumption"].append(trPowerConsumptionTuple[0])
+			result.timeResolvedData["powerConsumptionError"].append(trPowerConsumptionTuple[1])
+			result.timeResolvedData["label"].append(exp.label)
+			result.timeResolvedData["releaseAmineConc"].append(releaseAmineConc)
+			result.timeResolvedData["releaseAmineConcError"].append(result.releaseAmineFit.PredictError(timeWindow / 60.0))
+
+	windowStage.rowsIn = int(timeWindows.size)
+	windowStage.rowsOut = sum(len(result.timeResolvedData["time_min"]) for result in results)
+	EndStage(profiler, windowStage)
@@ -0,0 +1,49 @@
+#Import pip packages
+from typing import Type, List, Union
+import numpy as np
+import pandas as pd
+
+#Collects blocks of rows and builds them into a single DataFrame in one step
+#Concatenating onto an accumulated DataFrame inside a loop copies every row gathered so far on each iteration, which is quadratic in the number of blocks
+class FrameAccumulator(object):
+	"""
+	Member variables:
+
+	list blocks;
+	pd.DataFrame frame;
+	"""
+
+	def __init__(self) -> None:
+		self.blocks: List[Union[pd.DataFrame, dict]] = []
+		#Cached result of the last call to ToDataFrame(), discarded when another block is appended
+		self.frame: pd.DataFrame = None
+
+	#Adds a block of rows. A block can be a DataFrame, or a dict mapping column names to lists, arrays or single values
+	#A dict of single values is treated as one row
+	def Append(self, block: Union[pd.DataFrame, dict]) -> None:
+		self.blocks.append(block)
+		self.frame = None
+
+	def __len__(self) -> int:
+		return len(self.blocks)
+
+	#Builds every block appended so far into one DataFrame
+	def ToDataFrame(self) -> pd.DataFrame:
+		if self.frame is not None:
+			return self.frame
+
+		frames: List[pd.DataFrame] = []
+		for block in self.blocks:
+			if isinstance(block, pd.DataFrame):
+				frames.append(block)
+			else:
+				frames.append(pd.DataFrame({key: (value if np.ndim(value) else [value]) for key, value in block.items()}))
+
+		if frames:
+			self.frame = pd.concat(frames, axis=0, ignore_index=True)
+		else:
+			self.frame = pd.DataFrame()
+
+		#Keep only the combined frame, so the blocks can be freed and any later blocks are appended to it
+		self.blocks = [self.frame]
+		return self.frame
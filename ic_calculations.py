@@ -1,70 +1,111 @@
+import numpy as np
 import pandas as pd
 import sys
 import math
 from typing import Type, Tuple
 
-def LinearRegression(xSeries: pd.Series, ySeries: pd.Series) -> Tuple[float, float]:
-	nElements: int = (xSeries.size, ySeries.size)[xSeries.size > ySeries.size]
+#literally just a struct holding the result of a least squares straight line fit, y = slope * x + offset
+class RegressionFit(object):
+	"""
+	Member variables:
 
-	xTotal: float = 0
-	yTotal: float = 0
-	xSquaredTotal: float = 0
-	ySquaredTotal: float = 0
-	xyTotal: float = 0
+	int nElements;
+	float slope;
+	float offset;
+	float rSquared;
+	float slopeError;
+	float offsetError;
+	float covariance;
+	"""
 
-	for n in range(0, nElements):
-		xTotal += xSeries.iloc[n]
-		yTotal += ySeries.iloc[n]
+	def __init__(self) -> None:
+		self.nElements: int = 0
+		self.slope: float = math.nan
+		self.offset: float = math.nan
+		self.rSquared: float = math.nan
+		#Standard errors of the slope and offset. These need at least 3 points, and are NaN otherwise
+		self.slopeError: float = math.nan
+		self.offsetError: float = math.nan
+		#Covariance of the slope and offset, needed to propagate uncertainty into predicted values
+		self.covariance: float = math.nan
 
-		xSquaredTotal += xSeries.iloc[n] * xSeries.iloc[n]
-		ySquaredTotal += ySeries.iloc[n] * ySeries.iloc[n]
+	#Returns the fitted y value at x
+	def Predict(self, x: float) -> float:
+		return self.slope * x + self.offset
 
-		xyTotal += xSeries.iloc[n] * ySeries.iloc[n]
-	
-	xBar: float = xTotal / nElements
-	yBar: float = yTotal / nElements
+	#Returns the standard error of the fitted y value at x
+	def PredictError(self, x: float) -> float:
+		variance: float = self.offsetError * self.offsetError + x * x * self.slopeError * self.slopeError + 2.0 * x * self.covariance
+		return math.sqrt(max(variance, 0.0))
 
-	sxx: float = xSquaredTotal - (nElements * xBar * xBar)
-	#syy: float = ySquaredTotal - (nElements * yBar * yBar)
-	sxy: float = xyTotal - (nElements * xBar * yBar)
+#Fits a straight line to y against x by least squares. If the series differ in length, the extra values in the longer series are ignored
+def FitLinearRegression(xSeries: pd.Series, ySeries: pd.Series) -> RegressionFit:
+	fit: RegressionFit = RegressionFit()
+	nElements: int = min(len(xSeries), len(ySeries))
+	x: np.ndarray = np.asarray(xSeries, dtype=np.float64)[0 : nElements]
+	y: np.ndarray = np.asarray(ySeries, dtype=np.float64)[0 : nElements]
+	fit.nElements = nElements
+	if nElements == 0:
+		return fit
 
-	slope: float = sxy / sxx
-	offset: float = (-1.0 * slope * xBar) + yBar
-	#pmcc: float = sxy / math.sqrt(sxx * syy)
-	#rSquared: float = pmcc * pmcc
+	xBar: float = x.mean()
+	yBar: float = y.mean()
+	dx: np.ndarray = x - xBar
+	dy: np.ndarray = y - yBar
 
-	return (slope, offset)
+	sxx: float = float(np.dot(dx, dx))
+	syy: float = float(np.dot(dy, dy))
+	sxy: float = float(np.dot(dx, dy))
 
-def CrossingFlux(molPerMinute: float, amine: str) -> float:
-	#Converts crossing rate in mol per minute to crossing flux in mg / m^2 s
-
-	#First determine the molar mass of the amine in g / mol
-	amineMolarMassMap: dict[str, float] = {
-		"MEA": 61.08,
-		"MDEA": 119.16,
-		"PEI-800": 43.07,
-		"PEI": 43.07,
-		"PEI-2000": 43.07,
-		"T2HPED": 292.41,
-		"Arginine": 174.2,
-		"MPA": 75.11
-	}
-
-	molarMass: float = 0.0
+	#A vertical line, or a single point, has no defined slope, which is left as NaN rather than raising
+	with np.errstate(divide="ignore", invalid="ignore"):
+		fit.slope = float(np.float64(sxy) / sxx)
+		fit.offset = float((-1.0 * fit.slope * xBar) + yBar)
+		fit.rSquared = float(np.float64(sxy * sxy) / (sxx * syy))
 
-	try:
-		molarMass = amineMolarMassMap[amine]
-	except Exception as e:
-		print ("WARNING: molar mass of \"%s\" was not found" % (amine), file=sys.stderr)
-	
-	#Convert mol per minute to mol per s
-	op: float = molPerMinute / 60.0
+		if nElements > 2:
+			#Residual variance, with two degrees of freedom used up by the slope and offset
+			residuals: np.ndarray = dy - fit.slope * dx
+			residualVariance: float = float(np.dot(residuals, residuals)) / (nElements - 2)
+			slopeVariance: float = float(np.float64(residualVariance) / sxx)
+			fit.slopeError = math.sqrt(slopeVariance)
+			fit.offsetError = math.sqrt(residualVariance / nElements + xBar * xBar * slopeVariance)
+			fit.covariance = -1.0 * xBar * slopeVariance
+
+	return fit
 
-	#Convert rate to flux
+#Returns the (slope, offset) of a least squares straight line fit. Use FitLinearRegression for the goodness of fit and uncertainties
+def LinearRegression(xSeries: pd.Series, ySeries: pd.Series) -> Tuple[float, float]:
+	fit: RegressionFit = FitLinearRegression(xSeries, ySeries)
+	return (fit.slope, fit.offset)
+
+#Molar masses of the amines used as capture solvents in g / mol
+AMINE_MOLAR_MASSES: dict = {
+	"MEA": 61.08,
+	"MDEA": 119.16,
+	"PEI-800": 43.07,
+	"PEI": 43.07,
+	"PEI-2000": 43.07,
+	"T2HPED": 292.41,
+	"Arginine": 174.2,
+	"MPA": 75.11
+}
+
+#Returns the factor that converts a crossing rate of the amine in mol per minute to a crossing flux in mg / m^2 s
+#Crossing flux is proportional to the crossing rate, so a rate's standard error converts by the same factor
+#Raises an exception if the amine's molar mass isn't known
+def CrossingFluxFactor(amine: str) -> float:
+	if amine not in AMINE_MOLAR_MASSES:
+		raise Exception("WARNING: molar mass of \"%s\" was not found" % (amine))
 	membraneArea: float = 0.006 #m^2
-	op = op / membraneArea
 
-	#convert mol to mg
-	op = op * (molarMass * 1000)
+	#Convert mol per minute to mol per s, then rate to flux, then mol to mg
+	return (1.0 / 60.0) / membraneArea * (AMINE_MOLAR_MASSES[amine] * 1000)
 
-	return op
+#Converts crossing rate in mol per minute to crossing flux in mg / m^2 s. An amine whose molar mass isn't known gives a flux of 0
+def CrossingFlux(molPerMinute: float, amine: str) -> float:
+	try:
+		return molPerMinute * CrossingFluxFactor(amine)
+	except Exception as e:
+		print (e, file=sys.stderr)
+		return molPerMinute * 0.0
@@ -0,0 +1,174 @@
+#Import pip packages
+from typing import Type, List, Tuple
+import numpy as np
+import pandas as pd
+import argparse
+import datetime
+import math
+import sys
+import time
+
+#Import project files
+from outlier_filter import RollingMedianFilter, RollingMedianState
+from logfile_fetcher import CO2_CSV_OPTIONS, VOLTAGE_CSV_OPTIONS
+from logfile_tail import LogfileTail
+from live_metrics import LiveMetricCalculations
+from uncertain_array import PROPAGATION_MODES
+import time_conversion
+
+#Follows the CO2 and voltage logfiles of an experiment that is still running, keeping its key performance metrics up to date
+#Each batch of new rows has its timestamps converted and outliers discarded on its own, then is added to running totals, so the cost of an update depends on the number of new samples rather than the length of the experiment
+class LiveExperiment(object):
+	"""
+	Member variables:
+
+	float startTime;
+	float current;
+	LogfileTail *co2Tail;
+	LogfileTail *voltageTail;
+	LiveMetricCalculations *metrics;
+	"""
+
+	def __init__(self, co2Filename: str, voltageFilename: str, startTime: float, current: float, airFlowRate: float, outlierFilter: RollingMedianFilter, co2Timezone: str = time_conversion.DEFAULT_TIMEZONE, voltageTimezone: str = time_conversion.DEFAULT_TIMEZONE, errorPropagation: str = "linear") -> None:
+		#UNIX time at which the experiment started
+		self.startTime: float = startTime
+		self.current: float = current
+		self.co2Timezone: str = co2Timezone
+		self.voltageTimezone: str = voltageTimezone
+		self.co2Tail: LogfileTail = LogfileTail(co2Filename, CO2_CSV_OPTIONS)
+		self.voltageTail: LogfileTail = LogfileTail(voltageFilename, VOLTAGE_CSV_OPTIONS)
+		self.co2Filter: RollingMedianState = outlierFilter.Start()
+		self.voltageFilter: RollingMedianState = outlierFilter.Start()
+		#Set once a voltage reading shows the current has been switched on. Readings before then are dropped
+		self.currentOn: bool = False
+		self.metrics: LiveMetricCalculations = LiveMetricCalculations(current, airFlowRate, errorPropagation)
+		self.samplesRead: int = 0
+		self.samplesKept: int = 0
+
+	#Converts the timestamps of newly read rows to runtimes, and drops the rows logged before the experiment started
+	def NewSamples(self, rows: pd.DataFrame, column: str, timezone: str) -> Tuple[np.ndarray, np.ndarray]:
+		if len(rows) == 0:
+			return (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64))
+		self.samplesRead += len(rows)
+		runtime: np.ndarray = time_conversion.TimestampsToRuntime(rows["timestamp"], self.startTime, timezone)
+		values: np.ndarray = rows[column].to_numpy(dtype=np.float64)
+		started: np.ndarray = runtime >= 0.0
+		return (runtime[started], values[started])
+
+	#Reads the rows logged since the last update and adds them to the metrics. Returns the number of samples kept
+	def Update(self) -> int:
+		keptBefore: int = self.samplesKept
+
+		runtime, co2ppm = self.NewSamples(self.co2Tail.ReadNewRows(), "co2_ppm", self.co2Timezone)
+		keep: np.ndarray = self.co2Filter.KeepMask(co2ppm)
+		self.metrics.AddCO2(runtime[keep], co2ppm[keep])
+		self.samplesKept += np.count_nonzero(keep)
+
+		runtime, voltage = self.NewSamples(self.voltageTail.ReadNewRows(), "voltage_v", self.voltageTimezone)
+		keep = np.ones(voltage.size, dtype=bool)
+		if self.current > 0.0:
+			if not self.currentOn:
+				keep = RollingMedianFilter.LeadingAboveMask(voltage, 0.01)
+				self.currentOn = bool(np.any(keep))
+			keep[keep] = self.voltageFilter.KeepMask(voltage[keep])
+		self.metrics.AddVoltage(runtime[keep], voltage[keep])
+		self.samplesKept += np.count_nonzero(keep)
+
+		return self.samplesKept - keptBefore
+
+	#Returns the current value of each metric, with NaN for those that can't be worked out from the samples so far
+	def Metrics(self) -> dict:
+		values: dict = {}
+		for name, GetMetric in (("molesCO2", self.metrics.GetMolesCO2), ("energy", self.metrics.GetEnergy), ("currentEfficiency", self.metrics.GetCurrentEfficiency), ("powerConsumption", self.metrics.GetPowerConsumption), ("stackResistance", self.metrics.GetStackResistance)):
+			try:
+				values[name] = GetMetric()
+			except Exception:
+				values[name] = (math.nan, math.nan)
+		return values
+
+	def PrintHeader(self) -> None:
+		print ("%-8s %10s %10s %12s %12s %12s %14s %12s" % ("Time", "Runtime/h", "Samples", "CO2 / mmol", "Energy / kJ", "CE / %", "PC / kWh t^-1", "R / Ohm"))
+
+	def PrintMetrics(self) -> None:
+		values: dict = self.Metrics()
+		print ("%-8s %10.3f %10d %12.4f %12.3f %12.2f %14.1f %12.3f" % (
+			datetime.datetime.now().strftime("%H:%M:%S"),
+			self.metrics.Duration() / 3600.0 if self.samplesKept else 0.0,
+			self.samplesKept,
+			values["molesCO2"][0] * 1000.0,
+			values["energy"][0] / 1000.0,
+			values["currentEfficiency"][0],
+			values["powerConsumption"][0],
+			values["stackResistance"][0]
+		), flush=True)
+
+
+#Configure argparse for handling command line arguments
+parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Follows the CO2 and voltage logfiles of an experiment while it is running, and prints its key performance metrics as new samples are logged", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+parser.add_argument("co2Logfile", action="store", help="CSV file the Vaisala CO2 logger is writing to")
+parser.add_argument("voltageLogfile", action="store", help="CSV file the EasyLog voltage logger is writing to")
+parser.add_argument("--start", action="store", required=True, help="Start time of the experiment, as YYYY-MM-DD HH:MM:SS in --timezone")
+parser.add_argument("--current", action="store", type=float, required=True, help="Current applied to the stack in A")
+parser.add_argument("--air-flow-rate", action="store", type=float, required=True, help="Air flow rate in L min^-1, as entered on the Notion dashboard")
+parser.add_argument("--interval", action="store", type=float, help="Seconds between reads of the logfiles. Default is 10")
+parser.add_argument("--once", action="store_true", help="Read the logfiles once, print the metrics and exit")
+parser.add_argument("--timezone", action="store", help="Timezone of the start time and logger timestamps, e.g. UTC. Default is Europe/London")
+parser.add_argument("--co2-timezone", action="store", help="Timezone of the CO2 logger's timestamps. Default is the value of --timezone")
+parser.add_argument("--voltage-timezone", action="store", help="Timezone of the voltage logger's timestamps. Default is the value of --timezone")
+parser.add_argument("--outlier-window", action="store", type=int, help="Number of accepted samples in the rolling median used to reject outliers in the CO2 and voltage logs. Default is 5")
+parser.add_argument("--outlier-tolerance", action="store", type=float, help="Samples further than this fraction from the rolling median are rejected as outliers. Default is 0.15")
+parser.add_argument("--error-propagation", action="store", help="How errors are combined in the metrics: linear or quadrature. Default is linear")
+
+if __name__ == "__main__":
+	config: dict = vars(parser.parse_args())
+
+	interval: float = 10.0
+	if config["interval"]:
+		interval = config["interval"]
+	timezone: str = time_conversion.DEFAULT_TIMEZONE
+	if config["timezone"]:
+		timezone = config["timezone"]
+	co2Timezone: str = timezone
+	if config["co2_timezone"]:
+		co2Timezone = config["co2_timezone"]
+	voltageTimezone: str = timezone
+	if config["voltage_timezone"]:
+		voltageTimezone = config["voltage_timezone"]
+	outlierWindow: int = 5
+	if config["outlier_window"]:
+		outlierWindow = config["outlier_window"]
+	outlierTolerance: float = 0.15
+	if config["outlier_tolerance"] is not None:
+		outlierTolerance = config["outlier_tolerance"]
+	errorPropagation: str = "linear"
+	if config["error_propagation"]:
+		errorPropagation = config["error_propagation"]
+
+	try:
+		for name in (timezone, co2Timezone, voltageTimezone):
+			time_conversion.ValidateTimezone(name)
+		if errorPropagation not in PROPAGATION_MODES:
+			raise Exception("ERROR: --error-propagation must be one of: %s" % (", ".join(PROPAGATION_MODES)))
+		try:
+			startDatetime: datetime.datetime = datetime.datetime.strptime(config["start"], time_conversion.LOGGER_TIMESTAMP_FORMAT)
+		except ValueError:
+			raise Exception("ERROR: \"%s\" is not a start time of the form YYYY-MM-DD HH:MM:SS" % (config["start"]))
+		live: LiveExperiment = LiveExperiment(config["co2Logfile"], config["voltageLogfile"], time_conversion.DatetimeToUNIXTime(startDatetime, timezone), config["current"], config["air_flow_rate"], RollingMedianFilter(outlierWindow, outlierTolerance), co2Timezone, voltageTimezone, errorPropagation)
+	except Exception as e:
+		print (e, file=sys.stderr)
+		sys.exit(1)
+
+	live.PrintHeader()
+	try:
+		while True:
+			try:
+				if live.Update() > 0 or config["once"]:
+					live.PrintMetrics()
+			except Exception as e:
+				print (e, file=sys.stderr)
+				sys.exit(1)
+			if config["once"]:
+				break
+			time.sleep(interval)
+	except KeyboardInterrupt:
+		pass
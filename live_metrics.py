@@ -0,0 +1,133 @@
+#Import pip packages
+from typing import Type, Tuple
+import numpy as np
+import math
+
+#Import project files
+from ed_metric_calculations import EDMetricCalculations
+
+#Running trapezium integral of y wrt x, for series that grow as samples arrive
+#Gives the same (integral, error) as EDMetricCalculations.Integrate over every sample added so far, without revisiting earlier samples
+class RunningIntegral(object):
+	"""
+	Member variables:
+
+	int count;
+	float integral;
+	float mean;
+	float sumSquares;
+	"""
+
+	def __init__(self) -> None:
+		self.count: int = 0
+		self.integral: float = 0.0
+		#Running mean of y and sum of squared differences from it, which give the standard deviation used as the error
+		self.mean: float = 0.0
+		self.sumSquares: float = 0.0
+		#Last sample added, which the first trapezium of the next batch starts from
+		self.lastX: float = math.nan
+		self.lastY: float = math.nan
+
+	#Adds samples that come after every sample added so far. Samples with a NaN in y should be left out, as EDMetricCalculations leaves them out
+	#Only the new trapezia are summed, and the batch's mean and spread are merged into the running ones (Chan et al.), so each sample costs O(1)
+	def Extend(self, xSeries: np.ndarray, ySeries: np.ndarray) -> None:
+		x: np.ndarray = np.asarray(xSeries, dtype=np.float64)
+		y: np.ndarray = np.asarray(ySeries, dtype=np.float64)
+		if x.size != y.size:
+			raise Exception("ERROR: integration error: lengths of x and y series do not match")
+		if x.size == 0:
+			return
+
+		self.integral += float(np.sum(((y[0 : y.size - 1] + y[1 : y.size]) / 2.0) * (x[1 : x.size] - x[0 : x.size - 1])))
+		if self.count > 0:
+			self.integral += ((self.lastY + y[0]) / 2.0) * (x[0] - self.lastX)
+
+		batchMean: float = float(np.mean(y))
+		batchSumSquares: float = float(np.sum((y - batchMean) ** 2))
+		total: int = self.count + y.size
+		delta: float = batchMean - self.mean
+		self.sumSquares += batchSumSquares + delta * delta * self.count * y.size / total
+		self.mean += delta * y.size / total
+		self.count = total
+
+		self.lastX = float(x[x.size - 1])
+		self.lastY = float(y[y.size - 1])
+
+	#Sample standard deviation of y. Returns NaN for fewer than 2 samples
+	def StandardDeviation(self) -> float:
+		if self.count < 2:
+			return math.nan
+		return math.sqrt(self.sumSquares / (self.count - 1))
+
+	def Integral(self) -> Tuple[float, float]:
+		if self.count == 0:
+			raise Exception("ERROR: integration error: cannot integrate an empty series")
+		return (self.integral, self.count * self.StandardDeviation())
+
+#Key performance metrics of an experiment that is still running, updated as samples arrive rather than recalculated from the whole log
+#Samples are added after outliers have been discarded, and the metrics match those EDMetricCalculations gives for the same samples
+class LiveMetricCalculations(EDMetricCalculations):
+	"""
+	Member variables:
+
+	RunningIntegral *co2Volume;
+	RunningIntegral *energy;
+	RunningIntegral *voltage;
+	float lastCO2Runtime;
+	float lastVoltageRuntime;
+	"""
+
+	def __init__(self, current: float, airFlowRate: float, propagation: str = "linear") -> None:
+		self.SetConstants(current, airFlowRate, propagation)
+		#Volume of CO2 released in L, energy used in J, and voltage, whose mean and spread give the stack resistance
+		self.co2Volume: RunningIntegral = RunningIntegral()
+		self.energy: RunningIntegral = RunningIntegral()
+		self.voltage: RunningIntegral = RunningIntegral()
+		self.lastCO2Runtime: float = math.nan
+		self.lastVoltageRuntime: float = math.nan
+
+	#Adds CO2 samples logged after those already added
+	def AddCO2(self, runtime: np.ndarray, co2ppm: np.ndarray) -> None:
+		runtime = np.asarray(runtime, dtype=np.float64)
+		co2ppm = np.asarray(co2ppm, dtype=np.float64)
+		if runtime.size == 0:
+			return
+		self.lastCO2Runtime = float(runtime[runtime.size - 1])
+		relevantRows: np.ndarray = ~np.isnan(co2ppm)
+		self.co2Volume.Extend(runtime[relevantRows], (co2ppm[relevantRows] - 400) / 1000000.0 * self.airFlowRate)
+
+	#Adds voltage samples logged after those already added
+	def AddVoltage(self, runtime: np.ndarray, voltage: np.ndarray) -> None:
+		runtime = np.asarray(runtime, dtype=np.float64)
+		voltage = np.asarray(voltage, dtype=np.float64)
+		if runtime.size == 0:
+			return
+		self.lastVoltageRuntime = float(runtime[runtime.size - 1])
+		relevantRows: np.ndarray = ~np.isnan(voltage)
+		self.voltage.Extend(runtime[relevantRows], voltage[relevantRows])
+		self.energy.Extend(runtime[relevantRows], voltage[relevantRows] * self.currentSetpoint)
+
+	#Recalculated whenever it is asked for, as it grows with every CO2 sample
+	@property
+	def totalMolesCO2(self) -> Tuple[float, float]:
+		return self.GetMolesCO2()
+
+	def GetMolesCO2(self) -> Tuple[float, float]:
+		return self.VolumeToMolesCO2(self.co2Volume.Integral())
+
+	def Duration(self) -> float:
+		if not math.isnan(self.lastVoltageRuntime):
+			return self.lastVoltageRuntime
+		return self.lastCO2Runtime
+
+	def GetStackResistance(self) -> Tuple[float, float]:
+		current: Tuple[float, float] = (self.currentSetpoint, 0.0)
+		voltage: Tuple[float, float] = (self.voltage.mean if self.voltage.count > 0 else math.nan, self.voltage.StandardDeviation())
+		return self.ErrorDivide(voltage, current, propagation=self.propagation)
+
+	def GetPowerConsumption(self) -> Tuple[float, float]:
+		return self.EnergyToPowerConsumption(self.energy.Integral(), self.totalMolesCO2)
+
+	#Total energy used so far in J
+	def GetEnergy(self) -> Tuple[float, float]:
+		return self.energy.Integral()
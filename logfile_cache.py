@@ -0,0 +1,179 @@
+#Import pip packages
+from typing import Type
+import requests
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse, unquote
+
+#Downloads a logfile and returns its contents. Local paths are also accepted so that logfiles can be read from disk
+def DownloadLogfile(url: str) -> bytes:
+	if urlparse(url).scheme not in ("http", "https"):
+		with open(url, "rb") as Reader:
+			return Reader.read()
+
+	response: requests.Response = requests.get(url, timeout=60)
+	response.raise_for_status()
+	content: bytes = response.content
+
+	#Catch truncated downloads before they end up in the cache
+	expectedLength: str = response.headers.get("Content-Length", "")
+	if expectedLength and int(expectedLength) != len(content) and not response.headers.get("Content-Encoding"):
+		raise Exception("ERROR: download of %s was truncated (%d of %s bytes)" % (AttachmentName(url), len(content), expectedLength))
+
+	return content
+
+#Gets the file name of a Notion attachment from its URL
+#Notion's signed URLs change every time the dashboard is queried, but the file name at the end of the path doesn't
+def AttachmentName(url: str) -> str:
+	return unquote(os.path.basename(urlparse(url).path))
+
+#Identifies the upload behind a Notion attachment URL: the file name, along with the directory it was uploaded to
+#Notion puts every upload in a directory of its own, so a logfile replaced under the same file name gets a new ID, while signing the URL again doesn't change it
+def AttachmentID(url: str) -> str:
+	path: str = urlparse(url).path
+	return "%s/%s" % (unquote(os.path.basename(os.path.dirname(path))), AttachmentName(url))
+
+
+#Persistent on-disk cache of logfile attachments, keyed by experiment ID and attachment ID
+#Least recently used files are evicted once the cache grows past its size budget
+class LogfileCache(object):
+	"""
+	Member variables:
+
+	char *directory;
+	int maxSizeBytes;
+	bool refresh;
+	bool offline;
+	dict index;
+	"""
+
+	def __init__(self, directory: str, maxSizeBytes: int, refresh: bool = False, offline: bool = False) -> None:
+		self.directory: str = directory
+		self.maxSizeBytes: int = maxSizeBytes
+		#If set, every logfile is downloaded again and the cached copy is overwritten
+		self.refresh: bool = refresh
+		#If set, logfiles that aren't already cached raise an exception instead of being downloaded
+		self.offline: bool = offline
+		self.indexFilename: str = os.path.join(directory, "index.json")
+		#Logfiles are downloaded from several threads at once, so access to the index is serialised
+		self.lock: threading.Lock = threading.Lock()
+
+		os.makedirs(directory, exist_ok=True)
+
+		#The index maps each cache key to the file holding it, along with its size, SHA-256 hash and the last time it was used
+		self.index: dict = {}
+		if os.path.isfile(self.indexFilename):
+			try:
+				with open(self.indexFilename, "r", encoding="utf-8") as Reader:
+					self.index = json.load(Reader)
+			except Exception as e:
+				print ("WARNING: logfile cache index could not be read and will be rebuilt (%s)" % (e), file=sys.stderr)
+				self.index = {}
+
+	@staticmethod
+	def Key(experimentID: str, url: str) -> str:
+		return "%s/%s" % (experimentID, AttachmentID(url))
+
+	#Returns the contents of a logfile, downloading it only if there's no valid copy in the cache
+	def Get(self, experimentID: str, url: str) -> bytes:
+		key: str = self.Key(experimentID, url)
+
+		if not self.refresh:
+			content: bytes = self.Read(key)
+			if content is not None:
+				return content
+
+		if self.offline:
+			raise Exception("ERROR: %s is not in the logfile cache and can't be downloaded in offline mode" % (key))
+
+		content = DownloadLogfile(url)
+		self.Write(key, content)
+		return content
+
+	#Returns the cached contents for a key, or None if the key is missing or the file fails its integrity check
+	def Read(self, key: str) -> bytes:
+		with self.lock:
+			entry: dict = self.index.get(key)
+		if entry is None:
+			return None
+
+		#Hash outside of the lock so that other threads aren't held up while large logfiles are checked
+		try:
+			with open(os.path.join(self.directory, entry["file"]), "rb") as Reader:
+				content: bytes = Reader.read()
+		except OSError:
+			content = b""
+		intact: bool = len(content) == entry["size"] and hashlib.sha256(content).hexdigest() == entry["sha256"]
+
+		with self.lock:
+			if not intact:
+				print ("WARNING: cached copy of %s is corrupt and will be downloaded again" % (key), file=sys.stderr)
+				if self.index.get(key) is entry:
+					self.Remove(key)
+					self.SaveIndex()
+				return None
+
+			entry["lastUsed"] = time.time()
+			self.SaveIndex()
+			return content
+
+	#Returns the SHA-256 hash of a cached logfile without reading it, or None if it isn't cached
+	def Hash(self, experimentID: str, url: str) -> str:
+		with self.lock:
+			entry: dict = self.index.get(self.Key(experimentID, url))
+		if entry is None:
+			return None
+		return entry["sha256"]
+
+	def Write(self, key: str, content: bytes) -> None:
+		filename: str = hashlib.sha256(key.encode("utf-8")).hexdigest() + ".csv"
+		path: str = os.path.join(self.directory, filename)
+
+		#Write to a temporary file first so that an interrupted run never leaves a half-written logfile in the cache
+		temporaryPath: str = "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+		with open(temporaryPath, "wb") as Writer:
+			Writer.write(content)
+		os.replace(temporaryPath, path)
+
+		with self.lock:
+			self.index[key] = {
+				"file": filename,
+				"size": len(content),
+				"sha256": hashlib.sha256(content).hexdigest(),
+				"lastUsed": time.time()
+			}
+			self.Evict(key)
+			self.SaveIndex()
+
+	#Removes least recently used logfiles until the cache fits within its size budget. Never evicts the key that was just written
+	#Must be called with the lock held
+	def Evict(self, keep: str) -> None:
+		totalSize: int = sum(entry["size"] for entry in self.index.values())
+		leastRecentlyUsed: list = sorted(self.index.keys(), key=lambda k: self.index[k]["lastUsed"])
+
+		for key in leastRecentlyUsed:
+			if totalSize <= self.maxSizeBytes:
+				break
+			if key == keep:
+				continue
+			totalSize -= self.index[key]["size"]
+			self.Remove(key)
+
+	#Must be called with the lock held
+	def Remove(self, key: str) -> None:
+		entry: dict = self.index.pop(key)
+		try:
+			os.remove(os.path.join(self.directory, entry["file"]))
+		except OSError:
+			pass
+
+	#Must be called with the lock held
+	def SaveIndex(self) -> None:
+		temporaryFilename: str = self.indexFilename + ".tmp"
+		with open(temporaryFilename, "w", encoding="utf-8") as Writer:
+			json.dump(self.index, Writer)
+		os.replace(temporaryFilename, self.indexFilename)
@@ -0,0 +1,169 @@
+#Import pip packages
+from typing import Type, List, Iterator, Callable
+import numpy as np
+import pandas as pd
+import requests
+import io
+from concurrent.futures import ThreadPoolExecutor, Future
+
+#Import project files
+from experiment_meta import ExperimentMeta
+from logfile_cache import LogfileCache, DownloadLogfile, AttachmentName
+from frame_accumulator import FrameAccumulator
+import time_conversion
+from profiler import Profiler, ProfileStage
+
+#literally just a struct holding the logfiles downloaded for a single experiment
+class LogfileSet(object):
+	def __init__(self, exp: ExperimentMeta) -> None:
+		self.exp: ExperimentMeta = exp
+		self.rawDataCO2: pd.DataFrame = None
+		self.rawDataVoltage: pd.DataFrame = None
+		self.rawDataIC: pd.DataFrame = None
+		#Non-fatal problems encountered while downloading. These are printed by the consumer so that they appear in experiment order
+		self.warnings: List[str] = []
+
+
+#Columns read from each logger's CSV, and the types they are parsed as. The rest of the columns are skipped without being parsed
+CO2_COLUMNS: List[str] = ["timestamp", "co2_ppm"]
+CO2_DTYPES: dict = {"timestamp": str, "co2_ppm": np.float64}
+VOLTAGE_COLUMNS: List[str] = ["timestamp", "voltage_v"]
+VOLTAGE_DTYPES: dict = {"timestamp": str, "voltage_v": np.float64}
+
+#pandas.read_csv options for each kind of logfile. The Vaisala CO2 logger writes 8 lines before its header, and the EasyLog voltage logger writes 2
+CO2_CSV_OPTIONS: dict = {"header": 8, "names": ["timestamp", "co2_ppm"], "usecols": CO2_COLUMNS, "dtype": CO2_DTYPES}
+VOLTAGE_CSV_OPTIONS: dict = {"header": 2, "names": ["data_index", "timestamp", "voltage_v", "high_alarm", "low_alarm"], "usecols": VOLTAGE_COLUMNS, "dtype": VOLTAGE_DTYPES}
+IC_CSV_OPTIONS: dict = {"header": 0, "names": ["time_min", "amine_area", "k+_area", "amine_ppm", "amine_mol/kg", "amine_mol"]}
+
+#literally just a struct holding the settings needed to stream logfiles, keeping only the rows inside each experiment's time window
+class StreamingSettings(object):
+	def __init__(self, chunkRows: int, co2Timezone: str = time_conversion.DEFAULT_TIMEZONE, voltageTimezone: str = time_conversion.DEFAULT_TIMEZONE) -> None:
+		#Number of rows parsed at a time
+		self.chunkRows: int = chunkRows
+		self.co2Timezone: str = co2Timezone
+		self.voltageTimezone: str = voltageTimezone
+
+#Parses a logger CSV chunkRows rows at a time, keeping only the rows logged between the experiment's start and stop time, and adds their runtime_s column
+#Loggers write samples in time order, so parsing stops at the first chunk that ends after the stop time. Memory use depends on the length of the experiment rather than the length of the logfile
+#Chunks are only parsed to local times, and rows within a day of the experiment are kept. These are then converted to UTC in one go, so that the hour repeated when the clocks go back is resolved as it is when the whole logfile is read, even if it is split across chunks
+def ReadLogfileWindow(content: io.BytesIO, exp: ExperimentMeta, timezone: str, chunkRows: int, **csvOptions) -> pd.DataFrame:
+	stopRuntime: float = exp.stopTime - exp.startTime
+	kept: FrameAccumulator = FrameAccumulator()
+
+	for chunk in pd.read_csv(content, chunksize=chunkRows, **csvOptions):
+		chunk["local_time"] = time_conversion.ParseTimestamps(chunk["timestamp"])
+		localSeconds: np.ndarray = time_conversion.NaiveSeconds(chunk["local_time"])
+		kept.Append(chunk[(localSeconds >= exp.startTime - time_conversion.MAX_UTC_OFFSET) & (localSeconds <= exp.stopTime + time_conversion.MAX_UTC_OFFSET)])
+		if localSeconds[localSeconds.size - 1] > exp.stopTime + time_conversion.MAX_UTC_OFFSET:
+			break
+
+	if not len(kept):
+		return pd.DataFrame(columns=list(csvOptions["usecols"]) + ["runtime_s"])
+	window: pd.DataFrame = kept.ToDataFrame()
+	window["runtime_s"] = time_conversion.DatetimesToUNIXTime(window.pop("local_time"), timezone) - exp.startTime
+	window = window[(window["runtime_s"] >= 0.0) & (window["runtime_s"] <= stopRuntime)]
+	return window.reset_index(drop=True)
+
+#Gets the raw contents of one logfile, from the cache if one is in use
+#urlAttribute names the member of exp holding the logfile's URL. If the download is refused, the URL may have expired, so urlRefresher is called to update exp and the download is tried again
+def ReadLogfile(exp: ExperimentMeta, urlAttribute: str, cache: LogfileCache, urlRefresher: Callable[[ExperimentMeta], None], profiler: Profiler = None) -> io.BytesIO:
+	for attempt in range(0, 2):
+		url: str = getattr(exp, urlAttribute)
+		#Logfiles in the cache's index are read from disk, so they are profiled separately from downloads
+		cached: bool = cache is not None and not cache.refresh and cache.Hash(exp.experimentID, url) is not None
+		try:
+			with ProfileStage(profiler, "read_cache" if cached else "download", exp.label, AttachmentName(url)) as record:
+				if cache is None:
+					content: bytes = DownloadLogfile(url)
+				else:
+					content = cache.Get(exp.experimentID, url)
+				if not cached:
+					record.bytesTransferred = len(content)
+			return io.BytesIO(content)
+		except requests.HTTPError:
+			if attempt > 0 or urlRefresher is None:
+				raise
+			urlRefresher(exp)
+
+#Downloads and parses every logfile attached to an experiment
+#Raises an exception if the CO2 or voltage logfile can't be read, as the experiment can't be processed without them
+#If streaming is given, the CO2 and voltage logfiles are streamed and only the rows inside the experiment's time window are kept, already with their runtime_s column
+#If profiler is given, reading and parsing each logfile are recorded as separate stages
+def FetchLogfiles(exp: ExperimentMeta, cache: LogfileCache = None, urlRefresher: Callable[[ExperimentMeta], None] = None, streaming: StreamingSettings = None, profiler: Profiler = None) -> LogfileSet:
+	logfiles: LogfileSet = LogfileSet(exp)
+
+	try:
+		co2Logfile: io.BytesIO = ReadLogfile(exp, "CO2LogfileURL", cache, urlRefresher, profiler)
+		with ProfileStage(profiler, "parse", exp.label, "co2") as record:
+			if streaming is None:
+				logfiles.rawDataCO2 = pd.read_csv(co2Logfile, **CO2_CSV_OPTIONS)
+			else:
+				logfiles.rawDataCO2 = ReadLogfileWindow(co2Logfile, exp, streaming.co2Timezone, streaming.chunkRows, **CO2_CSV_OPTIONS)
+			record.rowsOut = len(logfiles.rawDataCO2)
+	except Exception as e:
+		raise Exception("WARNING: Could not download CO2 logfile for experiment: %s (%s)" % (exp.label, e))
+
+	try:
+		voltageLogfile: io.BytesIO = ReadLogfile(exp, "voltageLogfileURL", cache, urlRefresher, profiler)
+		with ProfileStage(profiler, "parse", exp.label, "voltage") as record:
+			if streaming is None:
+				logfiles.rawDataVoltage = pd.read_csv(voltageLogfile, **VOLTAGE_CSV_OPTIONS)
+			else:
+				logfiles.rawDataVoltage = ReadLogfileWindow(voltageLogfile, exp, streaming.voltageTimezone, streaming.chunkRows, **VOLTAGE_CSV_OPTIONS)
+			record.rowsOut = len(logfiles.rawDataVoltage)
+	except Exception as e:
+		raise Exception("WARNING: Could not download Voltage logfile for experiment: %s (%s)" % (exp.label, e))
+
+	#IC data is optional, so the experiment is still processed without it
+	if exp.icLogfileURL:
+		try:
+			icLogfile: io.BytesIO = ReadLogfile(exp, "icLogfileURL", cache, urlRefresher, profiler)
+			with ProfileStage(profiler, "parse", exp.label, "ic") as record:
+				logfiles.rawDataIC = pd.read_csv(icLogfile, **IC_CSV_OPTIONS)
+				record.rowsOut = len(logfiles.rawDataIC)
+		except Exception as e:
+			logfiles.warnings.append("WARNING: Could not download IC logfile for experiment: %s (%s)" % (exp.label, e))
+
+	return logfiles
+
+
+#Producer/consumer pipeline which downloads logfiles for upcoming experiments while the current one is being processed
+class LogfileFetcher(object):
+	"""
+	Member variables:
+
+	int maxConcurrentDownloads;
+	LogfileCache *cache;
+	Profiler *profiler;
+	"""
+
+	def __init__(self, maxConcurrentDownloads: int, cache: LogfileCache = None, urlRefresher: Callable[[ExperimentMeta], None] = None, streaming: StreamingSettings = None, profiler: Profiler = None) -> None:
+		if maxConcurrentDownloads < 1:
+			raise Exception("ERROR: the number of download threads must be at least 1")
+		self.maxConcurrentDownloads: int = maxConcurrentDownloads
+		#Set to None to always download logfiles from Notion
+		self.cache: LogfileCache = cache
+		#Called to get fresh logfile URLs for an experiment if Notion refuses a download
+		self.urlRefresher: Callable[[ExperimentMeta], None] = urlRefresher
+		#Set to stream logfiles, keeping only the rows inside each experiment's time window
+		self.streaming: StreamingSettings = streaming
+		#Set to record how long each logfile takes to download and parse
+		self.profiler: Profiler = profiler
+
+	#Yields one future per experiment, in the same order as the experiments list
+	#At most maxConcurrentDownloads experiments are held at once, counting the one the consumer is working on, which bounds memory use
+	#Calling .result() on a future returns its LogfileSet, or raises the exception that stopped it from downloading
+	def Iterate(self, experiments: List[ExperimentMeta]) -> Iterator[Future]:
+		with ThreadPoolExecutor(max_workers=self.maxConcurrentDownloads) as executor:
+			pending: List[Future] = []
+			nextToSubmit: int = 0
+
+			for n in range(0, len(experiments)):
+				#Top up the queue of downloads in flight
+				while nextToSubmit < len(experiments) and nextToSubmit < n + self.maxConcurrentDownloads:
+					pending.append(executor.submit(FetchLogfiles, experiments[nextToSubmit], self.cache, self.urlRefresher, self.streaming, self.profiler))
+					nextToSubmit += 1
+
+				yield pending[n]
+				#Drop the reference so that the logfiles can be freed once the consumer is done with them
+				pending[n] = None
@@ -0,0 +1,49 @@
+#Import pip packages
+from typing import Type
+import pandas as pd
+import io
+import os
+
+#Reads the rows added to a logger CSV since it was last read, so that a logfile can be followed while the logger is still writing to it
+class LogfileTail(object):
+	"""
+	Member variables:
+
+	char *filename;
+	int offset;
+	int headerLines;
+	dict csvOptions;
+	"""
+
+	def __init__(self, filename: str, csvOptions: dict) -> None:
+		self.filename: str = filename
+		#Bytes of the file read so far
+		self.offset: int = 0
+		#Lines before the first row of data, which are the logger's preamble and the header row
+		self.headerLines: int = csvOptions["header"] + 1
+		#Options for pandas.read_csv, which parses each batch of new lines without a header
+		self.csvOptions: dict = dict(csvOptions)
+		self.csvOptions["header"] = None
+
+	#Returns the rows written since the last call, which is an empty DataFrame if there are none or the file doesn't exist yet
+	#The logger may be part way through writing a line, so only complete lines are read. The rest is read on the next call
+	def ReadNewRows(self) -> pd.DataFrame:
+		content: bytes = b""
+		if os.path.isfile(self.filename):
+			with open(self.filename, "rb") as Reader:
+				size: int = Reader.seek(0, os.SEEK_END)
+				if size < self.offset:
+					raise Exception("ERROR: %s is shorter than when it was last read, so it may have been replaced" % (self.filename))
+				Reader.seek(self.offset)
+				content = Reader.read(size - self.offset)
+
+		content = content[0 : content.rfind(b"\n") + 1]
+		self.offset += len(content)
+
+		while self.headerLines > 0 and content:
+			content = content[content.find(b"\n") + 1 :]
+			self.headerLines -= 1
+
+		if not content.strip():
+			return pd.DataFrame(columns=list(self.csvOptions["usecols"]))
+		return pd.read_csv(io.BytesIO(content), **self.csvOptions)
@@ -1,49 +1,90 @@
 #Import packages from pip
 from typing import Type
-import pandas as pd
 import sys
 import argparse
 import os
 
 #Import project files
-from analysis_manager import AnalysisManager
+#analysis_manager pulls in pandas, numpy and everything else the analysis needs, so it is imported below once the arguments have been parsed. --help and --config-gen don't need it
 import config_manager
 
 #Configure argparse for handling command line arguments
 parser: argparse.ArgumentParser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 parser.add_argument("experimentIDs", action="store", help="List of experiment IDs to include", nargs='*')
 parser.add_argument("-o", "--output", action="store", help="Specify the name of the output file. Default is out.html")
+parser.add_argument("--plotlyjs", action="store", help="How plotly.js is included in the output file: inline embeds it once, sidecar writes it to a separate file next to the output, and cdn loads it from the plotly CDN. Default is inline")
+parser.add_argument("--compress", action="store_true", help="Also write a gzip-compressed copy of the output file")
+parser.add_argument("--max-points", action="store", type=int, help="Maximum number of samples per experiment drawn in the voltage and CO2 vs time plots. 0 draws every sample. Default is 5000")
+parser.add_argument("--downsample-method", action="store", help="How samples are picked when downsampling the time plots: lttb keeps the shape of the line, minmax keeps the smallest and largest sample in each bucket. Default is lttb")
+parser.add_argument("--full-data", action="store_true", help="Also write every sample of the voltage and CO2 logs to a CSV file next to the output file, linked under the time plots")
+parser.add_argument("--webgl", action="store_true", help="Draw the voltage and CO2 vs time plots with WebGL, which stays responsive with more points")
 parser.add_argument("-d", "--dashboard", action="store", help="Specify the ID of the Notion dashboard to read from")
 parser.add_argument("-x", "--exclude", action="store_true", help="Processes all experiments marked as \"Completed\", excluding those supplied as positional arguments")
 #parser.add_argument("-i", "--id-file", action="store", help="Pass the name of a file containing experiment IDs, each on a new line")
 parser.add_argument("--config-gen", action="store_true", help="Generate a config file named ed_data_analysis.conf with all options set to their defaults")
+parser.add_argument("--timezone", action="store", help="Timezone in which logger timestamps and Notion dates without a timezone are interpreted, e.g. UTC. Default is Europe/London")
+parser.add_argument("--co2-timezone", action="store", help="Timezone of the CO2 logger's timestamps. Default is the value of --timezone")
+parser.add_argument("--voltage-timezone", action="store", help="Timezone of the voltage logger's timestamps. Default is the value of --timezone")
+parser.add_argument("--outlier-window", action="store", type=int, help="Number of accepted samples in the rolling median used to reject outliers in the CO2 and voltage logs. Default is 5")
+parser.add_argument("--outlier-tolerance", action="store", type=float, help="Samples further than this fraction from the rolling median are rejected as outliers. Default is 0.15")
+parser.add_argument("--window-start", action="store", type=float, help="Centre of the first time window over which time-resolved metrics are calculated, in seconds from the start of the experiment. Default is 900")
+parser.add_argument("--window-width", action="store", type=float, help="Width of each time window over which time-resolved metrics are calculated, in seconds. Default is 300")
+parser.add_argument("--window-step", action="store", type=float, help="Time between the centres of consecutive time windows, in seconds. Windows overlap if this is less than --window-width. Default is the value of --window-width")
+parser.add_argument("--error-propagation", action="store", help="How errors are combined in the key performance metrics: linear adds relative errors, which is the worst case, and quadrature adds them in quadrature, which assumes they are independent. Default is linear")
+parser.add_argument("--uncertainty", action="store", help="How the errors on the experiment-averaged metrics are worked out: heuristic propagates them through the calculations, bootstrap resamples the CO2 and voltage logs, and montecarlo perturbs the air flow rate, current and sensor readings by their expected errors. Default is heuristic")
+parser.add_argument("--uncertainty-samples", action="store", type=int, help="Number of resamples or perturbed copies of each experiment's data made by --uncertainty bootstrap or montecarlo. Default is 1000")
+parser.add_argument("--uncertainty-time-budget", action="store", type=float, help="Seconds allowed for estimating the errors of each experiment. Once they run out, the errors are estimated from the draws made so far. Default is 0, which sets no limit")
+parser.add_argument("--uncertainty-seed", action="store", type=int, help="Seed for the random draws of --uncertainty. The same seed always gives the same errors. Default is 0")
+parser.add_argument("-j", "--jobs", action="store", type=int, help="Number of worker processes used to process experiments in parallel. Default is 1")
+parser.add_argument("--download-threads", action="store", type=int, help="Maximum number of logfiles downloaded concurrently while experiments are being processed. Default is 4")
+parser.add_argument("--chunk-rows", action="store", type=int, help="Stream the CO2 and voltage logfiles this many rows at a time, keeping only the rows inside each experiment's time window and stopping once it has passed. Keeps memory use down for logfiles covering several experiments. Default is 0, which reads each logfile whole")
+parser.add_argument("--no-cache", action="store_true", help="Always download the dashboard and logfiles from Notion instead of using the local cache")
+parser.add_argument("--refresh", action="store_true", help="Download the whole dashboard and every logfile again and overwrite the cached copies")
+parser.add_argument("--force", action="store_true", help="Process every experiment again, even those whose inputs haven't changed since the last run")
+parser.add_argument("--offline", action="store_true", help="Run entirely from the cached dashboard snapshot and logfiles without contacting Notion")
+parser.add_argument("--cache-dir", action="store", help="Specify the directory in which the dashboard snapshot and downloaded logfiles are cached. Default is .logfile_cache")
+parser.add_argument("--cache-size", action="store", type=int, help="Maximum size of the logfile cache in MB. Least recently used logfiles are evicted once it is full. Default is 1024")
+parser.add_argument("--watch", action="store_true", help="Keep running after the report has been written, polling the dashboard and rewriting the report whenever experiments are added, edited or removed. Only the experiments that changed are processed again")
+parser.add_argument("--watch-interval", action="store", type=float, help="Seconds between polls of the dashboard with --watch. Default is 60")
+parser.add_argument("--profile", action="store_true", help="Record how long each stage takes for every experiment, along with the bytes downloaded, rows processed and peak memory. A summary is printed at the end and every record is written to a JSON file named after the output file")
+parser.add_argument("--trace", action="store", help="Also write the --profile records to this file in the Chrome trace format, which can be opened in chrome://tracing or https://ui.perfetto.dev")
 parser.add_argument("-c", "--config", action="store", help="Specify the name of a config file from which configuration options will be loaded. Options set in this file will always be overridden by command line arguments")
 
-#Actually parse command line arguments and convert from argparse.Namespace to dict
-config: dict = vars(parser.parse_args())
+#Worker processes started by --jobs import this file, so only run the analysis when it is executed directly
+if __name__ == "__main__":
+	#Actually parse command line arguments and convert from argparse.Namespace to dict
+	config: dict = vars(parser.parse_args())
 
-#If the --config-gen flag is set, create the config file and exit
-if config["config_gen"]:
-	config_manager.ConfigGen()
-	sys.exit(0)
+	#If the --config-gen flag is set, create the config file and exit
+	if config["config_gen"]:
+		config_manager.ConfigGen()
+		sys.exit(0)
 
-#If the --config flag isn't set, set it to the default location (./.conf)
-if not config["config"]:
-	config["config"] = ".conf"
+	#If the --config flag isn't set, set it to the default location (./.conf)
+	if not config["config"]:
+		config["config"] = ".conf"
 
-#If a config file exists, load config options from the file
-if os.path.isfile(config["config"]):
-	config_manager.LoadConfig(config)
+	#If a config file exists, load config options from the file
+	if os.path.isfile(config["config"]):
+		config_manager.LoadConfig(config)
 
+	from analysis_manager import AnalysisManager
 
-try:
-	analyzer: AnalysisManager = AnalysisManager(config)
-except Exception as e:
-	print (e, file=sys.stderr)
-	sys.exit(1)
+	try:
+		analyzer: AnalysisManager = AnalysisManager(config)
+	except Exception as e:
+		print (e, file=sys.stderr)
+		sys.exit(1)
 
-try:
-	analyzer.PlotData()
-except Exception as e:
-	print (e, file=sys.stderr)
-	sys.exit(1)
+	try:
+		analyzer.PlotData()
+	except Exception as e:
+		print (e, file=sys.stderr)
+		sys.exit(1)
+
+	#In watch mode, keep running and rewrite the report whenever the dashboard changes
+	if config["watch"]:
+		try:
+			analyzer.Watch()
+		except KeyboardInterrupt:
+			pass
@@ -0,0 +1,147 @@
+#Import pip packages
+from typing import Type, List
+import requests
+import pandas as pd
+import time
+import threading
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor
+
+NOTION_API_URL: str = "https://api.notion.com/v1"
+NOTION_VERSION: str = "2022-06-28"
+NOTION_MAX_PAGE_SIZE: int = 100
+#Notion rejects compound filters with more than 100 conditions
+NOTION_MAX_FILTER_CONDITIONS: int = 100
+
+#Every database has exactly one title property, and Notion always gives it this ID. Asking for just the title keeps queries that only need page IDs small
+TITLE_PROPERTY_ID: str = "title"
+
+#Columns added to dashboards built by this module, used to merge dashboards and to look pages up again later
+PAGE_ID_COLUMN: str = "_page_id"
+LAST_EDITED_COLUMN: str = "_last_edited_time"
+
+#Total size of every response received from the Notion API, read by the profiler. Requests are sent from several threads at once, so it is updated under a lock
+responseBytes: int = 0
+responseBytesLock: threading.Lock = threading.Lock()
+
+#Returns the total size in bytes of every response received from the Notion API so far
+def ResponseBytes() -> int:
+	with responseBytesLock:
+		return responseBytes
+
+#Sends a request to the Notion API and returns the decoded JSON response
+#Notion rate limits integrations to around 3 requests per second, so requests that get rate limited are retried after the delay that Notion asks for
+def NotionRequest(method: str, path: str, apiKey: str, body: dict = None, params: dict = None) -> dict:
+	global responseBytes
+	headers: dict = {
+		"Authorization": "Bearer %s" % (apiKey),
+		"Notion-Version": NOTION_VERSION,
+		"Content-Type": "application/json"
+	}
+
+	for attempt in range(0, 5):
+		response: requests.Response = requests.request(method, NOTION_API_URL + path, headers=headers, json=body, params=params, timeout=60)
+		with responseBytesLock:
+			responseBytes += len(response.content)
+		if response.status_code != 429:
+			break
+		time.sleep(float(response.headers.get("Retry-After", 1.0)))
+
+	if not response.ok:
+		raise Exception("ERROR: Notion API request to %s failed with status %d: %s" % (path, response.status_code, response.text))
+	return response.json()
+
+#Returns the database object, which includes the schema of every property
+def RetrieveDatabase(databaseID: str, apiKey: str) -> dict:
+	return NotionRequest("GET", "/databases/%s" % (databaseID), apiKey)
+
+def RetrievePage(pageID: str, apiKey: str) -> dict:
+	return NotionRequest("GET", "/pages/%s" % (pageID), apiKey)
+
+#Returns every page in the database matching filter, following the pagination cursor until the results run out
+#If filterProperties is given, only the values of those properties (listed by property ID) are included in each page
+def QueryDatabase(databaseID: str, apiKey: str, filter: dict = None, filterProperties: List[str] = None) -> List[dict]:
+	pages: List[dict] = []
+	body: dict = {"page_size": NOTION_MAX_PAGE_SIZE}
+	if filter:
+		body["filter"] = filter
+	params: dict = None
+	if filterProperties:
+		params = {"filter_properties": filterProperties}
+
+	while True:
+		response: dict = NotionRequest("POST", "/databases/%s/query" % (databaseID), apiKey, body=body, params=params)
+		pages.extend(response["results"])
+		if not response["has_more"]:
+			break
+		body["start_cursor"] = response["next_cursor"]
+
+	return pages
+
+#Returns the ID of every page in the database, without downloading their properties
+def QueryPageIDs(databaseID: str, apiKey: str) -> List[str]:
+	return [page["id"] for page in QueryDatabase(databaseID, apiKey, filterProperties=[TITLE_PROPERTY_ID])]
+
+#Runs several queries at once and returns their pages in the order the filters were given, without duplicates
+#Pagination cursors can't be followed in parallel, so the concurrency comes from splitting a query into several filters
+def QueryDatabaseConcurrently(databaseID: str, apiKey: str, filters: List[dict], filterProperties: List[str] = None, maxConcurrentRequests: int = 3) -> List[dict]:
+	with ThreadPoolExecutor(max_workers=maxConcurrentRequests) as executor:
+		results: List[List[dict]] = list(executor.map(lambda filter: QueryDatabase(databaseID, apiKey, filter, filterProperties), filters))
+
+	pages: List[dict] = []
+	seenPageIDs: set = set()
+	for result in results:
+		for page in result:
+			if page["id"] not in seenPageIDs:
+				seenPageIDs.add(page["id"])
+				pages.append(page)
+	return pages
+
+#Returns the IDs of the named properties, which is how Notion expects properties to be listed in filter_properties
+#Names that aren't in the database are skipped. Notion returns the IDs URL-encoded, so they are decoded here to stop requests encoding them twice
+def PropertyIDs(database: dict, names: List[str]) -> List[str]:
+	properties: dict = database["properties"]
+	return [unquote(properties[name]["id"]) for name in names if name in properties]
+
+#Builds a filter matching pages whose property equals value. Supports the property types that can hold an experiment ID
+def EqualsFilter(database: dict, name: str, value: str) -> dict:
+	propertyType: str = database["properties"][name]["type"]
+	if propertyType in ("title", "rich_text", "url"):
+		return {"property": name, propertyType: {"equals": value}}
+	if propertyType == "select":
+		return {"property": name, "select": {"equals": value}}
+	if propertyType == "formula":
+		return {"property": name, "formula": {"string": {"equals": value}}}
+	raise Exception("ERROR: can't filter on the \"%s\" property, as Notion can't compare %s properties to a string" % (name, propertyType))
+
+#Builds one filter per group of values, each matching pages whose property equals any value in the group
+def AnyEqualsFilters(database: dict, name: str, values: List[str], groupSize: int = NOTION_MAX_FILTER_CONDITIONS) -> List[dict]:
+	groupSize = max(1, min(groupSize, NOTION_MAX_FILTER_CONDITIONS))
+	filters: List[dict] = []
+	for n in range(0, len(values), groupSize):
+		filters.append({"or": [EqualsFilter(database, name, value) for value in values[n : n + groupSize]]})
+	return filters
+
+#Builds a filter matching pages where every named property has been filled in
+def NotEmptyFilter(database: dict, names: List[str]) -> dict:
+	conditions: List[dict] = []
+	for name in names:
+		propertyType: str = database["properties"][name]["type"]
+		conditions.append({"property": name, propertyType: {"is_not_empty": True}})
+	return {"and": conditions}
+
+#Converts raw page objects into a DataFrame laid out exactly as notion_df.download lays out a dashboard, with a page ID and last edited time column added
+def PagesToDataFrame(pages: List[dict], database: dict) -> pd.DataFrame:
+	if not pages:
+		return pd.DataFrame(columns=list(database["properties"].keys()) + [PAGE_ID_COLUMN, LAST_EDITED_COLUMN])
+
+	#notion_df is slow to import and only needed when pages have been downloaded from Notion, so runs from the snapshot never load it
+	from notion_df.agent import load_df_from_queries # type: ignore
+	from notion_df.configs import DatabaseSchema # type: ignore
+	schema: DatabaseSchema = DatabaseSchema.from_raw(database["properties"])
+	dashboard: pd.DataFrame = schema.create_df(load_df_from_queries(pages))
+	#Copy to drop the attributes notion_df attaches to the frame, which pandas warns about when new columns are added
+	dashboard = pd.DataFrame(dashboard)
+	dashboard[PAGE_ID_COLUMN] = [page["id"] for page in pages]
+	dashboard[LAST_EDITED_COLUMN] = [page["last_edited_time"] for page in pages]
+	return dashboard
@@ -0,0 +1,132 @@
+#Import pip packages
+from typing import Type, List
+import numpy as np
+import bisect
+import math
+
+#Sorts a window of samples exactly as the original outlier loop did, with a recursive merge sort that takes from the left half whenever left <= right
+#NaNs compare as neither smaller nor larger than anything, so where they end up depends on the order the samples arrived in. Only used for windows holding a NaN, where any other sort could give a different median
+def MergeSort(ip: List[float]) -> List[float]:
+	if len(ip) <= 1:
+		return ip
+
+	midpoint: int = int(len(ip) / 2.0)
+	leftList: List[float] = MergeSort(ip[0 : midpoint])
+	rightList: List[float] = MergeSort(ip[midpoint : len(ip)])
+
+	leftIndex: int = 0
+	rightIndex: int = 0
+	op: List[float] = []
+	while leftIndex < len(leftList) and rightIndex < len(rightList):
+		if leftList[leftIndex] <= rightList[rightIndex]:
+			op.append(leftList[leftIndex])
+			leftIndex += 1
+		else:
+			op.append(rightList[rightIndex])
+			rightIndex += 1
+	op.extend(leftList[leftIndex : len(leftList)])
+	op.extend(rightList[rightIndex : len(rightList)])
+	return op
+
+#Rejects outliers by comparing each sample to the median of the last few samples that were accepted
+class RollingMedianFilter(object):
+	"""
+	Member variables:
+
+	int windowSize;
+	float tolerance;
+	"""
+
+	def __init__(self, windowSize: int = 5, tolerance: float = 0.15) -> None:
+		if windowSize < 1:
+			raise Exception("ERROR: the outlier filter window must contain at least 1 sample")
+		self.windowSize: int = windowSize
+		#Samples further than this fraction from the rolling median are rejected
+		self.tolerance: float = tolerance
+
+	#Returns a boolean mask which is True for samples that should be kept
+	#The first windowSize samples seed the window and are always kept. A rejected sample never enters the window, so one outlier can't drag the median towards the next
+	#NaNs are always kept. While one is in the window the median is taken as the original merge-sort loop took it, which may be NaN, in which case every sample is kept
+	def KeepMask(self, values: np.ndarray) -> np.ndarray:
+		return self.Start().KeepMask(values)
+
+	#Returns the state of a filter that is fed samples a batch at a time, for logs that are still being written
+	def Start(self) -> "RollingMedianState":
+		return RollingMedianState(self)
+
+	#Returns a boolean mask which is False for the run of samples at the start of the series that are at or below threshold, and True from the first sample above it onwards
+	@staticmethod
+	def LeadingAboveMask(values: np.ndarray, threshold: float) -> np.ndarray:
+		atOrBelow: np.ndarray = np.asarray(values, dtype=np.float64) <= threshold
+		#Once one sample is above threshold, every sample after it is kept
+		return np.logical_or.accumulate(~atOrBelow)
+
+#State of a RollingMedianFilter carried from one batch of samples to the next
+#RollingMedianFilter.KeepMask feeds a whole series to a new state at once, so feeding it in batches gives the same mask as for the whole series
+class RollingMedianState(object):
+	"""
+	Member variables:
+
+	int windowSize;
+	list window;
+	list sortedWindow;
+	int oldest;
+	int nanCount;
+	"""
+
+	def __init__(self, outlierFilter: RollingMedianFilter) -> None:
+		self.windowSize: int = outlierFilter.windowSize
+		self.medianIndex: int = int(outlierFilter.windowSize / 2.0)
+		self.upperFactor: float = 1.0 + outlierFilter.tolerance
+		self.lowerFactor: float = 1.0 - outlierFilter.tolerance
+		#Accepted samples in the order they arrived, and the same samples in sorted order, leaving out NaNs
+		self.window: List[float] = []
+		self.sortedWindow: List[float] = []
+		#Number of NaNs in window
+		self.nanCount: int = 0
+		#Position in window of the sample replaced next, once the window is full
+		self.oldest: int = 0
+
+	#Returns a boolean mask which is True for the samples in values that should be kept, carrying on from the samples given to earlier calls
+	#The window is kept sorted as samples come and go, so each sample costs O(log windowSize) rather than a full sort
+	def KeepMask(self, values: np.ndarray) -> np.ndarray:
+		samples: List[float] = np.asarray(values, dtype=np.float64).tolist()
+		keep: np.ndarray = np.ones(len(samples), dtype=bool)
+		window: List[float] = self.window
+		sortedWindow: List[float] = self.sortedWindow
+		windowSize: int = self.windowSize
+		medianIndex: int = self.medianIndex
+		upperFactor: float = self.upperFactor
+		lowerFactor: float = self.lowerFactor
+
+		for n in range(0, len(samples)):
+			value: float = samples[n]
+			#The first windowSize samples seed the window and are always kept
+			if len(window) < windowSize:
+				window.append(value)
+				if math.isnan(value):
+					self.nanCount += 1
+				else:
+					bisect.insort(sortedWindow, value)
+				continue
+
+			#Comparisons with a NaN median are always False, so the sample is kept
+			rollingMedian: float = sortedWindow[medianIndex] if self.nanCount == 0 else MergeSort(window)[medianIndex]
+			if value > rollingMedian * upperFactor or value < rollingMedian * lowerFactor:
+				keep[n] = False
+				continue
+
+			#Replace the oldest accepted sample with this one
+			removed: float = window[self.oldest]
+			window[self.oldest] = value
+			self.oldest = (self.oldest + 1) % windowSize
+			if math.isnan(removed):
+				self.nanCount -= 1
+			else:
+				del sortedWindow[bisect.bisect_left(sortedWindow, removed)]
+			if math.isnan(value):
+				self.nanCount += 1
+			else:
+				bisect.insort(sortedWindow, value)
+
+		return keep
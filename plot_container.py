@@ -1,10 +1,14 @@
-from typing import Type
-import plotly.express as px # type: ignore
+from typing import Type, TYPE_CHECKING
+#Only needed for the type annotation, so plotly isn't imported until a plot is actually made
+if TYPE_CHECKING:
+	import plotly.graph_objects as go # type: ignore
 
 #literally just a struct allowing you to lump metadata into plotly plots
 class PlotContainer(object):
 	def __init__(self) -> None:
-		self.plot: px.plot = None
+		self.plot: "go.Figure" = None
 		self.input: str = ""
 		self.output: str = ""
 		self.writeImage: bool = False
+		#Optional link shown under the plot, e.g. to the full data behind a downsampled plot
+		self.dataLink: str = ""
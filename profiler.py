@@ -0,0 +1,177 @@
+#Import pip packages
+from typing import Type, List, Dict, Iterator
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+try:
+	import resource
+except ImportError:
+	#Not available on Windows, where peak memory isn't recorded
+	resource = None
+
+#Returns the peak resident memory of this process so far in bytes, or 0 where it can't be measured
+def PeakMemory() -> int:
+	if resource is None:
+		return 0
+	peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	#macOS reports bytes, Linux reports kilobytes
+	if sys.platform == "darwin":
+		return peak
+	return peak * 1024
+
+#literally just a struct holding the measurements of one stage of a run
+#Records are made in worker threads and processes too, so each one notes where it ran and when it started as a UNIX time
+class StageRecord(object):
+	def __init__(self, stage: str, experiment: str = "", detail: str = "") -> None:
+		self.stage: str = stage
+		#Label of the experiment the stage worked on, empty for stages covering the whole run
+		self.experiment: str = experiment
+		#Anything that tells apart records of the same stage and experiment, such as which logfile was downloaded
+		self.detail: str = detail
+		self.start: float = 0.0
+		self.duration: float = 0.0
+		self.processID: int = os.getpid()
+		self.threadID: int = threading.get_native_id()
+		#Bytes received over the network. Logfiles read from the cache count as 0
+		self.bytesTransferred: int = 0
+		self.rowsIn: int = 0
+		self.rowsOut: int = 0
+		self.rowsRejected: int = 0
+		#Peak memory of the process at the end of the stage, and how much the stage raised it by
+		self.peakMemory: int = 0
+		self.peakMemoryIncrease: int = 0
+		#Baseline for peakMemoryIncrease, not saved with the record
+		self.peakMemoryBefore: int = 0
+
+	def ToDict(self) -> dict:
+		record: dict = dict(self.__dict__)
+		del record["peakMemoryBefore"]
+		return record
+
+#Starts timing a stage and returns its record, which the caller can fill in with counts of bytes and rows
+#If profiler is None nothing is timed, but a record is still returned so that callers don't need to check
+def BeginStage(profiler: "Profiler", stage: str, experiment: str = "", detail: str = "") -> StageRecord:
+	record: StageRecord = StageRecord(stage, experiment, detail)
+	if profiler is not None:
+		record.peakMemoryBefore = PeakMemory()
+		record.start = time.time()
+		record.duration = time.perf_counter()
+	return record
+
+#Stops timing a stage started by BeginStage and adds its record to profiler
+def EndStage(profiler: "Profiler", record: StageRecord) -> None:
+	if profiler is None:
+		return
+	record.duration = time.perf_counter() - record.duration
+	record.peakMemory = PeakMemory()
+	record.peakMemoryIncrease = record.peakMemory - record.peakMemoryBefore
+	profiler.Add(record)
+
+#Times the body of a with statement as one stage. The stage is recorded even if the body raises an exception
+@contextlib.contextmanager
+def ProfileStage(profiler: "Profiler", stage: str, experiment: str = "", detail: str = "") -> Iterator[StageRecord]:
+	record: StageRecord = BeginStage(profiler, stage, experiment, detail)
+	try:
+		yield record
+	finally:
+		EndStage(profiler, record)
+
+#Collects the records of every stage of a run, and writes them out as JSON or as a Chrome trace
+class Profiler(object):
+	"""
+	Member variables:
+
+	float startTime;
+	list records;
+	"""
+
+	def __init__(self) -> None:
+		self.startTime: float = time.time()
+		self.records: List[StageRecord] = []
+		#Logfiles are downloaded in several threads at once
+		self.lock: threading.Lock = threading.Lock()
+
+	def Add(self, record: StageRecord) -> None:
+		with self.lock:
+			self.records.append(record)
+
+	#Adds records made by another Profiler, such as one in a worker process
+	def Merge(self, records: List[StageRecord]) -> None:
+		with self.lock:
+			self.records.extend(records)
+
+	#Returns the totals of each stage over every experiment, in the order the stages first ran
+	def Summary(self) -> List[dict]:
+		stages: Dict[str, dict] = {}
+		for record in sorted(self.records, key=lambda record: record.start):
+			if record.stage not in stages:
+				stages[record.stage] = {"stage": record.stage, "count": 0, "duration": 0.0, "bytesTransferred": 0, "rowsIn": 0, "rowsOut": 0, "rowsRejected": 0, "peakMemory": 0}
+			total: dict = stages[record.stage]
+			total["count"] += 1
+			total["duration"] += record.duration
+			total["bytesTransferred"] += record.bytesTransferred
+			total["rowsIn"] += record.rowsIn
+			total["rowsOut"] += record.rowsOut
+			total["rowsRejected"] += record.rowsRejected
+			total["peakMemory"] = max(total["peakMemory"], record.peakMemory)
+		return list(stages.values())
+
+	#Returns the total time spent on each experiment, slowest first
+	def ExperimentTimes(self) -> List[tuple]:
+		times: Dict[str, float] = {}
+		for record in self.records:
+			if record.experiment:
+				times[record.experiment] = times.get(record.experiment, 0.0) + record.duration
+		return sorted(times.items(), key=lambda item: item[1], reverse=True)
+
+	#Stages run in parallel threads and processes, so their times can add up to more than the time the run took
+	def PrintSummary(self) -> None:
+		print ("%-18s %6s %10s %10s %10s %10s %10s %10s" % ("Stage", "Count", "Time / s", "MB in", "Rows in", "Rows out", "Rejected", "Peak / MB"))
+		for total in self.Summary():
+			print ("%-18s %6d %10.3f %10.2f %10d %10d %10d %10.1f" % (total["stage"], total["count"], total["duration"], total["bytesTransferred"] / 1048576.0, total["rowsIn"], total["rowsOut"], total["rowsRejected"], total["peakMemory"] / 1048576.0))
+		print ("%-18s %6s %10.3f" % ("Wall time", "", time.time() - self.startTime))
+
+		experimentTimes: List[tuple] = self.ExperimentTimes()
+		if experimentTimes:
+			print ("\n%-40s %10s" % ("Experiment", "Time / s"))
+			for experiment, duration in experimentTimes:
+				print ("%-40s %10.3f" % (experiment[0:40], duration))
+
+	def WriteJSON(self, filename: str) -> None:
+		with open(filename, "w", encoding="utf-8") as Writer:
+			json.dump({
+				"startTime": self.startTime,
+				"wallTime": time.time() - self.startTime,
+				"summary": self.Summary(),
+				"records": [record.ToDict() for record in sorted(self.records, key=lambda record: record.start)]
+			}, Writer, indent=1)
+
+	#Writes the records in the Chrome trace event format, which chrome://tracing and https://ui.perfetto.dev can open
+	#Each stage becomes a complete event on the timeline of the process and thread it ran in
+	def WriteChromeTrace(self, filename: str) -> None:
+		events: List[dict] = []
+		for record in self.records:
+			name: str = record.stage
+			if record.experiment:
+				name += " " + record.experiment
+			if record.detail:
+				name += " (%s)" % (record.detail)
+			arguments: dict = record.ToDict()
+			for key in ("stage", "start", "duration", "processID", "threadID"):
+				del arguments[key]
+			events.append({
+				"name": name,
+				"cat": record.stage,
+				"ph": "X",
+				"ts": (record.start - self.startTime) * 1e6,
+				"dur": record.duration * 1e6,
+				"pid": record.processID,
+				"tid": record.threadID,
+				"args": arguments
+			})
+
+		with open(filename, "w", encoding="utf-8") as Writer:
+			json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, Writer)
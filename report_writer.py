@@ -0,0 +1,220 @@
+#Import pip packages
+from typing import Type, List, Tuple
+import numpy as np
+import base64
+import gzip
+import html
+import json
+import math
+import os
+import shutil
+
+#Import project files
+from plot_container import PlotContainer
+from file_to_string import ftos
+
+#Ways of including plotly.js in the report: embedded once in the page, written to a file next to the report, or loaded from the plotly CDN
+PLOTLYJS_MODES: Tuple[str, ...] = ("inline", "sidecar", "cdn")
+PLOTLYJS_CDN_URL: str = "https://cdn.plot.ly/plotly-%s.min.js"
+
+#Trace attributes holding one value per data point, which are worth sending as binary. Other numeric lists, like axis domains, must stay as plain JSON
+TYPED_ARRAY_KEYS: Tuple[str, ...] = ("x", "y", "z", "customdata", "array", "arrayminus")
+#Shorter arrays are left as JSON, as they are smaller that way
+TYPED_ARRAY_MIN_LENGTH: int = 8
+#plotly.js can only decode typed arrays from this version onwards
+TYPED_ARRAY_MIN_PLOTLYJS_VERSION: Tuple[int, ...] = (2, 28, 0)
+
+REPORT_HEADER: str = """\
+<!DOCTYPE html>
+<html>
+<head>
+	<title>microED results</title>
+	<style>
+		{css}
+	</style>
+	<script>
+		{filterJS}
+	</script>
+	{plotlyJS}
+</head>
+<body onload="PageLoadInit()">
+	<div class="filter-row">
+		<div class="filter-list" style="margin: 0% -25% 0% 0%;">
+			<p class="filter-title">Filter by input</p>
+			<input type="checkbox" class="input" value="input-time" checked="true"/>
+			<label>Time</label><br>
+			<input type="checkbox" class="input" value="input-experimentalAverage" checked="true"/>
+			<label>Experimental average</label><br>
+			<input type="checkbox" class="input" value="input-releaseAmineConc" checked="true"/>
+			<label>Release amine concentration</label><br>
+			<button onclick="TickAll('input', true)">Select all</button><br>
+			<button onclick="TickAll('input', false)">Deselect all</button><br>
+		</div>
+		<div class="filter-list">
+			<p class="filter-title">Filter by output</p>
+			<input type="checkbox" class="output" value="output-voltage" checked="true"/>
+			<label>Voltage</label><br>
+			<input type="checkbox" class="output" value="output-co2ppm" checked="true"/>
+			<label>CO<sub>2</sub> ppm</label><br>
+			<input type="checkbox" class="output" value="output-powerConsumption" checked="true"/>
+			<label>Power Consumption</label><br>
+			<input type="checkbox" class="output" value="output-currentEfficiency" checked="true"/>
+			<label>Current Efficiency</label><br>
+			<input type="checkbox" class="output" value="output-releaseFlux" checked="true"/>
+			<label>Release flux</label><br>
+			<input type="checkbox" class="output" value="output-amineFlux" checked="true"/>
+			<label>Amine crossing flux</label><br>
+			<input type="checkbox" class="output" value="output-aminePerCO2" checked="true"/>
+			<label>Amine crossed per unit CO2</label><br>
+			<input type="checkbox" class="output" value="output-amineCrossed" checked="true"/>
+			<label>Total amine crossed</label><br>
+			<input type="checkbox" class="output" value="output-stackResistance" checked="true"/>
+			<label>Stack resistance</label><br>
+			<button onclick="TickAll('output', true)">Select all</button><br>
+			<button onclick="TickAll('output', false)">Deselect all</button><br>
+		</div>
+	</div>
+	<div class=\"graph-row\">\n"""
+
+FIGURE_TEMPLATE: str = """\
+<div id="{divID}" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+<script type="text/javascript">
+	if (document.getElementById("{divID}")) {{
+		Plotly.newPlot("{divID}", {data}, {layout}, {{"responsive": true}});
+	}}
+</script>
+"""
+
+#Returns a numeric list as a plotly.js typed array spec, or None if it should stay as JSON
+#Missing values are sent as NaN, which plotly.js treats the same as null
+def TypedArray(values: list) -> dict:
+	if len(values) < TYPED_ARRAY_MIN_LENGTH:
+		return None
+
+	hasNumber: bool = False
+	allIntegers: bool = True
+	for value in values:
+		if value is None:
+			allIntegers = False
+			continue
+		if isinstance(value, bool) or not isinstance(value, (int, float)):
+			return None
+		hasNumber = True
+		if isinstance(value, float):
+			allIntegers = False
+	if not hasNumber:
+		return None
+
+	if allIntegers and -2**31 <= min(values) and max(values) < 2**31:
+		array: np.ndarray = np.asarray(values, dtype="<i4")
+		dtype: str = "i4"
+	else:
+		array = np.asarray([math.nan if value is None else value for value in values], dtype="<f8")
+		dtype = "f8"
+	return {"dtype": dtype, "bdata": base64.b64encode(array.tobytes()).decode("ascii")}
+
+#Replaces the per-point arrays of every trace with typed arrays, in place
+def EncodeTypedArrays(item: object) -> None:
+	if isinstance(item, list):
+		for element in item:
+			EncodeTypedArrays(element)
+	elif isinstance(item, dict):
+		for key, value in item.items():
+			if key in TYPED_ARRAY_KEYS and isinstance(value, list):
+				typedArray: dict = TypedArray(value)
+				if typedArray is not None:
+					item[key] = typedArray
+					continue
+			EncodeTypedArrays(value)
+
+#Dumps JSON that is safe to put inside a <script> tag
+def ScriptJSON(item: object) -> str:
+	return json.dumps(item, separators=(",", ":")).replace("<", "\\u003c").replace(">", "\\u003e").replace("/", "\\u002f")
+
+#Writes the HTML report holding every figure
+#plotly.js is only included once for the whole page, however many figures there are, and trace data is sent to the browser as base64-encoded binary where plotly.js supports it
+class ReportWriter(object):
+	"""
+	Member variables:
+
+	char *filename;
+	char *plotlyjsMode;
+	bool compress;
+	list figureSizes;
+	"""
+
+	def __init__(self, filename: str, plotlyjsMode: str = "inline", compress: bool = False) -> None:
+		if plotlyjsMode not in PLOTLYJS_MODES:
+			raise Exception("ERROR: \"%s\" is not a way of including plotly.js. Use one of: %s" % (plotlyjsMode, ", ".join(PLOTLYJS_MODES)))
+		self.filename: str = filename
+		self.plotlyjsMode: str = plotlyjsMode
+		#If set, a gzip-compressed copy of the report is written alongside it
+		self.compress: bool = compress
+		#plotly is slow to import, so it is only loaded once a report is written
+		import plotly.offline # type: ignore
+		self.plotlyjsVersion: str = plotly.offline.get_plotlyjs_version()
+		self.typedArrays: bool = tuple(int(part) for part in self.plotlyjsVersion.split(".")[0:3]) >= TYPED_ARRAY_MIN_PLOTLYJS_VERSION
+		#(name, bytes) of every figure in the last report written
+		self.figureSizes: List[Tuple[str, int]] = []
+
+	#Returns the HTML that loads plotly.js, writing the sidecar file if needed
+	def PlotlyScript(self) -> str:
+		import plotly.offline # type: ignore
+		if self.plotlyjsMode == "cdn":
+			return "<script src=\"%s\" charset=\"utf-8\"></script>" % (PLOTLYJS_CDN_URL % (self.plotlyjsVersion))
+
+		if self.plotlyjsMode == "sidecar":
+			sidecarName: str = "plotly-%s.min.js" % (self.plotlyjsVersion)
+			sidecarFilename: str = os.path.join(os.path.dirname(os.path.abspath(self.filename)), sidecarName)
+			#The version is in the file name, so an existing copy never needs writing again
+			if not os.path.isfile(sidecarFilename):
+				with open(sidecarFilename, "w", encoding="utf-8") as Writer:
+					Writer.write(plotly.offline.get_plotlyjs())
+			return "<script src=\"%s\" charset=\"utf-8\"></script>" % (sidecarName)
+
+		return "<script type=\"text/javascript\">%s</script>" % (plotly.offline.get_plotlyjs())
+
+	def FigureHTML(self, plot: PlotContainer, divID: str) -> str:
+		import plotly.io as pio # type: ignore
+		figure: dict = json.loads(pio.to_json(plot.plot, validate=False))
+		if self.typedArrays:
+			EncodeTypedArrays(figure["data"])
+		return FIGURE_TEMPLATE.format(divID=divID, data=ScriptJSON(figure["data"]), layout=ScriptJSON(figure.get("layout", {})))
+
+	#The report is written under a temporary name and then renamed over the old one, so it is never seen half-written, even while it is open in a browser
+	def Write(self, plots: List[PlotContainer]) -> None:
+		self.figureSizes = []
+		temporaryFilename: str = self.filename + ".tmp"
+		with open(temporaryFilename, 'w', encoding="utf-8") as Writer:
+			Writer.write(REPORT_HEADER.format(css=ftos("graphsheet.css"), filterJS=ftos("filter.js"), plotlyJS=self.PlotlyScript()))
+
+			for n in range(0, len(plots)):
+				figureHTML: str = self.FigureHTML(plots[n], "figure-%d" % (n))
+				self.figureSizes.append(("%s vs %s" % (plots[n].output, plots[n].input), len(figureHTML.encode("utf-8"))))
+
+				Writer.write(f"<div class=\"graph-column input-{plots[n].input} output-{plots[n].output}\">\n")
+				Writer.write(figureHTML)
+				if plots[n].dataLink:
+					Writer.write("<p class=\"data-link\"><a href=\"%s\">Full resolution data (CSV)</a></p>\n" % (html.escape(plots[n].dataLink)))
+				Writer.write("</div>")
+				if n % 2 == 1:
+					Writer.write("\t</div>\n")
+					if n < (len(plots) - 1):
+						Writer.write("\t<div class=\"graph-row\">\n")
+
+			Writer.write("</body>\n</html>")
+
+		if self.compress:
+			with open(temporaryFilename, "rb") as Reader, gzip.open(self.filename + ".gz.tmp", "wb") as Writer:
+				shutil.copyfileobj(Reader, Writer)
+			os.replace(self.filename + ".gz.tmp", self.filename + ".gz")
+		os.replace(temporaryFilename, self.filename)
+
+	#Prints the size of each figure and of the whole report
+	def PrintSizeReport(self) -> None:
+		print ("%-40s %12s" % ("Figure", "Size / kB"))
+		for name, size in self.figureSizes:
+			print ("%-40s %12.1f" % (name, size / 1024.0))
+		print ("%-40s %12.1f" % (self.filename, os.path.getsize(self.filename) / 1024.0))
+		if self.compress:
+			print ("%-40s %12.1f" % (self.filename + ".gz", os.path.getsize(self.filename + ".gz") / 1024.0))
@@ -0,0 +1,53 @@
+#Import pip packages
+from typing import Type
+import hashlib
+import json
+import os
+import sys
+
+#Returns a SHA-256 hash of everything that goes into an experiment's results, so that a change to any of them can be spotted
+def Fingerprint(inputs: dict) -> str:
+	#Keys are sorted so that the same inputs always give the same hash. Values JSON can't represent, such as a missing amine, are written as strings
+	return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+#Record of the results calculated for each experiment, kept between runs so that experiments which haven't changed aren't processed again
+#Each entry holds an experiment's processedData and timeResolvedData along with the fingerprint of the inputs they were calculated from
+class ResultsManifest(object):
+	"""
+	Member variables:
+
+	char *filename;
+	dict entries;
+	"""
+
+	def __init__(self, filename: str) -> None:
+		self.filename: str = filename
+		self.entries: dict = {}
+		if os.path.isfile(filename):
+			try:
+				with open(filename, "r", encoding="utf-8") as Reader:
+					self.entries = json.load(Reader)
+			except Exception as e:
+				print ("WARNING: results manifest could not be read and will be rebuilt (%s)" % (e), file=sys.stderr)
+				self.entries = {}
+
+	#Returns the entry for an experiment, or None if there isn't one calculated from inputs with the same fingerprint
+	def Get(self, experimentID: str, fingerprint: str) -> dict:
+		entry: dict = self.entries.get(experimentID)
+		if entry is None or entry.get("fingerprint") != fingerprint:
+			return None
+		return entry
+
+	def Put(self, experimentID: str, fingerprint: str, processedData: dict, timeResolvedData: dict) -> None:
+		self.entries[experimentID] = {
+			"fingerprint": fingerprint,
+			"processedData": processedData,
+			"timeResolvedData": timeResolvedData
+		}
+
+	def Save(self) -> None:
+		temporaryFilename: str = self.filename + ".tmp"
+		with open(temporaryFilename, "w", encoding="utf-8") as Writer:
+			#NumPy scalars that aren't floats already are converted, so that results computed with NumPy can always be saved
+			json.dump(self.entries, Writer, default=float)
+		os.replace(temporaryFilename, self.filename)
@@ -0,0 +1,132 @@
+#Import pip packages
+from typing import Type, List, Dict
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+#Bumped whenever the layout of stored series changes, so that older copies are ignored rather than misread
+SERIES_FORMAT_VERSION: int = 2
+
+#Columns kept for each table. Together they hold everything needed to calculate metrics and plot an experiment
+CO2_SERIES_COLUMNS: List[str] = ["runtime_s", "co2_ppm"]
+VOLTAGE_SERIES_COLUMNS: List[str] = ["runtime_s", "voltage_v"]
+IC_SERIES_COLUMNS: List[str] = ["time_min", "amine_mol/kg", "amine_mol"]
+
+#Cleaned time series of one experiment, read from disk only as each column is asked for
+#Every column is a memory-mapped .npy file, so opening a stored experiment costs a few header reads however long it ran for
+class StoredSeries(object):
+	"""
+	Member variables:
+
+	char *directory;
+	dict meta;
+	dict columns;
+	"""
+
+	def __init__(self, directory: str, meta: dict) -> None:
+		self.directory: str = directory
+		#Contents of meta.json: the format version, the processing parameters and the files and row count of each table
+		self.meta: dict = meta
+		#Memory maps of every column, keyed by table then column name
+		self.columns: Dict[str, Dict[str, np.ndarray]] = {}
+
+		for table, layout in meta["tables"].items():
+			self.columns[table] = {}
+			for name, filename in layout["columns"].items():
+				column: np.ndarray = np.load(os.path.join(directory, filename), mmap_mode="r", allow_pickle=False)
+				if column.shape != (layout["rows"],):
+					raise Exception("ERROR: stored column %s of %s has %s values, but %d were expected" % (name, directory, column.shape, layout["rows"]))
+				self.columns[table][name] = column
+
+	def HasTable(self, table: str) -> bool:
+		return table in self.columns
+
+	#Returns a read-only, memory-mapped column
+	def Column(self, table: str, name: str) -> np.ndarray:
+		return self.columns[table][name]
+
+	#Builds a DataFrame holding only the named columns of a table, or all of them if none are named. Returns None if the table wasn't stored
+	def Frame(self, table: str, columns: List[str] = None) -> pd.DataFrame:
+		if not self.HasTable(table):
+			return None
+		if columns is None:
+			columns = list(self.columns[table].keys())
+		return pd.DataFrame({name: np.asarray(self.Column(table, name)) for name in columns})
+
+
+#On-disk store of the cleaned time series of each experiment, kept alongside the logfile cache
+#Each experiment gets its own directory holding one .npy file per column and a meta.json describing them
+#The processing parameters are saved in meta.json, and a stored experiment is only used again if they still match
+class SeriesStore(object):
+	"""
+	Member variables:
+
+	char *directory;
+	"""
+
+	def __init__(self, directory: str) -> None:
+		self.directory: str = directory
+		os.makedirs(directory, exist_ok=True)
+
+	#Experiment IDs can contain characters that aren't allowed in file names, so directories are named after their hash
+	def ExperimentDirectory(self, experimentID: str) -> str:
+		return os.path.join(self.directory, hashlib.sha256(experimentID.encode("utf-8")).hexdigest())
+
+	#Returns the stored series of an experiment, or None if there isn't a readable copy made with the same parameters
+	#If parameters is None, any stored copy is returned, whatever it was made with
+	def Open(self, experimentID: str, parameters: dict = None) -> StoredSeries:
+		directory: str = self.ExperimentDirectory(experimentID)
+		metaFilename: str = os.path.join(directory, "meta.json")
+		if not os.path.isfile(metaFilename):
+			return None
+
+		try:
+			with open(metaFilename, "r", encoding="utf-8") as Reader:
+				meta: dict = json.load(Reader)
+			if meta["version"] != SERIES_FORMAT_VERSION or meta["experimentID"] != experimentID:
+				return None
+			if parameters is not None and meta["parameters"] != parameters:
+				return None
+			return StoredSeries(directory, meta)
+		except Exception as e:
+			print ("WARNING: stored series of experiment %s could not be read and will be rebuilt (%s)" % (experimentID, e), file=sys.stderr)
+			return None
+
+	#Saves the tables of an experiment, replacing any older copy. Tables which are None are left out
+	def Save(self, experimentID: str, parameters: dict, tables: Dict[str, pd.DataFrame]) -> None:
+		meta: dict = {
+			"version": SERIES_FORMAT_VERSION,
+			"experimentID": experimentID,
+			"parameters": parameters,
+			"tables": {}
+		}
+
+		#Write to a temporary directory first so that an interrupted run never leaves a half-written experiment in the store
+		temporaryDirectory: str = tempfile.mkdtemp(prefix=".tmp", dir=self.directory)
+		try:
+			for table, frame in tables.items():
+				if frame is None:
+					continue
+				layout: dict = {"rows": frame.shape[0], "columns": {}}
+				#Column names such as amine_mol/kg aren't valid file names, so files are numbered instead
+				for n, name in enumerate(frame.columns):
+					filename: str = "%s_%d.npy" % (table, n)
+					np.save(os.path.join(temporaryDirectory, filename), np.ascontiguousarray(frame[name].to_numpy(dtype=np.float64)), allow_pickle=False)
+					layout["columns"][name] = filename
+				meta["tables"][table] = layout
+
+			with open(os.path.join(temporaryDirectory, "meta.json"), "w", encoding="utf-8") as Writer:
+				json.dump(meta, Writer, indent=1)
+
+			directory: str = self.ExperimentDirectory(experimentID)
+			if os.path.isdir(directory):
+				shutil.rmtree(directory, ignore_errors=True)
+			os.replace(temporaryDirectory, directory)
+		finally:
+			if os.path.isdir(temporaryDirectory):
+				shutil.rmtree(temporaryDirectory, ignore_errors=True)
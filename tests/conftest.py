@@ -0,0 +1,29 @@
+#Import pip packages
+from typing import Tuple
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+#The modules under test live in the repository directory rather than an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#Cleaned CO2 and voltage logs of a synthetic experiment lasting hours, the same for the same seed
+#The CO2 log has a sample about every 2 s, rising towards 700 ppm, and the voltage log one about every 10 s. The loggers sample at slightly irregular intervals, as the real ones do
+def ExperimentLogs(seed: int, hours: float) -> Tuple[pd.DataFrame, pd.DataFrame]:
+	rng: np.random.Generator = np.random.default_rng(seed)
+	co2Runtime: np.ndarray = np.cumsum(rng.uniform(1.5, 2.5, int(hours * 1800)))
+	voltageRuntime: np.ndarray = np.cumsum(rng.uniform(8.0, 12.0, int(hours * 360)))
+	rawDataCO2: pd.DataFrame = pd.DataFrame({
+		"co2_ppm": 400.0 + 300.0 * (1.0 - np.exp(-co2Runtime / 1800.0)) + rng.normal(0.0, 8.0, co2Runtime.size),
+		"runtime_s": co2Runtime
+	})
+	rawDataVoltage: pd.DataFrame = pd.DataFrame({
+		"voltage_v": 3.0 + 0.2 * np.sin(voltageRuntime / 3600.0) + rng.normal(0.0, 0.05, voltageRuntime.size),
+		"runtime_s": voltageRuntime
+	})
+	return (rawDataCO2, rawDataVoltage)
+
+#The logs of ExperimentLogs stacked as CalculateMetrics stacks them, so each row has a NaN in the other logger's column
+def StackedLogs(seed: int, hours: float) -> pd.DataFrame:
+	return pd.concat(ExperimentLogs(seed, hours), axis=0, ignore_index=True)
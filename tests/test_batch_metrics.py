@@ -0,0 +1,104 @@
+#Import pip packages
+from typing import List, Tuple
+import types
+import numpy as np
+import pandas as pd
+import pytest
+
+#Import project files
+from ed_metric_calculations import EDMetricCalculations
+from batch_metrics import BatchMetricCalculations
+from experiment_processor import ExperimentResult, ProcessingSettings, ChannelArrays, CalculateBatchMetrics
+from conftest import ExperimentLogs, StackedLogs
+
+#The batch sums each experiment's samples in a different order to EDMetricCalculations, so results only agree to rounding
+TOLERANCE: float = 1e-9
+
+#(seed, hours, current, airFlowRate) of each experiment in the batch, one of them without a current
+EXPERIMENTS: List[Tuple[int, float, float, float]] = [(1, 0.5, 0.5, 2.0), (2, 3.0, 1.0, 1.5), (3, 6.0, 0.0, 3.0), (4, 1.0, 0.25, 0.8), (5, 2.0, 2.5, 1.0)]
+
+WINDOW_START: float = 900.0
+WINDOW_WIDTH: float = 300.0
+WINDOW_STEP: float = 300.0
+
+#Every experiment of EXPERIMENTS in one batch, numbered in order
+def Batch() -> BatchMetricCalculations:
+	inputData: pd.DataFrame = pd.concat([StackedLogs(seed, hours).assign(experiment=n) for n, (seed, hours, current, airFlowRate) in enumerate(EXPERIMENTS)], axis=0, ignore_index=True)
+	return BatchMetricCalculations(inputData, [current for seed, hours, current, airFlowRate in EXPERIMENTS], [airFlowRate for seed, hours, current, airFlowRate in EXPERIMENTS])
+
+@pytest.mark.parametrize("metric", ["GetStackResistance", "GetCurrentEfficiency", "GetPowerConsumption", "GetCO2Flux"])
+def test_averaged_metrics_match_each_experiment(metric: str) -> None:
+	with np.errstate(divide="ignore", invalid="ignore"):
+		values, errors = getattr(Batch(), metric)()
+
+	for n, (seed, hours, current, airFlowRate) in enumerate(EXPERIMENTS):
+		kpm: EDMetricCalculations = EDMetricCalculations(StackedLogs(seed, hours), types.SimpleNamespace(current=current, airFlowRate=airFlowRate))
+		#Where EDMetricCalculations divides by a current of 0 it raises an exception, and the batch gives a non-finite value
+		try:
+			expected: Tuple[float, float] = getattr(kpm, metric)()
+		except ZeroDivisionError:
+			assert not np.isfinite(values[n])
+			continue
+		assert values[n] == pytest.approx(expected[0], rel=TOLERANCE)
+		assert errors[n] == pytest.approx(expected[1], rel=TOLERANCE)
+
+@pytest.mark.parametrize("metric", ["StackResistance", "CurrentEfficiency", "PowerConsumption", "CO2Flux"])
+def test_window_metrics_match_each_window(metric: str) -> None:
+	batch: BatchMetricCalculations = Batch()
+	windowExperiment, timeWindows = batch.WindowCentres(WINDOW_START, WINDOW_WIDTH, WINDOW_STEP)
+	hasData: np.ndarray = batch.HasData(windowExperiment, timeWindows, WINDOW_WIDTH) & (batch.currentSetpoint[windowExperiment] > 0.0)
+	windowExperiment, timeWindows = windowExperiment[hasData], timeWindows[hasData]
+	values, errors = getattr(batch, "GetWindow" + metric)(windowExperiment, timeWindows, WINDOW_WIDTH)
+	assert set(windowExperiment) == {n for n, experiment in enumerate(EXPERIMENTS) if experiment[2] > 0.0}
+
+	for n in range(0, timeWindows.size):
+		seed, hours, current, airFlowRate = EXPERIMENTS[windowExperiment[n]]
+		rawDataExp: pd.DataFrame = StackedLogs(seed, hours)
+		dataWindow: pd.DataFrame = rawDataExp[(rawDataExp["runtime_s"] > timeWindows[n] - (WINDOW_WIDTH / 2)) & (rawDataExp["runtime_s"] < timeWindows[n] + (WINDOW_WIDTH / 2))]
+		expected: Tuple[float, float] = getattr(EDMetricCalculations(dataWindow, types.SimpleNamespace(current=current, airFlowRate=airFlowRate)), "Get" + metric)()
+		assert values[n] == pytest.approx(expected[0], rel=TOLERANCE)
+		assert errors[n] == pytest.approx(expected[1], rel=TOLERANCE)
+
+#Running totals restart at each experiment, so an experiment's windows come out exactly as they would in a batch of its own
+def test_window_metrics_independent_of_other_experiments() -> None:
+	batch: BatchMetricCalculations = Batch()
+	windowExperiment, timeWindows = batch.WindowCentres(WINDOW_START, WINDOW_WIDTH, WINDOW_STEP)
+	powerConsumption: Tuple[np.ndarray, np.ndarray] = batch.GetWindowPowerConsumption(windowExperiment, timeWindows, WINDOW_WIDTH)
+	stackResistance: Tuple[np.ndarray, np.ndarray] = batch.GetWindowStackResistance(windowExperiment, timeWindows, WINDOW_WIDTH)
+
+	n: int = len(EXPERIMENTS) - 1
+	seed, hours, current, airFlowRate = EXPERIMENTS[n]
+	single: BatchMetricCalculations = BatchMetricCalculations(StackedLogs(seed, hours).assign(experiment=0), [current], [airFlowRate])
+	singleExperiment, singleWindows = single.WindowCentres(WINDOW_START, WINDOW_WIDTH, WINDOW_STEP)
+	np.testing.assert_array_equal(timeWindows[windowExperiment == n], singleWindows)
+	for expected, actual in zip(single.GetWindowPowerConsumption(singleExperiment, singleWindows, WINDOW_WIDTH) + single.GetWindowStackResistance(singleExperiment, singleWindows, WINDOW_WIDTH), powerConsumption + stackResistance):
+		np.testing.assert_array_equal(actual[windowExperiment == n], expected)
+
+#CalculateBatchMetrics fills in each result as EDMetricCalculations would for that experiment, and leaves out an experiment without any CO2 data
+def test_calculate_batch_metrics() -> None:
+	experiments: List[types.SimpleNamespace] = []
+	results: List[ExperimentResult] = []
+	for n, (seed, hours, current, airFlowRate) in enumerate(EXPERIMENTS + [(6, 1.0, 1.0, 1.0)]):
+		rawDataCO2, rawDataVoltage = ExperimentLogs(seed, hours)
+		if n == len(EXPERIMENTS):
+			rawDataCO2 = rawDataCO2.iloc[0 : 0]
+		experiments.append(types.SimpleNamespace(label="exp %d" % (n), current=current, airFlowRate=airFlowRate))
+		result: ExperimentResult = ExperimentResult()
+		result.rawData = ChannelArrays(rawDataCO2, rawDataVoltage)
+		result.processedData = {"amineFlux": 1.0, "label": "exp %d" % (n)}
+		result.timeResolvedData = {"time_min": []}
+		results.append(result)
+
+	CalculateBatchMetrics(experiments, results, ProcessingSettings())
+
+	assert [result.averaged for result in results] == [True] * len(EXPERIMENTS) + [False]
+	assert results[len(EXPERIMENTS)].warnings
+	for exp, result, (seed, hours, current, airFlowRate) in zip(experiments, results, EXPERIMENTS):
+		kpm: EDMetricCalculations = EDMetricCalculations(StackedLogs(seed, hours), exp)
+		assert (result.processedData["fluxCO2"], result.processedData["fluxCO2Error"]) == pytest.approx(kpm.GetCO2Flux(), rel=TOLERANCE)
+		assert result.processedData["aminePerCO2"] == pytest.approx(1.0 / kpm.GetCO2Flux()[0], rel=TOLERANCE)
+		if current > 0.0:
+			assert (result.processedData["powerConsumption"], result.processedData["powerConsumptionError"]) == pytest.approx(kpm.GetPowerConsumption(), rel=TOLERANCE)
+		else:
+			assert result.processedData["powerConsumption"] == 0.0
+			assert result.warnings == []
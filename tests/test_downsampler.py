@@ -0,0 +1,73 @@
+#Import pip packages
+import numpy as np
+import pandas as pd
+import pytest
+
+#Import project files
+from downsampler import DownsampleByLabel, MinMaxIndices, DOWNSAMPLE_METHODS
+from conftest import StackedLogs
+
+#A noisy series of nSamples samples with a few spikes, under one label
+def NoisySeries(seed: int, nSamples: int) -> pd.DataFrame:
+	rng: np.random.Generator = np.random.default_rng(seed)
+	y: np.ndarray = np.cumsum(rng.normal(0.0, 1.0, nSamples))
+	y[rng.integers(0, nSamples, 5)] += 50.0
+	return pd.DataFrame({"runtime_s": np.cumsum(rng.uniform(1.5, 2.5, nSamples)), "co2_ppm": y, "label": "exp"})
+
+#However few samples are asked for, the first and last are kept, so the plotted line covers the whole experiment
+@pytest.mark.parametrize("method", DOWNSAMPLE_METHODS)
+@pytest.mark.parametrize("maxPoints", [3, 4, 7, 100, 999])
+def test_keeps_ends_within_max_points(method: str, maxPoints: int) -> None:
+	series: pd.DataFrame = NoisySeries(1, 1000)
+	downsampled: pd.DataFrame = DownsampleByLabel(series, "runtime_s", "co2_ppm", maxPoints, method)
+
+	assert len(downsampled) <= maxPoints
+	assert downsampled.index[0] == series.index[0]
+	assert downsampled.index[len(downsampled) - 1] == series.index[len(series) - 1]
+	#Samples are picked from the series in their original order, without repeats
+	assert (np.diff(downsampled.index.to_numpy()) > 0).all()
+	pd.testing.assert_frame_equal(downsampled, series.loc[downsampled.index])
+
+#A series that already fits is passed through unchanged
+@pytest.mark.parametrize("method", DOWNSAMPLE_METHODS)
+@pytest.mark.parametrize("maxPoints", [50, 500])
+def test_short_series_unchanged(method: str, maxPoints: int) -> None:
+	series: pd.DataFrame = NoisySeries(2, 50)
+	pd.testing.assert_frame_equal(DownsampleByLabel(series, "runtime_s", "co2_ppm", maxPoints, method), series)
+
+#minmax keeps the smallest and largest sample of each bucket, so no spike is hidden
+def test_minmax_keeps_bucket_extremes() -> None:
+	series: pd.DataFrame = NoisySeries(3, 1000)
+	y: np.ndarray = series["co2_ppm"].to_numpy()
+	#22 points leave 10 buckets of 100 samples once the first and last samples are set aside
+	indices: np.ndarray = MinMaxIndices(series["runtime_s"].to_numpy(), y, 22)
+
+	for n in range(0, 10):
+		bucket: np.ndarray = np.arange(n * 100, (n + 1) * 100)
+		assert bucket[np.argmin(y[bucket])] in indices
+		assert bucket[np.argmax(y[bucket])] in indices
+	assert y[indices].max() == y.max()
+	assert y[indices].min() == y.min()
+
+#Plots take each experiment's samples as a trace of their own. Each one is downsampled on its own, so no sample is picked across the NaNs of the other channel's rows, or from another experiment
+@pytest.mark.parametrize("method", DOWNSAMPLE_METHODS)
+@pytest.mark.parametrize("column", ["co2_ppm", "voltage_v"])
+def test_nan_gaps_do_not_join_experiments(method: str, column: str) -> None:
+	#Each experiment's rows of both channels in order of runtime, so the rows of the channel not being plotted leave NaNs all through it and between experiments
+	labels: list = ["exp 1", "exp 2", "exp 3"]
+	series: pd.DataFrame = pd.concat([StackedLogs(seed, 1.0).sort_values("runtime_s").assign(label=label) for seed, label in enumerate(labels)], axis=0, ignore_index=True)
+	series["label"] = pd.Categorical(series["label"], categories=labels)
+	downsampled: pd.DataFrame = DownsampleByLabel(series, "runtime_s", column, 40, method)
+
+	assert not downsampled[column].isna().any()
+	#Each experiment's samples come out together, in the order the experiments were added
+	assert list(pd.unique(downsampled["label"])) == labels
+	assert (downsampled["label"].cat.codes.diff().dropna() >= 0).all()
+	for label in labels:
+		experiment: pd.DataFrame = series[(series["label"] == label) & series[column].notna()]
+		picked: pd.DataFrame = downsampled[downsampled["label"] == label]
+		assert 3 <= len(picked) <= 40
+		assert set(picked.index) <= set(experiment.index)
+		assert picked.index[0] == experiment.index[0]
+		assert picked.index[len(picked) - 1] == experiment.index[len(experiment) - 1]
+		assert (np.diff(picked["runtime_s"].to_numpy()) > 0).all()
@@ -0,0 +1,134 @@
+#Import pip packages
+from typing import Tuple
+import types
+import numpy as np
+import pandas as pd
+import pytest
+
+#Import project files
+from ed_metric_calculations import EDMetricCalculations
+from conftest import StackedLogs
+
+#Results of the NumPy kernels only differ from the pandas ones by rounding, as the sums are taken in a different order
+TOLERANCE: float = 1e-12
+
+#The pandas implementation EDMetricCalculations had before its kernels were rewritten with NumPy, copied unchanged apart from its name and the metrics that aren't compared
+class BaselineMetricCalculations(object):
+	def __init__(self, inputDataWindow: pd.DataFrame, exp: object) -> None:
+		self.MEMBRANE_AREA: float = 0.0006 #m^2
+		self.FARADAY_CONSTANT: float = 96485.0 #C mol^{-1}
+		self.CO2_DENSITY: float = 1.815 #g dm^{-3}
+		self.MEMBRANE_PAIRS: float = 10.0 #dimensionless
+		self.CO2_MOLAR_MASS: float = 44.01 #g mol^{-1}
+		self.BICARBONATE_CHARGE: float = 1.0 #dimensionless
+
+		self.dataWindow: pd.DataFrame = inputDataWindow
+		self.currentSetpoint = exp.current #A
+		self.airFlowRate = exp.airFlowRate / 60.0 #converted to L s^{-1}
+
+		self.totalMolesCO2: Tuple[float, float] = self.GetMolesCO2()
+
+	@staticmethod
+	def ErrorDivide(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
+		outputValue = a[0] / b[0]
+		relativeError = (a[1]/a[0]) + (b[1]/b[0]) 
+		outputError = outputValue * relativeError 
+		return (outputValue, outputError)
+
+	@staticmethod
+	def ErrorMultiply(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
+		outputValue = a[0] * b[0]
+		relativeError = (a[1]/a[0]) + (b[1]/b[0]) 
+		outputError = outputValue * relativeError 
+		return (outputValue, outputError)
+
+	@staticmethod
+	def Integrate(xSeries: pd.Series, ySeries: pd.Series) -> Tuple[float, float]:
+		integral: float = 0.0
+		x: float = 0.0
+		y: float = 0.0
+		x1: float = xSeries.iloc[0]
+		y1: float = ySeries.iloc[0]
+		seriesLength: int = xSeries.size
+
+		for n in range(1, seriesLength):
+			x = x1
+			y = y1
+			x1 = xSeries.iloc[n]
+			y1 = ySeries.iloc[n]
+
+			trapeziumArea: float = ((y + y1) / 2.0) * (x1 - x)
+			integral += trapeziumArea
+		
+		error = ySeries.size * ySeries.std()
+		return (integral, error)
+
+	def GetMolesCO2(self) -> Tuple[float, float]:
+		relevantData: pd.DataFrame = self.dataWindow.dropna(subset=["co2_ppm"], ignore_index=True)
+		timeSeries: pd.Series = relevantData["runtime_s"]
+		co2FractionSeries: pd.Series = relevantData["co2_ppm"].apply(lambda x: (x - 400) / 1000000.0)
+		co2VolumeSeries: pd.Series = co2FractionSeries.apply(lambda x: x * self.airFlowRate)
+		outputTuple: Tuple[float, float] = self.Integrate(timeSeries, co2VolumeSeries)
+		outputTuple = self.ErrorMultiply(outputTuple, (self.CO2_DENSITY, 0.0))
+		outputTuple = self.ErrorDivide(outputTuple, (self.CO2_MOLAR_MASS, 0.0))
+		return outputTuple
+
+	def GetStackResistance(self) -> Tuple[float, float]:
+		current: Tuple[float, float] = (self.currentSetpoint, 0.0)
+		voltage: Tuple[float, float] = (self.dataWindow["voltage_v"].mean(), self.dataWindow["voltage_v"].std())
+		resistance = self.ErrorDivide(voltage, current)
+		return resistance
+
+	def GetCurrentEfficiency(self) -> Tuple[float, float]:
+		runtime: float = self.dataWindow["runtime_s"].iloc[self.dataWindow.shape[0] - 1]
+		molElectrons: Tuple[float, float] = (runtime * self.currentSetpoint, 0.0)
+		molElectrons = self.ErrorDivide(molElectrons, (self.FARADAY_CONSTANT, 0.0))
+		currentEfficiency = self.ErrorDivide(self.totalMolesCO2, molElectrons)
+		currentEfficiency = self.ErrorMultiply(currentEfficiency, (100.0, 0.0))
+		currentEfficiency = self.ErrorDivide(currentEfficiency, (self.MEMBRANE_PAIRS, 0.0))
+		return currentEfficiency	
+
+	def GetPowerConsumption(self) -> Tuple[float, float]:
+		relevantData: pd.DataFrame = self.dataWindow.dropna(subset=["voltage_v"], ignore_index=True)
+		powerSeries: pd.Series = relevantData["voltage_v"].dropna().apply(lambda x: x * self.currentSetpoint)
+		timeSeries: pd.Series = relevantData["runtime_s"]
+		totalEnergy: Tuple[float, float] = self.Integrate(timeSeries, powerSeries)
+		totalEnergy = self.ErrorDivide(totalEnergy, (3600000.0, 0.0))
+		massCO2: Tuple[float, float] = self.ErrorMultiply(self.totalMolesCO2, (self.CO2_MOLAR_MASS, 0.0))
+		massCO2 = self.ErrorDivide(massCO2, (1000000.0, 0.0))
+		powerConsumption = self.ErrorDivide(totalEnergy, massCO2)
+		return powerConsumption
+
+	def GetCO2Flux(self) -> Tuple[float, float]:
+		duration: float = self.dataWindow["runtime_s"].iloc[self.dataWindow.shape[0] - 1]
+		massCO2: Tuple[float, float] = self.ErrorMultiply(self.totalMolesCO2, (self.CO2_MOLAR_MASS, 0.0))
+		massCO2 = self.ErrorMultiply(massCO2, (1000.0, 0.0))
+		rateCO2: Tuple[float, float] = self.ErrorDivide(massCO2, (duration, 0.0))
+		totalArea: Tuple[float, float] = (self.MEMBRANE_PAIRS * self.MEMBRANE_AREA, 0.0)
+		fluxCO2 = self.ErrorDivide(rateCO2, totalArea)
+		return fluxCO2
+
+@pytest.mark.parametrize("seed, hours, current, airFlowRate", [(1, 0.5, 0.5, 2.0), (2, 3.0, 1.0, 1.5), (3, 12.0, 2.5, 3.0), (4, 1.0, 0.25, 0.8)])
+@pytest.mark.parametrize("metric", ["GetStackResistance", "GetCurrentEfficiency", "GetPowerConsumption", "GetCO2Flux"])
+def test_metrics_match_pandas_implementation(seed: int, hours: float, current: float, airFlowRate: float, metric: str) -> None:
+	logs: pd.DataFrame = StackedLogs(seed, hours)
+	exp: types.SimpleNamespace = types.SimpleNamespace(current=current, airFlowRate=airFlowRate)
+
+	value, error = getattr(EDMetricCalculations(logs, exp), metric)()
+	expectedValue, expectedError = getattr(BaselineMetricCalculations(logs, exp), metric)()
+	assert value == pytest.approx(expectedValue, rel=TOLERANCE, abs=0.0)
+	assert error == pytest.approx(expectedError, rel=TOLERANCE, abs=0.0)
+
+def test_moles_co2_match_pandas_implementation() -> None:
+	logs: pd.DataFrame = StackedLogs(5, 2.0)
+	exp: types.SimpleNamespace = types.SimpleNamespace(current=1.0, airFlowRate=2.0)
+	np.testing.assert_allclose(EDMetricCalculations(logs, exp).totalMolesCO2, BaselineMetricCalculations(logs, exp).totalMolesCO2, rtol=TOLERANCE, atol=0.0)
+
+#Integrate takes pandas Series as it always has, as well as arrays
+def test_integrate_matches_pandas_implementation() -> None:
+	rng: np.random.Generator = np.random.default_rng(6)
+	x: pd.Series = pd.Series(np.cumsum(rng.uniform(0.5, 1.5, 5000)))
+	y: pd.Series = pd.Series(rng.normal(10.0, 2.0, 5000))
+	expected: Tuple[float, float] = BaselineMetricCalculations.Integrate(x, y)
+	np.testing.assert_allclose(EDMetricCalculations.Integrate(x, y), expected, rtol=TOLERANCE, atol=0.0)
+	np.testing.assert_allclose(EDMetricCalculations.Integrate(x.to_numpy(), y.to_numpy()), expected, rtol=TOLERANCE, atol=0.0)
@@ -0,0 +1,92 @@
+#Import pip packages
+from typing import List, Tuple
+import math
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+
+#Import project files
+from ic_calculations import RegressionFit, FitLinearRegression, LinearRegression
+
+#The fit sums deviations from the mean rather than raw totals, so it only agrees with other methods to rounding
+TOLERANCE: float = 1e-9
+
+#Noisy IC calibration-like data, amine concentration against time in minutes, of each length
+def CalibrationSeries(seed: int, nElements: int) -> Tuple[pd.Series, pd.Series]:
+	rng: np.random.Generator = np.random.default_rng(seed)
+	x: np.ndarray = np.sort(rng.uniform(0.0, 600.0, nElements))
+	return (pd.Series(x), pd.Series(0.002 * x + 1.5 + rng.normal(0.0, 0.05, nElements)))
+
+#The loop over .iloc that LinearRegression used before FitLinearRegression
+def OldLinearRegression(xSeries: pd.Series, ySeries: pd.Series) -> Tuple[float, float]:
+	nElements: int = (xSeries.size, ySeries.size)[xSeries.size > ySeries.size]
+
+	xTotal: float = 0
+	yTotal: float = 0
+	xSquaredTotal: float = 0
+	xyTotal: float = 0
+
+	for n in range(0, nElements):
+		xTotal += xSeries.iloc[n]
+		yTotal += ySeries.iloc[n]
+		xSquaredTotal += xSeries.iloc[n] * xSeries.iloc[n]
+		xyTotal += xSeries.iloc[n] * ySeries.iloc[n]
+
+	xBar: float = xTotal / nElements
+	yBar: float = yTotal / nElements
+	sxx: float = xSquaredTotal - (nElements * xBar * xBar)
+	sxy: float = xyTotal - (nElements * xBar * yBar)
+	slope: float = sxy / sxx
+	return (slope, (-1.0 * slope * xBar) + yBar)
+
+#The slope, offset, their errors and covariance are those of numpy.polyfit, which scales its covariance by the residual variance with n - 2 degrees of freedom
+@pytest.mark.parametrize("seed, nElements", [(1, 3), (2, 10), (3, 250)])
+def test_fit_matches_polyfit(seed: int, nElements: int) -> None:
+	x, y = CalibrationSeries(seed, nElements)
+	fit: RegressionFit = FitLinearRegression(x, y)
+	coefficients, covariance = np.polyfit(x.to_numpy(), y.to_numpy(), 1, cov=True)
+
+	assert fit.nElements == nElements
+	assert fit.slope == pytest.approx(coefficients[0], rel=TOLERANCE)
+	assert fit.offset == pytest.approx(coefficients[1], rel=TOLERANCE)
+	assert fit.slopeError == pytest.approx(math.sqrt(covariance[0, 0]), rel=TOLERANCE)
+	assert fit.offsetError == pytest.approx(math.sqrt(covariance[1, 1]), rel=TOLERANCE)
+	assert fit.covariance == pytest.approx(covariance[0, 1], rel=TOLERANCE)
+	assert fit.rSquared == pytest.approx(np.corrcoef(x, y)[0, 1] ** 2, rel=TOLERANCE)
+
+	#The error of a predicted value is the standard error of slope * x + offset, including the covariance of the two
+	for xPredict in (0.0, float(x.mean()), 900.0):
+		gradient: np.ndarray = np.array([xPredict, 1.0])
+		assert fit.Predict(xPredict) == pytest.approx(np.polyval(coefficients, xPredict), rel=TOLERANCE)
+		assert fit.PredictError(xPredict) == pytest.approx(math.sqrt(gradient @ covariance @ gradient), rel=TOLERANCE)
+
+#LinearRegression gives the same line as the loop it replaced, including when the series differ in length
+@pytest.mark.parametrize("seed, xElements, yElements", [(4, 2, 2), (5, 12, 12), (6, 40, 25), (7, 25, 40)])
+def test_matches_old_linear_regression(seed: int, xElements: int, yElements: int) -> None:
+	x, y = CalibrationSeries(seed, max(xElements, yElements))
+	x, y = x.iloc[0 : xElements], y.iloc[0 : yElements]
+	assert FitLinearRegression(x, y).nElements == min(xElements, yElements)
+	assert LinearRegression(x, y) == pytest.approx(OldLinearRegression(x, y), rel=TOLERANCE)
+
+#Two points are joined exactly, but leave no degrees of freedom for the errors
+def test_two_points() -> None:
+	fit: RegressionFit = FitLinearRegression(pd.Series([2.0, 6.0]), pd.Series([1.0, 3.0]))
+	assert fit.nElements == 2
+	assert (fit.slope, fit.offset) == pytest.approx((0.5, 0.0))
+	assert fit.rSquared == pytest.approx(1.0)
+	assert math.isnan(fit.slopeError)
+	assert math.isnan(fit.offsetError)
+	assert math.isnan(fit.covariance)
+	assert math.isnan(fit.PredictError(1.0))
+
+#Points all at the same x, or no points at all, leave the fit as NaN without raising or warning
+@pytest.mark.parametrize("x, y", [([3.0, 3.0, 3.0, 3.0], [1.0, 2.0, 4.0, 3.0]), ([3.0], [1.0]), ([], [])])
+def test_undefined_slope(x: List[float], y: List[float]) -> None:
+	with warnings.catch_warnings():
+		warnings.simplefilter("error")
+		fit: RegressionFit = FitLinearRegression(pd.Series(x, dtype=np.float64), pd.Series(y, dtype=np.float64))
+		slope, offset = LinearRegression(pd.Series(x, dtype=np.float64), pd.Series(y, dtype=np.float64))
+	assert fit.nElements == len(x)
+	for value in (fit.slope, fit.offset, fit.rSquared, fit.slopeError, fit.offsetError, fit.covariance, slope, offset):
+		assert math.isnan(value)
@@ -0,0 +1,69 @@
+#Import pip packages
+from typing import List, Tuple
+import types
+import numpy as np
+import pandas as pd
+import pytest
+
+#Import project files
+from ed_metric_calculations import EDMetricCalculations
+from live_metrics import LiveMetricCalculations
+from conftest import ExperimentLogs
+
+#Running sums add the samples in a different order to EDMetricCalculations, so results only agree to rounding
+TOLERANCE: float = 1e-9
+
+CURRENT: float = 1.0
+AIR_FLOW_RATE: float = 1.5
+
+#Splits nSamples samples into the slices read by each of several updates, some of them with no new samples or just one
+def Appends(seed: int, nSamples: int) -> List[slice]:
+	rng: np.random.Generator = np.random.default_rng(seed)
+	edges: np.ndarray = np.sort(np.concatenate(([0, 0, 1, nSamples], rng.integers(0, nSamples, 12))))
+	return [slice(int(edges[n]), int(edges[n + 1])) for n in range(0, edges.size - 1)]
+
+#Returns a metric, or the type of exception raised where it can't be worked out yet, such as a power consumption before any CO2 has been integrated
+def Metric(calculations: EDMetricCalculations, metric: str) -> object:
+	try:
+		return getattr(calculations, metric)()
+	except Exception as e:
+		return type(e)
+
+#Each live metric after every update is the one EDMetricCalculations gives for every sample added so far
+@pytest.mark.parametrize("propagation", ["linear", "quadrature"])
+def test_live_metrics_match_whole_log(propagation: str) -> None:
+	rawDataCO2, rawDataVoltage = ExperimentLogs(5, 2.0)
+	#A missing reading in each log is left out by both
+	rawDataCO2.loc[100, "co2_ppm"] = np.nan
+	rawDataVoltage.loc[50, "voltage_v"] = np.nan
+	co2Appends: List[slice] = Appends(1, len(rawDataCO2))
+	voltageAppends: List[slice] = Appends(2, len(rawDataVoltage))
+	assert len(co2Appends) == len(voltageAppends)
+
+	live: LiveMetricCalculations = LiveMetricCalculations(CURRENT, AIR_FLOW_RATE, propagation)
+	exp: types.SimpleNamespace = types.SimpleNamespace(current=CURRENT, airFlowRate=AIR_FLOW_RATE)
+	compared: int = 0
+	for co2Rows, voltageRows in zip(co2Appends, voltageAppends):
+		live.AddCO2(rawDataCO2["runtime_s"].to_numpy()[co2Rows], rawDataCO2["co2_ppm"].to_numpy()[co2Rows])
+		live.AddVoltage(rawDataVoltage["runtime_s"].to_numpy()[voltageRows], rawDataVoltage["voltage_v"].to_numpy()[voltageRows])
+		#EDMetricCalculations can't integrate an empty log, so there is nothing to compare with until both have samples
+		if co2Rows.stop == 0 or voltageRows.stop == 0:
+			continue
+
+		dataWindow: pd.DataFrame = pd.concat([rawDataCO2.iloc[0 : co2Rows.stop], rawDataVoltage.iloc[0 : voltageRows.stop]], axis=0, ignore_index=True)
+		kpm: EDMetricCalculations = EDMetricCalculations(dataWindow, exp, propagation)
+		voltage: np.ndarray = rawDataVoltage["voltage_v"].to_numpy()[0 : voltageRows.stop]
+		voltageTime: np.ndarray = rawDataVoltage["runtime_s"].to_numpy()[0 : voltageRows.stop]
+		expectedEnergy: Tuple[float, float] = EDMetricCalculations.Integrate(voltageTime[~np.isnan(voltage)], voltage[~np.isnan(voltage)] * CURRENT)
+
+		assert live.Duration() == kpm.Duration()
+		assert live.GetEnergy() == pytest.approx(expectedEnergy, rel=TOLERANCE, nan_ok=True)
+		for metric in ("GetMolesCO2", "GetStackResistance", "GetCurrentEfficiency", "GetPowerConsumption", "GetCO2Flux"):
+			expected: object = Metric(kpm, metric)
+			if isinstance(expected, type):
+				assert Metric(live, metric) is expected, metric
+			else:
+				assert Metric(live, metric) == pytest.approx(expected, rel=TOLERANCE, nan_ok=True), metric
+		compared += 1
+
+	assert compared >= 5
@@ -0,0 +1,57 @@
+#Import pip packages
+from typing import List
+import io
+import types
+import numpy as np
+import pandas as pd
+import pytest
+
+#Import project files
+from logfile_fetcher import ReadLogfileWindow, CO2_CSV_OPTIONS
+import time_conversion
+
+#The clocks in the UK go back from 02:00 BST to 01:00 GMT on this day, so the logger writes the hour from 01:00 twice
+TIMEZONE: str = "Europe/London"
+CLOCK_CHANGE: pd.Timestamp = pd.Timestamp("2023-10-29 01:00:00", tz="UTC")
+
+#A synthetic CO2 logfile sampled every 5 minutes from two days before the clock change until two days after, written in local time
+def CO2Logfile() -> bytes:
+	sampleTimes: pd.DatetimeIndex = pd.date_range(CLOCK_CHANGE - pd.Timedelta(days=2), CLOCK_CHANGE + pd.Timedelta(days=2), freq="5min")
+	localTimes: pd.Series = pd.Series(sampleTimes.tz_convert(TIMEZONE).strftime(time_conversion.LOGGER_TIMESTAMP_FORMAT))
+	co2: np.ndarray = np.round(400.0 + 10.0 * np.random.default_rng(0).standard_normal(sampleTimes.size), 1)
+	#The Vaisala logger writes 8 lines before its header
+	lines: List[str] = ["Vaisala logger line %d" % (n) for n in range(0, 8)] + ["Time,CO2 (ppm)"] + ["%s,%.1f" % (localTime, value) for localTime, value in zip(localTimes, co2)]
+	return ("\n".join(lines) + "\n").encode()
+
+#An experiment running from before the clocks go back until after
+def Experiment() -> types.SimpleNamespace:
+	return types.SimpleNamespace(label="clock change", startTime=(CLOCK_CHANGE - pd.Timedelta(hours=1, minutes=32)).timestamp(), stopTime=(CLOCK_CHANGE + pd.Timedelta(hours=2, minutes=3)).timestamp())
+
+#Reads the whole logfile at once and trims it to the experiment, as FetchLogfiles and CleanLogfiles do when not streaming
+def WholeFileRead(content: bytes, exp: types.SimpleNamespace) -> pd.DataFrame:
+	rawDataCO2: pd.DataFrame = pd.read_csv(io.BytesIO(content), **CO2_CSV_OPTIONS)
+	rawDataCO2["runtime_s"] = time_conversion.TimestampsToRuntime(rawDataCO2["timestamp"], exp.startTime, TIMEZONE)
+	rawDataCO2 = rawDataCO2[(rawDataCO2["runtime_s"] >= 0.0) & (rawDataCO2["runtime_s"] <= exp.stopTime - exp.startTime)]
+	return rawDataCO2.reset_index(drop=True)
+
+#However the repeated hour is split between chunks, streaming gives the same rows and runtimes as reading the whole logfile
+@pytest.mark.parametrize("chunkRows", [1, 7, 13, 100000])
+def test_streaming_matches_whole_file_across_clock_change(chunkRows: int) -> None:
+	content: bytes = CO2Logfile()
+	exp: types.SimpleNamespace = Experiment()
+	expected: pd.DataFrame = WholeFileRead(content, exp)
+	streamed: pd.DataFrame = ReadLogfileWindow(io.BytesIO(content), exp, TIMEZONE, chunkRows, **CO2_CSV_OPTIONS)
+
+	pd.testing.assert_frame_equal(streamed, expected)
+	#The experiment covers both passes of the repeated hour, sampled every 5 minutes without any gaps
+	assert expected["timestamp"].duplicated().sum() == 12
+	np.testing.assert_array_equal(np.diff(streamed["runtime_s"].to_numpy()), 300.0)
+
+#An experiment outside the logfile gives an empty window with the columns the rest of the processing expects
+def test_streaming_outside_logfile_is_empty() -> None:
+	exp: types.SimpleNamespace = Experiment()
+	exp.startTime += 10.0 * 86400.0
+	exp.stopTime += 10.0 * 86400.0
+	streamed: pd.DataFrame = ReadLogfileWindow(io.BytesIO(CO2Logfile()), exp, TIMEZONE, 7, **CO2_CSV_OPTIONS)
+	assert streamed.empty
+	assert list(streamed.columns) == ["timestamp", "co2_ppm", "runtime_s"]
@@ -0,0 +1,125 @@
+#Import pip packages
+from typing import List
+import numpy as np
+import pytest
+
+#Import project files
+from outlier_filter import RollingMedianFilter
+
+#The merge sort the outlier loop used before RollingMedianFilter, copied unchanged apart from being taken out of AnalysisManager
+def BaselineMergeSort(ip: list) -> list:
+	ipLen: int = len(ip)
+	if ipLen <= 1:
+		return ip
+
+	midpoint: int = int(len(ip) / 2.0)
+	leftList: list = BaselineMergeSort(ip[0 : midpoint])
+	rightList: list = BaselineMergeSort(ip[midpoint : len(ip)])
+
+	leftIndex: int = 0
+	rightIndex: int = 0
+	leftLen: int = len(leftList)
+	rightLen: int = len(rightList)
+	op: list = []
+
+	while leftIndex + rightIndex < leftLen + rightLen:
+		if (leftIndex < leftLen and rightIndex < rightLen):
+			if leftList[leftIndex] <= rightList[rightIndex]:
+				op.append(leftList[leftIndex])
+				leftIndex += 1
+			else:
+				op.append(rightList[rightIndex])
+				rightIndex += 1
+		elif rightIndex >= rightLen:
+			op.append(leftList[leftIndex])
+			leftIndex += 1
+		elif leftIndex >= leftLen:
+			op.append(rightList[rightIndex])
+			rightIndex += 1
+
+	return op
+
+#The outlier loop from before RollingMedianFilter, returning the rows it kept as a mask instead of dropping the rest
+#Like the original, it needs more than rollWindowSize samples
+def BaselineKeepMask(series: List[float], rollWindowSize: int, thresholdTolerance: float) -> np.ndarray:
+	keep: np.ndarray = np.ones(len(series), dtype=bool)
+	roll: List[float] = []
+	nextToReplace: int = 0
+	for n in range(0, rollWindowSize):
+		roll.append(series[n])
+
+	for n in range(rollWindowSize, len(series)):
+		sortedRoll: List[float] = BaselineMergeSort(roll)
+		rollingMedian: float = sortedRoll[(int)(rollWindowSize / 2.0)]
+
+		if series[n] > rollingMedian * (1.0 + thresholdTolerance) or series[n] < rollingMedian * (1.0 - thresholdTolerance):
+			keep[n] = False
+		else:
+			roll[nextToReplace % rollWindowSize] = series[n]
+			nextToReplace += 1
+	return keep
+
+#CO2-like readings with noise, occasional spikes and dropouts, and optionally missing readings
+def RandomSeries(rng: np.random.Generator, length: int, nanFraction: float = 0.0) -> np.ndarray:
+	series: np.ndarray = 400.0 + np.cumsum(rng.normal(0.0, 5.0, length)) + rng.normal(0.0, 20.0, length)
+	spikes: np.ndarray = rng.random(length) < 0.1
+	series[spikes] *= rng.choice([0.3, 3.0], size=np.count_nonzero(spikes))
+	series[rng.random(length) < nanFraction] = np.nan
+	return series
+
+@pytest.mark.parametrize("windowSize", [1, 2, 3, 5, 8])
+@pytest.mark.parametrize("tolerance", [0.05, 0.15, 0.5])
+def test_random_series_match_baseline(windowSize: int, tolerance: float) -> None:
+	rng: np.random.Generator = np.random.default_rng(windowSize * 100 + int(tolerance * 100))
+	outlierFilter: RollingMedianFilter = RollingMedianFilter(windowSize, tolerance)
+	for trial in range(0, 200):
+		series: np.ndarray = RandomSeries(rng, int(rng.integers(windowSize + 1, 200)))
+		np.testing.assert_array_equal(outlierFilter.KeepMask(series), BaselineKeepMask(series.tolist(), windowSize, tolerance))
+
+@pytest.mark.parametrize("windowSize", [1, 2, 5, 6])
+def test_series_with_nans_match_baseline(windowSize: int) -> None:
+	rng: np.random.Generator = np.random.default_rng(windowSize)
+	outlierFilter: RollingMedianFilter = RollingMedianFilter(windowSize, 0.15)
+	for trial in range(0, 300):
+		series: np.ndarray = RandomSeries(rng, int(rng.integers(windowSize + 1, 120)), nanFraction=0.15)
+		np.testing.assert_array_equal(outlierFilter.KeepMask(series), BaselineKeepMask(series.tolist(), windowSize, 0.15))
+
+#The original loop raised an IndexError for series shorter than the window, and kept every sample of a series exactly as long as it
+@pytest.mark.parametrize("length", [0, 1, 4, 5])
+def test_short_series_are_kept(length: int) -> None:
+	series: np.ndarray = np.array([400.0, 1200.0, 10.0, np.nan, 405.0])[0 : length]
+	np.testing.assert_array_equal(RollingMedianFilter(5, 0.15).KeepMask(series), np.ones(length, dtype=bool))
+	if length == 5:
+		np.testing.assert_array_equal(RollingMedianFilter(5, 0.15).KeepMask(series), BaselineKeepMask(series.tolist(), 5, 0.15))
+
+#Rejected samples never enter the window, so a run of outliers longer than the window is rejected throughout, and a genuine step change is too
+def test_runs_of_outliers_match_baseline() -> None:
+	series: np.ndarray = np.concatenate([np.full(10, 400.0), np.full(12, 2000.0), np.full(5, 402.0), np.full(3, 50.0), np.full(10, 800.0)])
+	mask: np.ndarray = RollingMedianFilter(5, 0.15).KeepMask(series)
+	np.testing.assert_array_equal(mask, BaselineKeepMask(series.tolist(), 5, 0.15))
+	np.testing.assert_array_equal(mask, np.abs(series - 400.0) < 10.0)
+
+#The voltage channel drops the readings taken before the current was switched on, then filters the rest
+def test_voltage_trim_matches_baseline() -> None:
+	rng: np.random.Generator = np.random.default_rng(7)
+	for trial in range(0, 100):
+		leading: int = int(rng.integers(0, 10))
+		series: np.ndarray = np.concatenate([rng.uniform(-0.01, 0.01, leading), 3.0 + rng.normal(0.0, 0.2, 60)])
+		series[leading + rng.integers(0, 60, 5)] *= 2.0
+		keep: np.ndarray = RollingMedianFilter.LeadingAboveMask(series, 0.01)
+		keep[keep] = RollingMedianFilter(5, 0.15).KeepMask(series[keep])
+
+		expected: np.ndarray = np.zeros(series.size, dtype=bool)
+		expected[leading : series.size] = BaselineKeepMask(series[leading : series.size].tolist(), 5, 0.15)
+		np.testing.assert_array_equal(keep, expected)
+
+#Feeding a series a batch at a time, as live.py does, gives the same mask as feeding it whole
+def test_batches_match_whole_series() -> None:
+	rng: np.random.Generator = np.random.default_rng(11)
+	outlierFilter: RollingMedianFilter = RollingMedianFilter(5, 0.15)
+	for trial in range(0, 100):
+		series: np.ndarray = RandomSeries(rng, 150, nanFraction=0.05)
+		cuts: np.ndarray = np.sort(rng.integers(0, series.size, 6))
+		state = outlierFilter.Start()
+		batched: np.ndarray = np.concatenate([state.KeepMask(batch) for batch in np.split(series, cuts)])
+		np.testing.assert_array_equal(batched, outlierFilter.KeepMask(series))
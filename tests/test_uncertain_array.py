@@ -0,0 +1,89 @@
+#Import pip packages
+from typing import Tuple
+import math
+import warnings
+import numpy as np
+import pytest
+
+#Import project files
+from uncertain_array import UncertainArray
+from ed_metric_calculations import EDMetricCalculations
+
+#Pairs of (value, error) operands with non-zero values, including negative ones
+OPERANDS: Tuple[Tuple[Tuple[float, float], Tuple[float, float]], ...] = (
+	((1.0, 0.1), (2.0, 0.05)),
+	((3.5, 0.2), (0.25, 0.01)),
+	((-4.0, 0.3), (1.5, 0.15)),
+	((120000.0, 1500.0), (-0.004, 0.0001))
+)
+
+#The tuple arithmetic EDMetricCalculations used before UncertainArray, which adds relative errors and can't handle values of 0
+def OldDivide(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
+	outputValue = a[0] / b[0]
+	relativeError = (a[1]/a[0]) + (b[1]/b[0])
+	outputError = outputValue * relativeError
+	return (outputValue, outputError)
+
+def OldMultiply(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
+	outputValue = a[0] * b[0]
+	relativeError = (a[1]/a[0]) + (b[1]/b[0])
+	outputError = outputValue * relativeError
+	return (outputValue, outputError)
+
+@pytest.mark.parametrize("a, b", OPERANDS)
+def test_linear_matches_old_tuple_formula(a: Tuple[float, float], b: Tuple[float, float]) -> None:
+	#The old formula only gives a magnitude for positive values, so it is given the magnitudes of the values. Errors are now always magnitudes
+	for operation, oldOperation in (("__truediv__", OldDivide), ("__mul__", OldMultiply)):
+		value, error = getattr(UncertainArray.FromTuple(a), operation)(UncertainArray.FromTuple(b)).ToTuple()
+		oldValue, oldError = oldOperation((abs(a[0]), a[1]), (abs(b[0]), b[1]))
+		assert abs(value) == pytest.approx(oldValue, rel=1e-14)
+		assert error == pytest.approx(oldError, rel=1e-14)
+
+	#The static tuple arithmetic of EDMetricCalculations is built on UncertainArray
+	assert EDMetricCalculations.ErrorDivide(a, b) == (UncertainArray.FromTuple(a) / UncertainArray.FromTuple(b)).ToTuple()
+	assert EDMetricCalculations.ErrorMultiply(a, b, propagation="quadrature") == (UncertainArray.FromTuple(a, "quadrature") * UncertainArray.FromTuple(b, "quadrature")).ToTuple()
+
+@pytest.mark.parametrize("a, b", OPERANDS)
+def test_quadrature_matches_hand_computed(a: Tuple[float, float], b: Tuple[float, float]) -> None:
+	relativeError: float = math.sqrt((a[1] / a[0]) ** 2 + (b[1] / b[0]) ** 2)
+	for operation, quotient in (("__truediv__", a[0] / b[0]), ("__mul__", a[0] * b[0])):
+		value, error = getattr(UncertainArray.FromTuple(a, "quadrature"), operation)(UncertainArray.FromTuple(b, "quadrature")).ToTuple()
+		assert value == pytest.approx(quotient, rel=1e-14)
+		assert error == pytest.approx(relativeError * abs(quotient), rel=1e-14)
+
+#Values and errors of 0 give the right error without any division warnings. Only dividing by a value of 0 gives infinity
+@pytest.mark.parametrize("propagation", ["linear", "quadrature"])
+def test_zero_values_and_errors(propagation: str) -> None:
+	with warnings.catch_warnings():
+		warnings.simplefilter("error")
+		#A value of 0 on either side of a product still carries the other side's error
+		assert (UncertainArray(0.0, 0.1, propagation) * UncertainArray(2.0, 0.05, propagation)).ToTuple() == pytest.approx((0.0, 0.2))
+		assert (UncertainArray(2.0, 0.05, propagation) * UncertainArray(0.0, 0.1, propagation)).ToTuple() == pytest.approx((0.0, 0.2))
+		assert (UncertainArray(0.0, 0.1, propagation) / UncertainArray(2.0, 0.05, propagation)).ToTuple() == pytest.approx((0.0, 0.05))
+		#An error of 0 on either side leaves just the other side's error
+		assert (UncertainArray(3.0, 0.0, propagation) * UncertainArray(2.0, 0.1, propagation)).ToTuple() == pytest.approx((6.0, 0.3))
+		assert (UncertainArray(3.0, 0.3, propagation) / UncertainArray(2.0, 0.0, propagation)).ToTuple() == pytest.approx((1.5, 0.15))
+		assert (UncertainArray(0.0, 0.0, propagation) / UncertainArray(2.0, 0.0, propagation)).ToTuple() == (0.0, 0.0)
+		#Dividing by 0 gives infinity, as it does for NumPy arrays, rather than a warning
+		value, error = (UncertainArray(np.array([1.0, 0.0]), 0.1, propagation) / UncertainArray(np.array([0.0, 0.0]), 0.0, propagation)).ToTuple()
+	assert np.isinf(value[0])
+	assert not np.isfinite(error).any()
+
+#Arrays are worked out element-wise, giving the same as each element on its own
+@pytest.mark.parametrize("propagation", ["linear", "quadrature"])
+def test_arrays_match_scalars(propagation: str) -> None:
+	rng: np.random.Generator = np.random.default_rng(0)
+	aValues: np.ndarray = rng.normal(0.0, 10.0, 50)
+	bErrors: np.ndarray = rng.uniform(0.0, 1.0, 50)
+	#A value and an error of 0 in the arrays too
+	aValues[3] = 0.0
+	bErrors[7] = 0.0
+	a: UncertainArray = UncertainArray(aValues, rng.uniform(0.0, 1.0, 50), propagation)
+	b: UncertainArray = UncertainArray(rng.normal(5.0, 2.0, 50), bErrors, propagation)
+
+	for operation in ("__add__", "__sub__", "__mul__", "__truediv__"):
+		values, errors = getattr(a, operation)(b).ToTuple()
+		for n in range(0, 50):
+			value, error = getattr(a[n], operation)(b[n]).ToTuple()
+			assert values[n] == value
+			assert errors[n] == error
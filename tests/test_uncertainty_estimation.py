@@ -0,0 +1,66 @@
+#Import pip packages
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+
+#Import project files
+from uncertainty_estimation import UncertaintySettings, UncertaintyEstimate, DrawInputs, DrawBatch, EstimateUncertainty, ExperimentSeedSequence, UNCERTAINTY_METRICS
+import uncertainty_estimation
+from experiment_processor import WorkerContext
+from conftest import ExperimentLogs
+
+#Draw inputs of the synthetic experiment ExperimentLogs makes, at 1 A and 1.5 L min^{-1}
+def SyntheticInputs(seed: int, hours: float) -> DrawInputs:
+	rawDataCO2, rawDataVoltage = ExperimentLogs(seed, hours)
+	voltageTime: np.ndarray = rawDataVoltage["runtime_s"].to_numpy()
+	return DrawInputs(rawDataCO2["runtime_s"].to_numpy(), rawDataCO2["co2_ppm"].to_numpy(), voltageTime, rawDataVoltage["voltage_v"].to_numpy(), 1.0, 1.5, float(voltageTime[voltageTime.size - 1]))
+
+def Settings(method: str, samples: int) -> UncertaintySettings:
+	settings: UncertaintySettings = UncertaintySettings()
+	settings.method = method
+	settings.samples = samples
+	settings.seed = 7
+	return settings
+
+#Batches are combined in order, so spreading them across a pool gives the same errors as making them one after another
+@pytest.mark.parametrize("method", ["bootstrap", "montecarlo"])
+def test_pool_matches_serial(method: str, monkeypatch: pytest.MonkeyPatch) -> None:
+	#Small batches, so that the draws are split across several of them
+	monkeypatch.setattr(uncertainty_estimation, "BATCH_ELEMENTS", 100000)
+	inputs: DrawInputs = SyntheticInputs(1, 1.0)
+	settings: UncertaintySettings = Settings(method, 200)
+
+	serial: UncertaintyEstimate = EstimateUncertainty(inputs, settings, "experiment")
+	with ProcessPoolExecutor(max_workers=2, mp_context=WorkerContext()) as pool:
+		#The same pool is shared by every experiment of a run
+		pooled: UncertaintyEstimate = EstimateUncertainty(inputs, settings, "experiment", pool)
+		again: UncertaintyEstimate = EstimateUncertainty(inputs, settings, "experiment", pool)
+
+	assert serial.samples == pooled.samples == again.samples == 200
+	for metric in UNCERTAINTY_METRICS:
+		assert math.isfinite(serial.errors[metric])
+		assert pooled.errors[metric] == serial.errors[metric]
+		assert again.errors[metric] == serial.errors[metric]
+
+#A batch that starts after the time budget has run out returns at once without making any draws
+def test_batch_past_deadline_is_skipped() -> None:
+	inputs: DrawInputs = SyntheticInputs(2, 0.5)
+	settings: UncertaintySettings = Settings("bootstrap", 10)
+	assert DrawBatch(inputs, settings, ExperimentSeedSequence(0, "experiment"), 10, time.time() - 1.0) is None
+	assert DrawBatch(inputs, settings, ExperimentSeedSequence(0, "experiment"), 10, time.time() + 60.0) is not None
+
+#Once the time budget runs out, the batches left over don't hold up the pool for the next experiment
+def test_time_budget_frees_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setattr(uncertainty_estimation, "BATCH_ELEMENTS", 100000)
+	inputs: DrawInputs = SyntheticInputs(3, 1.0)
+	settings: UncertaintySettings = Settings("montecarlo", 100000)
+	settings.timeBudget = 0.2
+
+	with ProcessPoolExecutor(max_workers=2, mp_context=WorkerContext()) as pool:
+		estimate: UncertaintyEstimate = EstimateUncertainty(inputs, settings, "experiment", pool)
+		assert 0 < estimate.samples < settings.samples
+		start: float = time.perf_counter()
+		pool.submit(math.sqrt, 4.0).result()
+		assert time.perf_counter() - start < 5.0
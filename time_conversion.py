@@ -0,0 +1,56 @@
+#Import pip packages
+from typing import Type
+import numpy as np
+import pandas as pd
+import datetime
+from zoneinfo import ZoneInfo
+
+#Timezone assumed for timestamps that don't carry one. The loggers record local wall clock time, so this follows GMT/BST
+DEFAULT_TIMEZONE: str = "Europe/London"
+LOGGER_TIMESTAMP_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+#No timezone is as much as a day away from UTC, so a local time read as if it were UTC is always within this many seconds of the true time
+MAX_UTC_OFFSET: float = 86400.0
+
+#Raises an exception if timezone isn't a valid IANA timezone name, such as "Europe/London" or "UTC"
+def ValidateTimezone(timezone: str) -> None:
+	try:
+		ZoneInfo(timezone)
+	except Exception:
+		raise Exception("ERROR: \"%s\" is not a recognised timezone" % (timezone))
+
+#Converts a datetime to a UNIX timestamp in seconds
+#Datetimes with a timezone are converted exactly; those without one are assumed to be in the given timezone
+def DatetimeToUNIXTime(ip: datetime.datetime, timezone: str = DEFAULT_TIMEZONE) -> float:
+	if ip.tzinfo is None or ip.utcoffset() is None:
+		ip = ip.replace(tzinfo=ZoneInfo(timezone))
+	return ip.timestamp()
+
+#Parses a whole column of logger timestamp strings to datetimes without a timezone
+def ParseTimestamps(timestamps: pd.Series) -> pd.Series:
+	return pd.to_datetime(timestamps, format=LOGGER_TIMESTAMP_FORMAT)
+
+#Returns datetimes without a timezone as seconds since the UNIX epoch, as if they were in UTC
+def NaiveSeconds(datetimes: pd.Series) -> np.ndarray:
+	return ((pd.Series(datetimes) - pd.Timestamp(0)) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+
+#Converts a whole column of logger timestamp strings to UNIX timestamps in seconds in one call
+def TimestampsToUNIXTime(timestamps: pd.Series, timezone: str = DEFAULT_TIMEZONE) -> np.ndarray:
+	return DatetimesToUNIXTime(ParseTimestamps(timestamps), timezone)
+
+#Converts a whole column of datetimes to UNIX timestamps in seconds in one call. Columns without a timezone are assumed to be in the given timezone
+#The loggers don't record whether a timestamp is in GMT or BST. The hour repeated when the clocks go back is resolved by the order of the samples,
+#and times that are skipped when the clocks go forward are shifted to the first valid time
+def DatetimesToUNIXTime(datetimes: pd.Series, timezone: str = DEFAULT_TIMEZONE) -> np.ndarray:
+	localised: pd.Series = pd.to_datetime(pd.Series(datetimes))
+	if localised.dt.tz is None:
+		try:
+			localised = localised.dt.tz_localize(timezone, ambiguous="infer", nonexistent="shift_forward")
+		except Exception:
+			#Inference fails if the log starts or ends inside the repeated hour, in which case those samples are assumed to be in standard time
+			localised = localised.dt.tz_localize(timezone, ambiguous=np.zeros(localised.size, dtype=bool), nonexistent="shift_forward")
+
+	return ((localised - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+
+#Converts a column of logger timestamp strings to seconds since startTime, as a float64 array
+def TimestampsToRuntime(timestamps: pd.Series, startTime: float, timezone: str = DEFAULT_TIMEZONE) -> np.ndarray:
+	return TimestampsToUNIXTime(timestamps, timezone) - startTime
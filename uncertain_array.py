@@ -0,0 +1,99 @@
+#Import pip packages
+from typing import Type, Tuple, Union
+import numpy as np
+
+#Ways of combining the errors of quantities in arithmetic. linear adds absolute errors for sums and relative errors for products, which is the worst case and how the analysis has always done it
+#quadrature adds them in quadrature, which assumes the errors are independent and random
+PROPAGATION_MODES: Tuple[str, ...] = ("linear", "quadrature")
+
+#Array of values with an error on each, which carries the errors through arithmetic element-wise
+#Plain numbers and arrays can be used as operands too, and are taken to be exact
+#Errors of products and quotients are worked out without dividing by the values, so values of 0 give the right error rather than a division by zero. Dividing by 0 gives infinity or NaN, as it does for NumPy arrays
+class UncertainArray(object):
+	"""
+	Member variables:
+
+	np.ndarray value;
+	np.ndarray error;
+	char *propagation;
+	"""
+
+	def __init__(self, value: Union[np.ndarray, float], error: Union[np.ndarray, float] = 0.0, propagation: str = "linear") -> None:
+		if propagation not in PROPAGATION_MODES:
+			raise Exception("ERROR: \"%s\" is not a way of propagating errors. Use one of: %s" % (propagation, ", ".join(PROPAGATION_MODES)))
+		self.value: np.ndarray = np.asarray(value, dtype=np.float64)
+		#Errors are kept as magnitudes, and take the shape of the values
+		self.error: np.ndarray = np.broadcast_to(np.abs(np.asarray(error, dtype=np.float64)), self.value.shape)
+		self.propagation: str = propagation
+
+	#Converts a (value, error) tuple, as used by EDMetricCalculations
+	@staticmethod
+	def FromTuple(ip: Tuple[Union[np.ndarray, float], Union[np.ndarray, float]], propagation: str = "linear") -> "UncertainArray":
+		return UncertainArray(ip[0], ip[1], propagation)
+
+	#Returns a (value, error) tuple, of floats if this holds a single value
+	def ToTuple(self) -> Tuple[Union[np.ndarray, float], Union[np.ndarray, float]]:
+		if self.value.ndim == 0:
+			return (float(self.value), float(self.error))
+		return (self.value, np.array(self.error))
+
+	#Returns other as an UncertainArray. Numbers and arrays are taken to be exact
+	def Operand(self, other: Union["UncertainArray", np.ndarray, float]) -> "UncertainArray":
+		if isinstance(other, UncertainArray):
+			if other.propagation != self.propagation:
+				raise Exception("ERROR: cannot combine errors propagated %s with errors propagated %s" % (self.propagation, other.propagation))
+			return other
+		return UncertainArray(other, 0.0, self.propagation)
+
+	#Combines two absolute errors
+	def Combine(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+		if self.propagation == "quadrature":
+			return np.hypot(a, b)
+		return a + b
+
+	def __len__(self) -> int:
+		return len(self.value)
+
+	def __getitem__(self, index: object) -> "UncertainArray":
+		return UncertainArray(self.value[index], self.error[index], self.propagation)
+
+	def __repr__(self) -> str:
+		return "UncertainArray(%r, %r, %r)" % (self.value, np.asarray(self.error), self.propagation)
+
+	def __neg__(self) -> "UncertainArray":
+		return UncertainArray(-self.value, self.error, self.propagation)
+
+	def __add__(self, other: Union["UncertainArray", np.ndarray, float]) -> "UncertainArray":
+		other = self.Operand(other)
+		return UncertainArray(self.value + other.value, self.Combine(self.error, other.error), self.propagation)
+
+	def __sub__(self, other: Union["UncertainArray", np.ndarray, float]) -> "UncertainArray":
+		other = self.Operand(other)
+		return UncertainArray(self.value - other.value, self.Combine(self.error, other.error), self.propagation)
+
+	#Relative errors add, so |ab| (ea/|a| + eb/|b|) = |b| ea + |a| eb
+	def __mul__(self, other: Union["UncertainArray", np.ndarray, float]) -> "UncertainArray":
+		other = self.Operand(other)
+		return UncertainArray(self.value * other.value, self.Combine(np.abs(other.value) * self.error, np.abs(self.value) * other.error), self.propagation)
+
+	#Relative errors add, so |a/b| (ea/|a| + eb/|b|) = ea/|b| + |a| eb/b^2
+	def __truediv__(self, other: Union["UncertainArray", np.ndarray, float]) -> "UncertainArray":
+		other = self.Operand(other)
+		with np.errstate(divide="ignore", invalid="ignore"):
+			divisor: np.ndarray = np.abs(other.value)
+			return UncertainArray(self.value / other.value, self.Combine(self.error / divisor, np.abs(self.value) * other.error / (divisor * divisor)), self.propagation)
+
+	def __radd__(self, other: Union[np.ndarray, float]) -> "UncertainArray":
+		return self.Operand(other) + self
+
+	def __rsub__(self, other: Union[np.ndarray, float]) -> "UncertainArray":
+		return self.Operand(other) - self
+
+	def __rmul__(self, other: Union[np.ndarray, float]) -> "UncertainArray":
+		return self.Operand(other) * self
+
+	def __rtruediv__(self, other: Union[np.ndarray, float]) -> "UncertainArray":
+		return self.Operand(other) / self
+
+	#Stops NumPy from treating this as a sequence of objects when it is the right hand operand of an array
+	__array_ufunc__ = None
@@ -0,0 +1,187 @@
+#Import pip packages
+from typing import Type, List, Dict, Tuple
+import numpy as np
+import hashlib
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError
+
+#Import project files
+from ed_metric_calculations import EDMetricCalculations
+
+#Ways of working out the errors on the experiment-averaged metrics. heuristic is the error propagated by EDMetricCalculations
+#bootstrap resamples the CO2 and voltage logs, and montecarlo perturbs the air flow rate, current and sensor readings by their expected errors
+UNCERTAINTY_METHODS: Tuple[str, ...] = ("heuristic", "bootstrap", "montecarlo")
+#Metrics whose errors are estimated, as named in ExperimentMeta.processedData
+UNCERTAINTY_METRICS: Tuple[str, ...] = ("stackResistance", "currentEfficiency", "powerConsumption", "fluxCO2")
+#Most values held in one array while a batch of draws is worked out, which bounds the memory each worker uses to about 32 MB per array
+BATCH_ELEMENTS: int = 4000000
+
+#literally just a struct holding the settings for estimating errors by resampling
+#Must stay picklable, as it is sent to worker processes
+class UncertaintySettings(object):
+	def __init__(self) -> None:
+		self.method: str = "heuristic"
+		#Number of resamples or perturbed copies of each experiment's data
+		self.samples: int = 1000
+		#Seconds allowed per experiment. Once they run out, the error is estimated from the draws made so far. 0 for no limit
+		self.timeBudget: float = 0.0
+		#Draws for each experiment come from their own random stream, seeded by this and the experiment ID, so results don't depend on the order or number of processes
+		self.seed: int = 0
+		#Processes in the pool that the batches of draws are spread across, which is made once per run by whoever calls EstimateUncertainty. 1 works them out in the calling process
+		self.workers: int = 1
+		#Standard errors assumed by montecarlo, relative to the value unless a unit is given
+		self.airFlowRateError: float = 0.02
+		self.currentError: float = 0.01
+		#Calibration errors, shared by every reading of a draw, and noise, drawn for each reading separately
+		self.co2CalibrationError: float = 0.02
+		self.co2NoisePPM: float = 2.0
+		self.voltageCalibrationError: float = 0.005
+		self.voltageNoiseV: float = 0.001
+
+#literally just a struct holding the cleaned series and constants of one experiment, which every draw is made from
+#Must stay picklable, as it is sent to worker processes
+class DrawInputs(object):
+	def __init__(self, co2Time: np.ndarray, co2ppm: np.ndarray, voltageTime: np.ndarray, voltage: np.ndarray, current: float, airFlowRate: float, duration: float) -> None:
+		self.co2Time: np.ndarray = co2Time
+		self.co2ppm: np.ndarray = co2ppm
+		self.voltageTime: np.ndarray = voltageTime
+		self.voltage: np.ndarray = voltage
+		#Current in A and air flow rate in L min^{-1}, as in ExperimentMeta
+		self.current: float = current
+		self.airFlowRate: float = airFlowRate
+		#Duration of the experiment's data in s, as given by EDMetricCalculations.Duration
+		self.duration: float = duration
+
+#Works out the key performance metrics of many draws of one experiment at once, from the integrals of each draw's CO2 fraction and voltage
+#Each constant and integral is an array with one element per draw, and the unit conversions are inherited from EDMetricCalculations
+class DrawnMetricCalculations(EDMetricCalculations):
+	"""
+	Member variables:
+
+	float duration;
+	np.ndarray meanVoltage;
+	"""
+
+	def __init__(self, current: np.ndarray, airFlowRate: np.ndarray, co2FractionIntegral: np.ndarray, voltageIntegral: np.ndarray, meanVoltage: np.ndarray, duration: float) -> None:
+		self.SetConstants(current, airFlowRate)
+		self.duration: float = duration
+		self.meanVoltage: np.ndarray = meanVoltage
+		#CO2 volume in L and energy in J, worked out as EDMetricCalculations does but with the constants taken out of the integrals
+		self.totalMolesCO2: Tuple[np.ndarray, np.ndarray] = self.VolumeToMolesCO2((co2FractionIntegral * self.airFlowRate, 0.0))
+		self.energy: Tuple[np.ndarray, np.ndarray] = (voltageIntegral * self.currentSetpoint, 0.0)
+
+	def Duration(self) -> float:
+		return self.duration
+
+	def GetStackResistance(self) -> Tuple[np.ndarray, np.ndarray]:
+		return self.ErrorDivide((self.meanVoltage, 0.0), (self.currentSetpoint, 0.0), propagation=self.propagation)
+
+	def GetPowerConsumption(self) -> Tuple[np.ndarray, np.ndarray]:
+		return self.EnergyToPowerConsumption(self.energy, self.totalMolesCO2)
+
+#Trapezoidal integral of each row of y wrt the same row of x
+def IntegrateRows(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+	return np.sum(((y[:, 0 : y.shape[1] - 1] + y[:, 1 : y.shape[1]]) / 2.0) * (x[:, 1 : x.shape[1]] - x[:, 0 : x.shape[1] - 1]), axis=1)
+
+#Resamples each row's samples with replacement, keeping them in time order, and returns the integral and mean of every resample
+def BootstrapSeries(time: np.ndarray, values: np.ndarray, draws: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+	picks: np.ndarray = np.sort(rng.integers(0, time.size, size=(draws, time.size)), axis=1)
+	resampledValues: np.ndarray = values[picks]
+	return (IntegrateRows(time[picks], resampledValues), resampledValues.mean(axis=1))
+
+#Scales each row's copy of the values by its own calibration error and adds noise to every value, and returns the integral and mean of every copy
+def PerturbSeries(time: np.ndarray, values: np.ndarray, calibrationError: float, noise: float, draws: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+	perturbedValues: np.ndarray = values[np.newaxis, :] * (1.0 + rng.normal(0.0, calibrationError, size=(draws, 1))) + rng.normal(0.0, noise, size=(draws, time.size))
+	return (IntegrateRows(np.broadcast_to(time, perturbedValues.shape), perturbedValues), perturbedValues.mean(axis=1))
+
+#Makes one batch of draws of an experiment and returns each metric for every draw
+#Returns None without making any draws if it starts after deadline, a UNIX time in s, so that batches still queued once the time budget has run out finish straight away
+#Runs in worker processes, so it only depends on its arguments
+def DrawBatch(inputs: DrawInputs, settings: UncertaintySettings, seedSequence: np.random.SeedSequence, draws: int, deadline: float = math.inf) -> Dict[str, np.ndarray]:
+	if time.time() >= deadline:
+		return None
+
+	rng: np.random.Generator = np.random.default_rng(seedSequence)
+	current: np.ndarray = np.full(draws, inputs.current)
+	airFlowRate: np.ndarray = np.full(draws, inputs.airFlowRate)
+
+	if settings.method == "bootstrap":
+		co2FractionIntegral, _ = BootstrapSeries(inputs.co2Time, (inputs.co2ppm - 400) / 1000000.0, draws, rng)
+		voltageIntegral, meanVoltage = BootstrapSeries(inputs.voltageTime, inputs.voltage, draws, rng)
+	else:
+		current *= 1.0 + rng.normal(0.0, settings.currentError, size=draws)
+		airFlowRate *= 1.0 + rng.normal(0.0, settings.airFlowRateError, size=draws)
+		co2FractionIntegral, _ = PerturbSeries(inputs.co2Time, inputs.co2ppm, settings.co2CalibrationError, settings.co2NoisePPM, draws, rng)
+		#The fraction is taken after perturbing, as the calibration error scales the reading rather than the reading above background
+		co2FractionIntegral = (co2FractionIntegral - 400 * (inputs.co2Time[inputs.co2Time.size - 1] - inputs.co2Time[0])) / 1000000.0
+		voltageIntegral, meanVoltage = PerturbSeries(inputs.voltageTime, inputs.voltage, settings.voltageCalibrationError, settings.voltageNoiseV, draws, rng)
+
+	calculator: DrawnMetricCalculations = DrawnMetricCalculations(current, airFlowRate, co2FractionIntegral, voltageIntegral, meanVoltage, inputs.duration)
+	return {
+		"stackResistance": calculator.GetStackResistance()[0],
+		"currentEfficiency": calculator.GetCurrentEfficiency()[0],
+		"powerConsumption": calculator.GetPowerConsumption()[0],
+		"fluxCO2": calculator.GetCO2Flux()[0]
+	}
+
+#Returns the random stream of an experiment's draws. It depends only on the seed and experiment ID
+def ExperimentSeedSequence(seed: int, experimentID: str) -> np.random.SeedSequence:
+	return np.random.SeedSequence([seed, int.from_bytes(hashlib.sha256(experimentID.encode("utf-8")).digest()[0:8], "little")])
+
+#literally just a struct holding the errors estimated for one experiment
+class UncertaintyEstimate(object):
+	def __init__(self) -> None:
+		#Standard deviation of each metric over the draws, keyed as in UNCERTAINTY_METRICS
+		self.errors: Dict[str, float] = {}
+		#Number of draws made, which is less than settings.samples if the time budget ran out
+		self.samples: int = 0
+
+#Estimates the errors on an experiment's metrics from settings.samples draws of its data
+#Draws are made in batches of at most BATCH_ELEMENTS values, each with its own random stream spawned from the experiment's, and spread across the processes of pool if one is given
+#Batches are always combined in order, so the same seed gives the same errors however many processes are used, as long as the time budget doesn't run out
+def EstimateUncertainty(inputs: DrawInputs, settings: UncertaintySettings, experimentID: str, pool: ProcessPoolExecutor = None) -> UncertaintyEstimate:
+	if settings.method not in UNCERTAINTY_METHODS or settings.method == "heuristic":
+		raise Exception("ERROR: \"%s\" is not a way of estimating errors by resampling. Use bootstrap or montecarlo" % (settings.method))
+	if inputs.co2Time.size < 2 or inputs.voltageTime.size < 2:
+		raise Exception("ERROR: at least 2 CO2 and 2 voltage samples are needed to estimate errors for experiment: %s" % (experimentID))
+
+	batchSize: int = max(1, BATCH_ELEMENTS // max(inputs.co2Time.size, inputs.voltageTime.size))
+	batchDraws: List[int] = [min(batchSize, settings.samples - start) for start in range(0, settings.samples, batchSize)]
+	seedSequences: List[np.random.SeedSequence] = ExperimentSeedSequence(settings.seed, experimentID).spawn(len(batchDraws))
+	#Wall clock time, as it is compared against in the worker processes too
+	deadline: float = time.time() + settings.timeBudget if settings.timeBudget > 0.0 else math.inf
+
+	#The first batch is always finished, so that there is an estimate however short the time budget is
+	batches: List[Dict[str, np.ndarray]] = []
+	if pool is not None and len(batchDraws) > 1:
+		futures: List[Future] = [pool.submit(DrawBatch, inputs, settings, seedSequences[n], batchDraws[n], math.inf if n == 0 else deadline) for n in range(0, len(batchDraws))]
+		try:
+			for n in range(0, len(futures)):
+				timeout: float = None
+				if n > 0 and deadline < math.inf:
+					timeout = max(0.0, deadline - time.time())
+				try:
+					batch: Dict[str, np.ndarray] = futures[n].result(timeout=timeout)
+				except TimeoutError:
+					break
+				if batch is None:
+					break
+				batches.append(batch)
+		finally:
+			#The pool is shared with later experiments, so batches that haven't started are cancelled. Those already running finish their batch, and any that start late return at once
+			for future in futures:
+				future.cancel()
+	else:
+		for n in range(0, len(batchDraws)):
+			if n > 0 and time.time() >= deadline:
+				break
+			batches.append(DrawBatch(inputs, settings, seedSequences[n], batchDraws[n]))
+
+	estimate: UncertaintyEstimate = UncertaintyEstimate()
+	for metric in UNCERTAINTY_METRICS:
+		values: np.ndarray = np.concatenate([batch[metric] for batch in batches])
+		values = values[np.isfinite(values)]
+		estimate.errors[metric] = float(np.std(values, ddof=1)) if values.size >= 2 else math.nan
+	estimate.samples = sum(batchDraws[0 : len(batches)])
+	return estimate